@@ -11,12 +11,13 @@ from app.models.profile import CandidateProfile
 from app.models.resume import Resume 
 from app.models.job import Job
 from app.models.task_state import TaskState, DecisionAudit
-from app.models.esco import EscoSkill, EscoRelation
+from app.models.esco import EscoSkill, EscoRelation, EscoOccupation, EscoOccupationSkill, EscoDatasetVersion
 from app.models.pipeline import PipelineRun
 from app.models.cv_history import CVVersion
 from app.models.job_market import JobMatch, SalaryBenchmark
 from app.models.interview_roadmap import InterviewSession, SkillRoadmap
 from app.models.preference import UserPreference
+from app.models.text_embedding import TextEmbedding
 
 # 2. CONFIG SETUP
 config = context.config
@@ -0,0 +1,44 @@
+"""Materialize job cards in job_matches
+
+Revision ID: 215e131f9cae
+Revises: 42b07dd25698
+Create Date: 2026-10-18 10:41:52.370119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '215e131f9cae'
+down_revision: Union[str, Sequence[str], None] = '42b07dd25698'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_matches', sa.Column('tier_rank', sa.Integer(), nullable=True))
+    op.add_column('job_matches', sa.Column('rank', sa.Integer(), nullable=True))
+    op.add_column('job_matches', sa.Column('card_key', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('job_matches', sa.Column('market_status', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('job_matches', sa.Column('source_skill', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index(
+        'ix_job_matches_user_pipeline_tier_score',
+        'job_matches',
+        ['user_id', 'pipeline_id', 'tier_rank', sa.text('match_score DESC'), 'rank'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_matches_user_pipeline_tier_score', table_name='job_matches')
+    op.drop_column('job_matches', 'source_skill')
+    op.drop_column('job_matches', 'market_status')
+    op.drop_column('job_matches', 'card_key')
+    op.drop_column('job_matches', 'rank')
+    op.drop_column('job_matches', 'tier_rank')
@@ -0,0 +1,34 @@
+"""Add interview trend covering index
+
+Revision ID: 42b07dd25698
+Revises: 9594d489bf4e
+Create Date: 2026-10-18 10:03:17.552961
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '42b07dd25698'
+down_revision: Union[str, Sequence[str], None] = '9594d489bf4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_interview_sessions_user_completed',
+        'interview_sessions',
+        ['user_id', 'completed_at'],
+        unique=False,
+        postgresql_include=['overall_score'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_interview_sessions_user_completed', table_name='interview_sessions')
@@ -0,0 +1,47 @@
+"""Add ESCO concept URIs and occupations
+
+Revision ID: 5b8e3d61f0a4
+Revises: c41a7e5b2d90
+Create Date: 2026-10-18 15:21:09.337164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e3d61f0a4'
+down_revision: Union[str, Sequence[str], None] = 'c41a7e5b2d90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('esco_skills', sa.Column('uri', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index(op.f('ix_esco_skills_uri'), 'esco_skills', ['uri'], unique=True)
+    op.create_table(
+        'esco_occupations',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('uri', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('description', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('isco_code', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_esco_occupations_uri'), 'esco_occupations', ['uri'], unique=True)
+    op.create_index(op.f('ix_esco_occupations_name'), 'esco_occupations', ['name'], unique=False)
+    op.create_index(op.f('ix_esco_occupations_isco_code'), 'esco_occupations', ['isco_code'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_esco_occupations_isco_code'), table_name='esco_occupations')
+    op.drop_index(op.f('ix_esco_occupations_name'), table_name='esco_occupations')
+    op.drop_index(op.f('ix_esco_occupations_uri'), table_name='esco_occupations')
+    op.drop_table('esco_occupations')
+    op.drop_index(op.f('ix_esco_skills_uri'), table_name='esco_skills')
+    op.drop_column('esco_skills', 'uri')
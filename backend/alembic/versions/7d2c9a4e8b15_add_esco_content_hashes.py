@@ -0,0 +1,31 @@
+"""Add ESCO content hashes
+
+Revision ID: 7d2c9a4e8b15
+Revises: 5b8e3d61f0a4
+Create Date: 2026-10-18 16:04:52.118730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2c9a4e8b15'
+down_revision: Union[str, Sequence[str], None] = '5b8e3d61f0a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('esco_skills', sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('esco_occupations', sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('esco_occupations', 'content_hash')
+    op.drop_column('esco_skills', 'content_hash')
@@ -0,0 +1,30 @@
+"""Add pipeline run updated_at
+
+Revision ID: 9594d489bf4e
+Revises: f8ed2280fe22
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9594d489bf4e'
+down_revision: Union[str, Sequence[str], None] = 'f8ed2280fe22'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('pipeline_runs', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE pipeline_runs SET updated_at = COALESCE(completed_at, created_at)")
+    op.alter_column('pipeline_runs', 'updated_at', nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('pipeline_runs', 'updated_at')
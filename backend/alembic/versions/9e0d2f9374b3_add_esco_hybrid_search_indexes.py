@@ -0,0 +1,52 @@
+"""Add ESCO hybrid search indexes
+
+Revision ID: 9e0d2f9374b3
+Revises: 215e131f9cae
+Create Date: 2026-10-18 11:26:08.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e0d2f9374b3'
+down_revision: Union[str, Sequence[str], None] = '215e131f9cae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Stored generated tsvector: parsed once on write instead of per row on every query
+    op.execute("""
+        ALTER TABLE esco_skills
+        ADD COLUMN search_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', name || ' ' || coalesce(description, ''))) STORED
+    """)
+    op.create_index(
+        'ix_esco_skills_search_tsv',
+        'esco_skills',
+        ['search_tsv'],
+        unique=False,
+        postgresql_using='gin',
+    )
+    # HNSW requires pgvector >= 0.5.0
+    op.create_index(
+        'ix_esco_skills_embedding_hnsw',
+        'esco_skills',
+        ['embedding'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding': 'vector_l2_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_esco_skills_embedding_hnsw', table_name='esco_skills')
+    op.drop_index('ix_esco_skills_search_tsv', table_name='esco_skills')
+    op.drop_column('esco_skills', 'search_tsv')
@@ -0,0 +1,46 @@
+"""Add text embeddings cache
+
+Revision ID: a5c8e3f17d42
+Revises: d93a6f2c1e58
+Create Date: 2026-10-19 09:12:37.402916
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+import pgvector
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c8e3f17d42'
+down_revision: Union[str, Sequence[str], None] = 'd93a6f2c1e58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'text_embeddings',
+        sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('model', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('embedding', pgvector.sqlalchemy.vector.VECTOR(dim=384), nullable=False),
+        sa.Column('num_chunks', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash', 'model'),
+    )
+    op.add_column('resumes', sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index(op.f('ix_resumes_content_hash'), 'resumes', ['content_hash'], unique=False)
+    op.add_column('cv_versions', sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index(op.f('ix_cv_versions_content_hash'), 'cv_versions', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_cv_versions_content_hash'), table_name='cv_versions')
+    op.drop_column('cv_versions', 'content_hash')
+    op.drop_index(op.f('ix_resumes_content_hash'), table_name='resumes')
+    op.drop_column('resumes', 'content_hash')
+    op.drop_table('text_embeddings')
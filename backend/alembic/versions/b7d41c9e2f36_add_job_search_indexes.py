@@ -0,0 +1,44 @@
+"""Add job search indexes
+
+Revision ID: b7d41c9e2f36
+Revises: e6f1b0c3a927
+Create Date: 2026-10-18 16:42:19.306512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41c9e2f36'
+down_revision: Union[str, Sequence[str], None] = 'e6f1b0c3a927'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('company', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index(op.f('ix_jobs_company'), 'jobs', ['company'], unique=False)
+    op.create_index(op.f('ix_jobs_created_at'), 'jobs', ['created_at'], unique=False)
+    # Cosine ops: GET /jobs/search orders by embedding <=> query
+    op.create_index(
+        'ix_jobs_embedding_hnsw',
+        'jobs',
+        ['embedding'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding': 'vector_cosine_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_embedding_hnsw', table_name='jobs')
+    op.drop_index(op.f('ix_jobs_created_at'), table_name='jobs')
+    op.drop_index(op.f('ix_jobs_company'), table_name='jobs')
+    op.drop_column('jobs', 'company')
@@ -0,0 +1,34 @@
+"""Add embedding model key to resumes and jobs
+
+Revision ID: c2f7a9d14e63
+Revises: a5c8e3f17d42
+Create Date: 2026-10-19 14:03:51.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f7a9d14e63'
+down_revision: Union[str, Sequence[str], None] = 'a5c8e3f17d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL for existing vectors: the settings that produced them are unknown, so they are re-embedded
+    op.add_column('resumes', sa.Column('embedding_model', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('jobs', sa.Column('embedding_model', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index(op.f('ix_jobs_embedding_model'), 'jobs', ['embedding_model'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_jobs_embedding_model'), table_name='jobs')
+    op.drop_column('jobs', 'embedding_model')
+    op.drop_column('resumes', 'embedding_model')
@@ -0,0 +1,36 @@
+"""Add ESCO dataset versions
+
+Revision ID: c41a7e5b2d90
+Revises: 9e0d2f9374b3
+Create Date: 2026-10-18 14:02:37.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a7e5b2d90'
+down_revision: Union[str, Sequence[str], None] = '9e0d2f9374b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'esco_dataset_versions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('notes', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('imported_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('esco_dataset_versions')
@@ -0,0 +1,36 @@
+"""Add job ingestion columns
+
+Revision ID: d93a6f2c1e58
+Revises: b7d41c9e2f36
+Create Date: 2026-10-18 17:05:44.718203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd93a6f2c1e58'
+down_revision: Union[str, Sequence[str], None] = 'b7d41c9e2f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('jobs', sa.Column('source', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('jobs', sa.Column('last_seen_at', sa.DateTime(), nullable=True))
+    # Unique: the ingestion upsert is ON CONFLICT (content_hash)
+    op.create_index(op.f('ix_jobs_content_hash'), 'jobs', ['content_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_jobs_content_hash'), table_name='jobs')
+    op.drop_column('jobs', 'last_seen_at')
+    op.drop_column('jobs', 'source')
+    op.drop_column('jobs', 'content_hash')
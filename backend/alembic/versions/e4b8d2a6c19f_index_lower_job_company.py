@@ -0,0 +1,32 @@
+"""Index lower(company) on jobs
+
+Revision ID: e4b8d2a6c19f
+Revises: c2f7a9d14e63
+Create Date: 2026-10-19 15:27:08.644172
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b8d2a6c19f'
+down_revision: Union[str, Sequence[str], None] = 'c2f7a9d14e63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # GET /jobs/search filters on lower(company) = lower(:company); the plain index can't serve it
+    op.drop_index(op.f('ix_jobs_company'), table_name='jobs')
+    op.create_index('ix_jobs_company_lower', 'jobs', [sa.text('lower(company)')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_company_lower', table_name='jobs')
+    op.create_index(op.f('ix_jobs_company'), 'jobs', ['company'], unique=False)
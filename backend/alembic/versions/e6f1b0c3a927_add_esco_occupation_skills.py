@@ -0,0 +1,47 @@
+"""Add ESCO occupation skills and occupation embeddings
+
+Revision ID: e6f1b0c3a927
+Revises: 7d2c9a4e8b15
+Create Date: 2026-10-18 16:47:13.604281
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+import pgvector
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6f1b0c3a927'
+down_revision: Union[str, Sequence[str], None] = '7d2c9a4e8b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('esco_occupations', sa.Column('embedding', pgvector.sqlalchemy.vector.VECTOR(dim=768), nullable=True))
+    op.create_table(
+        'esco_occupation_skills',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('occupation_id', sa.Uuid(), nullable=False),
+        sa.Column('skill_id', sa.Uuid(), nullable=False),
+        sa.Column('relation_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.ForeignKeyConstraint(['occupation_id'], ['esco_occupations.id'], ),
+        sa.ForeignKeyConstraint(['skill_id'], ['esco_skills.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_esco_occupation_skills_occupation_id'), 'esco_occupation_skills', ['occupation_id'], unique=False)
+    op.create_index(op.f('ix_esco_occupation_skills_skill_id'), 'esco_occupation_skills', ['skill_id'], unique=False)
+    op.create_index(op.f('ix_esco_occupation_skills_relation_type'), 'esco_occupation_skills', ['relation_type'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_esco_occupation_skills_relation_type'), table_name='esco_occupation_skills')
+    op.drop_index(op.f('ix_esco_occupation_skills_skill_id'), table_name='esco_occupation_skills')
+    op.drop_index(op.f('ix_esco_occupation_skills_occupation_id'), table_name='esco_occupation_skills')
+    op.drop_table('esco_occupation_skills')
+    op.drop_column('esco_occupations', 'embedding')
@@ -1,7 +1,23 @@
 import json
+import re
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.agents.gemini_client import gemini_client
-from app.retrieval.graph_rag import fetch_skill_context
+from app.retrieval.esco_runtime import get_skill_extractor
+from app.retrieval.graph_rag import fetch_skill_context_many
+from app.retrieval.skill_extractor import SKILL_EXTRACTION_MODE
+
+MAX_KEYWORDS = 8
+
+
+def _split_keywords(keywords_str: str) -> list[str]:
+    """'Python, React\n- SQL' -> ['Python', 'React', 'SQL'] (deduplicated, capped)."""
+    keywords = []
+    for part in re.split(r"[,;\n]", keywords_str or ""):
+        keyword = part.strip().strip("-*•. ").strip()
+        if keyword and keyword.lower() not in {k.lower() for k in keywords}:
+            keywords.append(keyword)
+    return keywords[:MAX_KEYWORDS]
+
 
 async def analyze_cv_with_gemini(cv_text: str, session: AsyncSession) -> dict:
     """
@@ -10,15 +26,21 @@ async def analyze_cv_with_gemini(cv_text: str, session: AsyncSession) -> dict:
     3. Final gap analysis against general SWE roles
     """
     
-    # 1. Quick LLM call to extract top 3-5 keywords
-    extract_prompt = f"Extract the top 5 most important technical skills from this CV as a simple comma-separated list without extras:\n{cv_text[:2000]}"
-    try:
-        keywords_str = gemini_client.generate_content('gemini-2.5-flash', extract_prompt)
-    except Exception:
-        keywords_str = "Python, React, SQL"
+    # 1. Keyword extraction: most-mentioned skills tagged locally against ESCO;
+    #    the LLM call only runs in 'hybrid' / 'llm' SKILL_EXTRACTION_MODE
+    extractor = get_skill_extractor()
+    keywords = [] if SKILL_EXTRACTION_MODE == "llm" else extractor.extract(cv_text, limit=MAX_KEYWORDS, by_frequency=True)
+    if SKILL_EXTRACTION_MODE in ("hybrid", "llm"):
+        extract_prompt = f"Extract the top 5 most important technical skills from this CV as a simple comma-separated list without extras:\n{cv_text[:2000]}"
+        try:
+            keywords_str = gemini_client.generate_content('gemini-2.5-flash', extract_prompt)
+        except Exception:
+            keywords_str = ""
+        keywords = extractor.merge(keywords, _split_keywords(keywords_str))[:MAX_KEYWORDS]
         
-    # 2. Fetch Graph Context from ESCO
-    context = await fetch_skill_context(keywords_str, session, limit=5)
+    # 2. Fetch Graph Context from ESCO (one hybrid search per keyword, single round trip)
+    keywords = keywords or ["Python", "React", "SQL"]
+    context = await fetch_skill_context_many(keywords, session, limit=3)
     
     # 3. Final Gap Analysis Prompt
     system_instruction = f"""
@@ -46,4 +46,30 @@ class GeminiClient:
             print(f"Embedding error: {str(e)}")
             return [0.0] * 768
 
+    def embed_contents(self, model: str, contents: list[str], batch_size: int = 100, strict: bool = False) -> list[list[float]]:
+        """
+        Embed several texts with one API call per `batch_size` (the Gemini batch limit is 100).
+        Failed batches get zero vectors, or raise when `strict` (bulk loaders that must not store them).
+        """
+        if not self.client:
+            if strict:
+                raise RuntimeError("Gemini client is not configured (GOOGLE_API_KEY / GEMINI_API_KEY)")
+            return [[0.0] * 768 for _ in contents]
+
+        vectors = []
+        for start in range(0, len(contents), batch_size):
+            batch = contents[start:start + batch_size]
+            try:
+                response = self.client.models.embed_content(model=model, contents=batch)
+                embeddings = getattr(response, 'embeddings', None) or []
+                if len(embeddings) != len(batch):
+                    raise ValueError(f"expected {len(batch)} embeddings, got {len(embeddings)}")
+                vectors.extend(e.values for e in embeddings)
+            except Exception as e:
+                if strict:
+                    raise
+                print(f"Embedding error: {str(e)}")
+                vectors.extend([0.0] * 768 for _ in batch)
+        return vectors
+
 gemini_client = GeminiClient()
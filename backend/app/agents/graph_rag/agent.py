@@ -1,20 +1,76 @@
+import asyncio
+import hashlib
 import os
 import json
-from neo4j import GraphDatabase
+from typing import Optional
+from neo4j import AsyncGraphDatabase
 from app.agents.gemini_client import gemini_client
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.retrieval.esco_runtime import (
+    get_occupation_matcher, get_skill_closure, get_skill_extractor, get_skill_graph, get_skill_normalizer,
+)
+from app.retrieval.graph_cache import current_esco_version, expanded_skills_cache, occupation_cache, skill_set_key
+from app.retrieval.skill_extractor import SKILL_EXTRACTION_MODE
+from app.retrieval.skill_normalizer import SkillNormalizer
 
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password123")
 
+# Connection pool / fail-fast settings: one expansion query per request, so the pool
+# only needs to cover concurrent requests; an unreachable server trips the breaker.
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "20"))
+NEO4J_CONNECTION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_TIMEOUT", "3"))
+NEO4J_QUERY_TIMEOUT = float(os.getenv("NEO4J_QUERY_TIMEOUT", "5"))
+NEO4J_BREAKER_THRESHOLD = int(os.getenv("NEO4J_BREAKER_THRESHOLD", "3"))
+NEO4J_BREAKER_RESET_SECONDS = float(os.getenv("NEO4J_BREAKER_RESET_SECONDS", "30"))
+
+# The JD is embedded once to resolve its ESCO occupation (occupation_matcher.py)
+JD_EMBEDDING_MODEL = "text-embedding-004"
+JD_EMBEDDING_MAX_CHARS = int(os.getenv("JD_EMBEDDING_MAX_CHARS", "8000"))
+_UNRESOLVED = object()
+
+# ESCO Relationships, expanded for every skill in one round trip:
+# 1. Skill -> RELATED_TO -> Skill
+# 2. Skill -> broaderSkill -> Skill (Implied from the hierarchy)
+EXPANSION_QUERY = """
+UNWIND $skills AS skill
+MATCH (s:Skill) WHERE toLower(s.name) = skill
+MATCH (s)-[:RELATED_TO|broaderSkill*1..2]->(r:Skill)
+WITH skill, collect(DISTINCT r.name)[..20] AS related
+RETURN skill, related
+"""
+
 class GraphRAGAgent:
     def __init__(self):
-        self.driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        self.driver = AsyncGraphDatabase.driver(
+            NEO4J_URI,
+            auth=(NEO4J_USER, NEO4J_PASSWORD),
+            max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+            connection_timeout=NEO4J_CONNECTION_TIMEOUT,
+            connection_acquisition_timeout=NEO4J_QUERY_TIMEOUT,
+        )
+        self.neo4j_breaker = CircuitBreaker(
+            "neo4j",
+            failure_threshold=NEO4J_BREAKER_THRESHOLD,
+            reset_timeout=NEO4J_BREAKER_RESET_SECONDS,
+        )
 
-    def close(self):
-        self.driver.close()
+    async def close(self):
+        await self.driver.close()
 
     def extract_job_skills(self, job_description: str) -> list[str]:
+        """
+        Required skills from the job description, tagged locally against the ESCO
+        dictionary; Gemini is only called in 'hybrid' / 'llm' SKILL_EXTRACTION_MODE.
+        """
+        extractor = get_skill_extractor()
+        skills = [] if SKILL_EXTRACTION_MODE == "llm" else extractor.extract(job_description)
+        if SKILL_EXTRACTION_MODE in ("hybrid", "llm"):
+            skills = extractor.merge(skills, self._extract_job_skills_llm(job_description))
+        return skills
+
+    def _extract_job_skills_llm(self, job_description: str) -> list[str]:
         """Use Gemini to extract a list of required skills from the job description."""
         system_instruction = '''
         You are an expert IT recruiter. Extract a JSON list of required skills from the job description.
@@ -31,44 +87,124 @@ class GraphRAGAgent:
         
         try:
             clean_text = response_text.replace("```json", "").replace("```", "").strip()
-            return json.loads(clean_text)
+            skills = json.loads(clean_text)
+            return [s for s in skills if isinstance(s, str)] if isinstance(skills, list) else []
         except Exception as e:
             print(f"Error extracting JD skills: {e}")
             return []
 
-    def get_expanded_skills(self, skills: list[str]) -> set[str]:
+    async def get_expanded_skills(self, skills: list[str]) -> set[str]:
         """
-        Query Neo4j to find related or implied skills.
+        Find related or implied skills (RELATED_TO / broaderSkill, up to 2 hops).
         If the candidate has 'React', they implicitly know 'JavaScript'.
+        Uses the in-memory ESCO graph when loaded, otherwise one batched Neo4j query.
+        Related names are cached per canonical skill set and ESCO dataset version.
         """
         expanded = set(s.lower() for s in skills)
-        
+        if not skills:
+            return expanded
+
+        normalizer = get_skill_normalizer()
+        cache_key = skill_set_key("expanded", normalizer.canonicalize(skills), await current_esco_version())
+        related = expanded_skills_cache.get(cache_key)
+        if related is None:
+            related = await self._related_skills(skills, normalizer)
+            if related is not None:
+                expanded_skills_cache.set(cache_key, related)
+        expanded.update(related or ())
+        return expanded
+
+    async def _related_skills(self, skills: list[str], normalizer: SkillNormalizer) -> Optional[frozenset[str]]:
+        """Lower-cased names up to 2 hops from `skills`; None if no graph source answered."""
+        skill_graph = get_skill_graph()
+        if skill_graph is not None:
+            seeds = normalizer.esco_ids(skills)
+            return frozenset(name.lower() for name in skill_graph.names_for(skill_graph.k_hop(seeds, k=2)))
+
         try:
-            with self.driver.session() as session:
-                for skill in skills:
-                    # ESCO Relationships: 
-                    # 1. Skill -> RELATED_TO -> Skill
-                    # 2. Skill -> broaderSkill -> Skill (Implied from the hierarchy)
-                    query = """
-                    MATCH (s:Skill)-[:RELATED_TO|broaderSkill*1..2]->(r:Skill)
-                    WHERE toLower(s.name) = toLower($skill)
-                    RETURN DISTINCT r.name AS related_skill
-                    LIMIT 20
-                    """
-                    result = session.run(query, skill=skill)
-                    for record in result:
-                        expanded.add(record["related_skill"].lower())
+            return frozenset(await self.neo4j_breaker.call(self._expand_with_neo4j, skills, timeout=NEO4J_QUERY_TIMEOUT))
+        except CircuitOpenError:
+            pass  # Neo4j recently unreachable; already logged when the circuit opened
         except Exception as e:
             print(f"Warning: Neo4j not reachable. Graph expansion skipped. (Error: {e})")
+        return None
 
-        return expanded
+    async def _expand_with_neo4j(self, skills: list[str]) -> set[str]:
+        async with self.driver.session() as session:
+            result = await session.run(EXPANSION_QUERY, skills=[s.lower() for s in skills])
+            records = await result.data()
+        return {name.lower() for record in records for name in record["related"]}
+
+    async def get_implied_matches(self, candidate_skills: list[str], required_skills: list[str]) -> list[bool]:
+        """
+        For each required skill: does the candidate have it, directly or implied?
+        Skills are compared as canonical ids ("ReactJS" == "React.js" == "React").
+        Uses the precomputed closure bitsets when loaded, otherwise expands at request time.
+        """
+        normalizer = get_skill_normalizer()
+        candidate_ids = set(normalizer.canonicalize(candidate_skills))
+        required_ids = normalizer.canonicalize(required_skills)
+
+        skill_graph, closure = get_skill_graph(), get_skill_closure()
+        if skill_graph is None or closure is None:
+            expanded = await self.get_expanded_skills(candidate_skills)
+            candidate_ids.update(normalizer.canonicalize(expanded))
+            return [req_id in candidate_ids for req_id in required_ids]
+
+        implied = closure.implied(i for i in candidate_ids if 0 <= i < closure.num_nodes)
+        return [
+            req_id in candidate_ids
+            or (0 <= req_id < closure.num_nodes and bool(closure.contains(implied, [req_id])[0]))
+            for req_id in required_ids
+        ]
+
+    async def resolve_occupation(self, job_description: str):
+        """
+        Best-matching ESCO occupation for the JD, or None (matcher not loaded, embedding failed, no close match).
+        Cached per JD text and matcher, so a JD seen before costs no embedding call.
+        """
+        matcher = get_occupation_matcher()
+        if matcher is None or not job_description:
+            return None
+        text = job_description[:JD_EMBEDDING_MAX_CHARS]
+        cache_key = (hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest(), id(matcher))
+        cached = occupation_cache.get(cache_key, _UNRESOLVED)
+        if cached is not _UNRESOLVED:
+            return cached
+        vector = await asyncio.to_thread(gemini_client.embed_content, JD_EMBEDDING_MODEL, text)
+        [hits] = matcher.resolve([vector], k=1)
+        hit = hits[0] if hits else None
+        # A failed embedding (zero vector) is retried next time
+        if hit is not None or any(vector):
+            occupation_cache.set(cache_key, hit)
+        return hit
+
+    async def occupation_gaps(self, candidate_skills: list[str], occupation) -> dict:
+        """Weighted coverage of the occupation's essential / optional skills and the essential ones missing."""
+        matcher = get_occupation_matcher()
+        required = matcher.required_skills(occupation.id)
+        matches = await self.get_implied_matches(candidate_skills, [s.name for s in required]) if required else []
+        total = sum(s.weight for s in required)
+        covered = sum(s.weight for s, is_match in zip(required, matches) if is_match)
+        return {
+            "occupation": {
+                "uri": occupation.uri,
+                "name": occupation.name,
+                "similarity": occupation.similarity,
+                "coverage": round(covered / total, 2) if total else 0.0,
+            },
+            "occupation_gaps": [
+                s.name for s, is_match in zip(required, matches) if not is_match and s.relation_type == "essential"
+            ],
+        }
 
     async def run(self, candidate_profile: dict, job_description: str) -> dict:
         """
         Main pipeline method:
-        1. Extract skills from JD.
-        2. Expand candidate skills using Neo4j.
-        3. Compare and compute score/gaps.
+        1. Extract skills from JD (local extractor, optional LLM enrichment) and resolve
+           its ESCO occupation; the occupation's essential skills stand in when none are extracted.
+        2. Expand candidate skills using the ESCO graph (closure, in-memory graph or Neo4j).
+        3. Compare and compute score/gaps (plus coverage of the occupation's skill profile).
         """
         if not candidate_profile:
             candidate_profile = {}
@@ -77,20 +213,24 @@ class GraphRAGAgent:
         if not isinstance(candidate_skills, list):
             candidate_skills = []
             
-        required_skills = self.extract_job_skills(job_description)
+        # Gemini is called synchronously in hybrid / llm SKILL_EXTRACTION_MODE: keep it off the event loop
+        required_skills = await asyncio.to_thread(self.extract_job_skills, job_description)
+        occupation = await self.resolve_occupation(job_description)
+        if not required_skills and occupation is not None:
+            required_skills = [
+                s.name for s in get_occupation_matcher().required_skills(occupation.id) if s.relation_type == "essential"
+            ]
         if not required_skills:
             return {"skill_gaps": [], "skill_match_score": 0.0}
 
-        # Expand candidate skills with graph knowledge
-        candidate_expanded_skills = self.get_expanded_skills(candidate_skills)
+        # Direct or implied (via graph knowledge) match per required skill
+        implied_matches = await self.get_implied_matches(candidate_skills, required_skills)
         
         gaps = []
         matched_count = 0
         
-        for req_skill in required_skills:
-            req_lower = req_skill.lower()
-            # Direct match or implied match
-            if req_lower in candidate_expanded_skills:
+        for req_skill, is_match in zip(required_skills, implied_matches):
+            if is_match:
                 matched_count += 1
             else:
                 gaps.append(req_skill)
@@ -101,10 +241,13 @@ class GraphRAGAgent:
         else:
             score = 0.0
             
-        return {
+        result = {
             "skill_gaps": gaps,
             "skill_match_score": score
         }
+        if occupation is not None:
+            result.update(await self.occupation_gaps(candidate_skills, occupation))
+        return result
 
 graph_agent_instance = GraphRAGAgent()
 
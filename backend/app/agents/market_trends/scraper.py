@@ -1,6 +1,7 @@
 import requests
 from bs4 import BeautifulSoup
 import re
+from app.retrieval.esco_runtime import get_skill_normalizer
 
 def scrape_topjobs_software_vacancies():
     """
@@ -56,10 +57,24 @@ def scrape_topjobs_software_vacancies():
 
 def get_jobs_for_skill(skill, all_jobs=None):
     """
-    Filters cached/fresh jobs for a specific skill (fuzzy match).
+    Filters cached/fresh jobs for a specific skill.
+    Known skills match by canonical id (so "ReactJS" finds "React.js Developer");
+    anything else (e.g. a job title) falls back to fuzzy keyword matching.
     """
     if all_jobs is None:
         all_jobs = scrape_topjobs_software_vacancies()
+
+    normalizer = get_skill_normalizer()
+    skill_id = normalizer.lookup(skill)
+    if skill_id is not None:
+        matches = []
+        for j in all_jobs:
+            # Mentions are computed once per scraped job and reused across skills
+            if "skill_ids" not in j:
+                j["skill_ids"] = normalizer.mentions(f"{j['title']} {j['company']}")
+            if skill_id in j["skill_ids"]:
+                matches.append(f"{j['title']} at {j['company']}")
+        return matches
         
     skill_lower = skill.lower()
     keywords = [k.strip() for k in skill_lower.split() if len(k.strip()) > 2]
@@ -0,0 +1,76 @@
+"""
+Minimal async circuit breaker for optional backing services (Neo4j, ...).
+
+After `failure_threshold` consecutive failures the circuit opens and calls
+fail immediately with CircuitOpenError for `reset_timeout` seconds. Then a
+single trial call is let through (half-open): success closes the circuit,
+failure re-opens it.
+
+Usage:
+    neo4j_breaker = CircuitBreaker("neo4j", failure_threshold=3, reset_timeout=30)
+    rows = await neo4j_breaker.call(fetch_rows, skills, timeout=2.0)
+"""
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import anyio
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._trial_in_flight:
+                print(f"[CircuitBreaker] {self.name} circuit opened after {self.failures} failure(s)")
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        try:
+            with anyio.fail_after(timeout):
+                result = await fn(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Cancelled: not the service's fault, but a half-open trial must give its slot back
+            self._trial_in_flight = False
+            raise
+        self.record_success()
+        return result
@@ -0,0 +1,29 @@
+"""
+Response compression that never touches Server-Sent Events.
+
+GZipMiddleware buffers its compressor output, so a compressed SSE stream
+reaches the client in large delayed chunks instead of one event at a time.
+Starlette only skips `text/event-stream` responses in newer releases; this
+wrapper skips them on every version: requests to EXCLUDED_PATHS, and any
+request that accepts `text/event-stream`, bypass compression entirely.
+
+Usage:
+    app.add_middleware(StreamingSafeGZipMiddleware, minimum_size=1000)
+"""
+import re
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import Receive, Scope, Send
+
+# Streaming endpoints served uncompressed: /api/pipeline/{id}/events
+EXCLUDED_PATHS = re.compile(r"^/api/pipeline/[^/]+/events/?$")
+
+
+class StreamingSafeGZipMiddleware(GZipMiddleware):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not EXCLUDED_PATHS.match(scope.get("path", "")):
+            headers = dict(scope.get("headers") or [])
+            if b"text/event-stream" not in headers.get(b"accept", b""):
+                await super().__call__(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -0,0 +1,54 @@
+"""
+Conditional GET helpers — ETags and 304 Not Modified responses.
+
+Responses that may be gzip-compressed (GZipMiddleware) use weak ETags: the
+same tag is sent for the compressed and the identity body, which a strong
+ETag must not be. If-None-Match uses weak comparison, so a client sending
+either form gets its 304.
+
+Usage:
+    etag = weak_etag(run.id, run.updated_at.isoformat())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return Response(body, headers=cache_headers(etag))
+"""
+import hashlib
+from typing import Optional
+from fastapi import Response
+
+# Clients must revalidate every time, but may reuse the body on a 304
+CACHE_CONTROL = "private, no-cache"
+
+
+def strong_etag(*parts) -> str:
+    """Hash the given version markers (or raw body bytes) into a quoted strong ETag."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\x00")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def weak_etag(*parts) -> str:
+    """`strong_etag` marked weak (W/), for bodies sent in more than one content encoding."""
+    return f"W/{strong_etag(*parts)}"
+
+
+def _opaque(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if the If-None-Match header lists `etag` (or is `*`), compared weakly."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or _opaque(etag) in {_opaque(c) for c in candidates}
+
+
+def cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -1,5 +1,7 @@
 import asyncio
+import os
 from datetime import datetime
+from typing import Optional
 from app.graph.state import AgentState
 from app.agents.cv_critique.agent import analyze_cv_with_gemini
 from app.agents.cv_creator.agent import cv_creator_agent
@@ -9,7 +11,14 @@ from app.agents.job_classifier_agent import JobClassifierAgent
 from app.agents.market_trends.market_connector_agent import MarketConnectorAgent
 from app.agents.roadmap_agent import RoadmapAgent
 from app.agents.interview_prep.agent import generate_interview_questions
-from app.agents.graph_rag.agent import graph_rag_agent
+from app.agents.graph_rag.agent import graph_agent_instance, graph_rag_agent
+from app.retrieval.esco_runtime import get_skill_extractor, get_skill_graph, get_skill_normalizer
+from app.retrieval.skill_scoring import SkillScorer
+
+# Stage 4: "auto" tiers locally from skill coverage when the JD names enough skills, else asks the LLM;
+# "local" / "llm" force one path
+TIER_CLASSIFICATION_MODE = os.getenv("TIER_CLASSIFICATION_MODE", "auto").lower()
+TIER_MIN_REQUIRED_SKILLS = int(os.getenv("TIER_MIN_REQUIRED_SKILLS", "3"))
 
 
 # ── STAGE 1: INGEST ──────────────────────────────────────────────────────────
@@ -86,10 +95,10 @@ async def analyse_node(state: AgentState) -> dict:
         updates["error_log"].append(f"Stage 2 GraphRAGAgent failed: {graphrag_result}")
         updates["messages"].append("Stage 2: GraphRAG failed — continuing")
     else:
-        updates["skill_match_score"] = graphrag_result.get("final_score")
+        updates["skill_match_score"] = graphrag_result.get("skill_match_score")
         updates["skill_gaps"] = graphrag_result.get("skill_gaps", [])
         updates["implicit_skills"] = graphrag_result.get("implicit_skills", [])
-        updates["messages"].append(f"Stage 2: Skill Match Score = {graphrag_result.get('final_score')}")
+        updates["messages"].append(f"Stage 2: Skill Match Score = {graphrag_result.get('skill_match_score')}")
     
     # Market result
     if isinstance(market_result, Exception):
@@ -110,8 +119,9 @@ async def _run_ats(cv_raw: str, job_description: str) -> dict:
     return await agent.run(cv_raw, job_description)
 
 async def _run_graphrag(cv_raw: str, job_description: str) -> dict:
-    # graph_rag_agent may be sync — wrap if needed
-    return await asyncio.to_thread(graph_rag_agent, cv_raw, job_description)
+    # graph_rag_agent is async (Neo4j expansion is non-blocking); skill extraction may call the LLM in hybrid/llm mode
+    candidate_skills = await asyncio.to_thread(graph_agent_instance.extract_job_skills, cv_raw)
+    return await graph_rag_agent({"skills": candidate_skills}, job_description)
 
 async def _run_market(job_description: str) -> dict:
     agent = MarketConnectorAgent()
@@ -173,11 +183,35 @@ async def optimise_node(state: AgentState) -> dict:
 
 # ── STAGE 4: CLASSIFY ─────────────────────────────────────────────────────────
 
+def _local_tier(cv_raw: str, job_description: str) -> Optional[tuple[str, float]]:
+    """(tier, coverage) from deterministic ESCO skill coverage, or None if the JD names too few skills."""
+    extractor = get_skill_extractor()
+    required = extractor.extract(job_description)
+    if TIER_CLASSIFICATION_MODE != "local" and len(required) < TIER_MIN_REQUIRED_SKILLS:
+        return None
+    result = SkillScorer(get_skill_normalizer(), get_skill_graph()).score(extractor.extract(cv_raw), [required])
+    return result.tiers[0], float(result.coverage[0])
+
+
 async def classify_node(state: AgentState) -> dict:
-    """Stage 4: Classify job match tier based on skill match score from GraphRAG."""
+    """Stage 4: Classify job match tier from skill coverage (LLM classifier as fallback)."""
     print(f"[Stage 4] CLASSIFY")
     
     error_log = list(state.get("error_log", []))
+
+    if TIER_CLASSIFICATION_MODE != "llm":
+        try:
+            local = await asyncio.to_thread(_local_tier, state.get("cv_raw", ""), state.get("job_description", ""))
+            if local is not None:
+                tier, coverage = local
+                return {
+                    "job_tier": tier,
+                    "current_stage": 4,
+                    "error_log": error_log,
+                    "messages": [f"Stage 4: Job tier = {tier} (skill coverage {coverage:.2f})"]
+                }
+        except Exception as e:
+            error_log.append(f"Stage 4 local skill scoring failed: {e}")
     
     try:
         agent = JobClassifierAgent()
@@ -1,6 +1,9 @@
 import sys
 import asyncio
+import asyncpg
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
@@ -15,9 +18,40 @@ from app.routers import matcher
 from app.routers import interview
 
 # Import models so SQLModel creates the tables
-from app.models import user, resume, job, profile, task_state, pipeline, cv_history, job_market, interview_roadmap, preference, esco  # noqa: F401
-
-app = FastAPI(title="AI Career Partner")
+from app.models import user, resume, job, profile, task_state, pipeline, cv_history, job_market, interview_roadmap, preference, esco, text_embedding  # noqa: F401
+
+from app.agents.graph_rag.agent import graph_agent_instance
+from app.core.compression import StreamingSafeGZipMiddleware
+from app.core.database import DATABASE_URL
+from app.retrieval.esco_loader import asyncpg_dsn
+from app.services.pipeline_events import PostgresEventBridge, pipeline_events
+from app.services.embedding_service import embedding_service
+from app.retrieval.esco_runtime import get_skill_graph, load_local_skill_search, load_occupation_matcher, load_skill_graph
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Embedding model load + warm-up in the background; /health/ready reports 503 until it is done
+    await embedding_service.start()
+    # In-memory ESCO graph for skill expansion (falls back to Neo4j / SQL if unavailable)
+    await load_skill_graph()
+    # In-process hybrid skill search over the ESCO embeddings (falls back to Postgres)
+    await load_local_skill_search()
+    # JD -> ESCO occupation resolver with precomputed essential / optional skills
+    await load_occupation_matcher()
+    # Pipeline events published by other workers reach this worker's SSE clients via LISTEN/NOTIFY
+    events_bridge = PostgresEventBridge(pipeline_events, lambda: asyncpg.connect(asyncpg_dsn(DATABASE_URL)))
+    try:
+        await events_bridge.start()
+    except Exception as e:
+        print(f"[Events] LISTEN unavailable, SSE only sees runs on this worker: {e}")
+    yield
+    await events_bridge.close()
+    await graph_agent_instance.close()
+    await embedding_service.close()
+
+
+app = FastAPI(title="AI Career Partner", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,8 +59,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Compress large JSON payloads (cover letters, roadmaps, full pipeline state); SSE streams stay uncompressed
+app.add_middleware(StreamingSafeGZipMiddleware, minimum_size=1000)
+
 # Include the Auth Router
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(cv.router, prefix="/cv", tags=["CV Operations"])
@@ -58,4 +96,19 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # Root endpoint (Trigger Reload)
 @app.get("/")
 async def root():
-    return {"message": "System Online. Go to /static/demo.html for the Agent Demo."}
\ No newline at end of file
+    return {"message": "System Online. Go to /static/demo.html for the Agent Demo."}
+
+@app.get("/health/live")
+async def liveness():
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+async def readiness():
+    """503 until the embedding model is loaded and warm, so no traffic is routed to a cold worker."""
+    model = embedding_service.readiness()
+    body = {
+        "status": "ready" if model in ("ready", "lazy") else model,
+        "embedding_model": model,
+        "skill_graph": "loaded" if get_skill_graph() is not None else "unavailable",
+    }
+    return JSONResponse(body, status_code=200 if body["status"] == "ready" else 503)
\ No newline at end of file
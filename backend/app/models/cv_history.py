@@ -10,6 +10,8 @@ class CVVersion(SQLModel, table=True):
     user_id: uuid.UUID = Field(foreign_key="users.id", ondelete="CASCADE")
     version_number: int = Field(nullable=False)
     cv_text: str = Field(nullable=False)
+    # Hash of cv_text; the version's embedding is the text_embeddings row with this hash
+    content_hash: Optional[str] = Field(default=None, index=True)
     ats_score: Optional[int] = None
     match_score: Optional[float] = None
     job_target: Optional[str] = None
@@ -1,9 +1,14 @@
 from sqlmodel import SQLModel, Field
 from typing import Optional
-from sqlalchemy import Column
+from datetime import datetime
+from sqlalchemy import Column, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 import uuid
 from pgvector.sqlalchemy import Vector
 
+# Text indexed for keyword search; must match the generated column in the migration
+ESCO_SEARCH_TEXT = "to_tsvector('english', name || ' ' || coalesce(description, ''))"
+
 class EscoSkillBase(SQLModel):
     name: str = Field(index=True)
     description: Optional[str] = None
@@ -12,10 +17,30 @@ class EscoSkillBase(SQLModel):
 
 class EscoSkill(EscoSkillBase, table=True):
     __tablename__ = "esco_skills"
+    __table_args__ = (
+        # ANN index for `ORDER BY embedding <-> :vector` (L2 distance)
+        Index(
+            "ix_esco_skills_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_l2_ops"},
+        ),
+        Index("ix_esco_skills_search_tsv", "search_tsv", postgresql_using="gin"),
+    )
     
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    # ESCO concept URI; rows loaded from the ESCO export use uuid5(URL, uri) as id
+    uri: Optional[str] = Field(default=None, unique=True, index=True)
+    # Hash of the imported fields, compared by scripts/diff_import_esco.py
+    content_hash: Optional[str] = None
     # Gemini text-embedding-004 has 768 dimensions
     embedding: Optional[list[float]] = Field(default=None, sa_column=Column(Vector(768)))
+    # Stored generated tsvector, so keyword search never re-parses text per row
+    search_tsv: Optional[str] = Field(
+        default=None,
+        sa_column=Column(TSVECTOR, Computed(ESCO_SEARCH_TEXT, persisted=True)),
+    )
 
 class EscoRelationBase(SQLModel):
     source_skill_id: uuid.UUID = Field(foreign_key="esco_skills.id", index=True)
@@ -26,3 +51,32 @@ class EscoRelation(EscoRelationBase, table=True):
     __tablename__ = "esco_relations"
     
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+
+class EscoOccupation(SQLModel, table=True):
+    __tablename__ = "esco_occupations"
+
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    uri: str = Field(unique=True, index=True)
+    name: str = Field(index=True)
+    description: Optional[str] = None
+    isco_code: Optional[str] = Field(default=None, index=True)
+    content_hash: Optional[str] = None
+    # Embedding of name + description, for resolving a job description to occupations
+    embedding: Optional[list[float]] = Field(default=None, sa_column=Column(Vector(768)))
+
+class EscoOccupationSkill(SQLModel, table=True):
+    __tablename__ = "esco_occupation_skills"
+
+    id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    occupation_id: uuid.UUID = Field(foreign_key="esco_occupations.id", index=True)
+    skill_id: uuid.UUID = Field(foreign_key="esco_skills.id", index=True)
+    relation_type: str = Field(index=True)  # 'essential' or 'optional'
+
+class EscoDatasetVersion(SQLModel, table=True):
+    """One row per ESCO import; the latest id versions every cache derived from ESCO data."""
+    __tablename__ = "esco_dataset_versions"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    source: str  # importer that produced it, e.g. 'seed_esco', 'import_esco'
+    notes: Optional[str] = None
+    imported_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import Index
 from sqlalchemy.dialects.postgresql import JSONB
 from typing import Optional, Dict, Any, List
 from datetime import datetime
@@ -6,6 +7,14 @@ import uuid
 
 class InterviewSession(SQLModel, table=True):
     __tablename__ = "interview_sessions"
+    __table_args__ = (
+        # Covering index for the score trend: answered without reading the JSONB columns
+        Index(
+            "ix_interview_sessions_user_completed",
+            "user_id", "completed_at",
+            postgresql_include=["overall_score"],
+        ),
+    )
 
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="users.id", ondelete="CASCADE")
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import Index, text
 from typing import Optional
 from datetime import datetime
 import uuid
@@ -6,12 +7,25 @@ from pgvector.sqlalchemy import Vector
 
 class Job(SQLModel, table=True):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # GET /jobs/search: case-insensitive company equality
+        Index("ix_jobs_company_lower", text("lower(company)")),
+    )
 
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     title: str
+    company: Optional[str] = None
     description_text: str
     
     # Store the vector embedding of the job description
+    # (HNSW index with cosine ops: GET /jobs/search)
     embedding: Optional[list[float]] = Field(default=None, sa_column=Column(Vector(384)))
+    # EMBEDDING_KEY the embedding was made with; search only compares vectors under the current key
+    embedding_model: Optional[str] = Field(default=None, index=True)
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+    # Ingested postings (services/job_ingestion.py): deduped by content hash, refreshed when seen again
+    content_hash: Optional[str] = Field(default=None, unique=True, index=True)
+    source: Optional[str] = None
+    last_seen_at: Optional[datetime] = None
\ No newline at end of file
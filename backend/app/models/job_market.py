@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import Index, text
 from sqlalchemy.dialects.postgresql import JSONB
 from typing import Optional, List
 from datetime import datetime
@@ -6,6 +7,13 @@ import uuid
 
 class JobMatch(SQLModel, table=True):
     __tablename__ = "job_matches"
+    __table_args__ = (
+        # Dashboard top-N: a pipeline's cards in tier, then descending score, order
+        Index(
+            "ix_job_matches_user_pipeline_tier_score",
+            "user_id", "pipeline_id", "tier_rank", text("match_score DESC"), "rank",
+        ),
+    )
 
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="users.id", ondelete="CASCADE")
@@ -14,6 +22,11 @@ class JobMatch(SQLModel, table=True):
     company: Optional[str] = None
     match_score: Optional[float] = None
     tier: Optional[str] = None # 'Realistic', 'Stretch', 'Reach'
+    tier_rank: Optional[int] = None # 0 = Realistic, 1 = Stretch, 2 = Reach
+    rank: Optional[int] = None # Position in the pipeline's ranked card list
+    card_key: Optional[str] = None
+    market_status: Optional[str] = None
+    source_skill: Optional[str] = None
     missing_skills: List[str] = Field(default=[], sa_column=Column(JSONB))
     salary_min: Optional[int] = None
     salary_max: Optional[int] = None
@@ -41,4 +41,6 @@ class PipelineRun(SQLModel, table=True):
     state_json: dict = Field(default={}, sa_column=Column(JSONB, nullable=False))
     error_log: List[str] = Field(default=[], sa_column=Column(JSONB))
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Row version for ETags — bumped whenever state_json changes
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
     completed_at: Optional[datetime] = None
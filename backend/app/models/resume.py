@@ -16,5 +16,9 @@ class Resume(SQLModel, table=True):
     # This stores the "meaning" of the CV as numbers (for Job Matching)
     # We use 384 dimensions because that's what the 'all-MiniLM-L6-v2' model uses
     embedding: Optional[list[float]] = Field(default=None, sa_column=Column(Vector(384)))
+    # Hash of content_text: identical uploads share one row in text_embeddings
+    content_hash: Optional[str] = Field(default=None, index=True)
+    # EMBEDDING_KEY the embedding was made with; any other key means it is re-embedded before use
+    embedding_model: Optional[str] = None
     
     created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
@@ -0,0 +1,16 @@
+from sqlmodel import SQLModel, Field, Column
+from datetime import datetime
+from pgvector.sqlalchemy import Vector
+
+# Embeddings by text content, shared by resumes, CV versions and jobs (services/embedding_store.py)
+class TextEmbedding(SQLModel, table=True):
+    __tablename__ = "text_embeddings"
+
+    # blake2b of the embedded text; resumes.content_hash / cv_versions.content_hash point here
+    content_hash: str = Field(primary_key=True)
+    # Model and chunking/pooling settings the vector was computed with (EMBEDDING_KEY)
+    model: str = Field(primary_key=True)
+    embedding: list[float] = Field(sa_column=Column(Vector(384), nullable=False))
+    # Number of chunks pooled into the vector (1 for texts within the model's input limit)
+    num_chunks: int = 1
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,5 +1,7 @@
 import asyncio
+import uuid
 from datetime import datetime
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 
@@ -7,8 +9,12 @@ from app.graph.graph import build_graph
 from app.graph.state import AgentState
 from app.models.pipeline import PipelineRun, PipelineState
 from app.models.cv_history import CVVersion
-from app.models.job_market import JobMatch, SalaryBenchmark
+from app.models.job_market import SalaryBenchmark
 from app.models.interview_roadmap import SkillRoadmap
+from app.services.pipeline_events import event_type_for, pipeline_events, TERMINAL_STATUSES
+from app.services.dashboard_cache import invalidate_dashboard
+from app.services.job_cards import build_job_cards_from_market, job_matches_from_cards
+from app.services.embedding_store import get_or_embed, text_hash
 
 class MasterOrchestratorAgent:
 
@@ -45,6 +51,12 @@ class MasterOrchestratorAgent:
         
         pipeline_id = str(run.id)
         initial_state["pipeline_id"] = pipeline_id
+        invalidate_dashboard(user_id)
+        pipeline_events.publish(pipeline_id, "STATE_UPDATE", {
+            "status": "running",
+            "current_stage": 1,
+            "messages": [],
+        })
 
         # Fire and forget
         task = asyncio.create_task(
@@ -58,20 +70,20 @@ class MasterOrchestratorAgent:
 
     async def resume_pipeline(self, pipeline_id: str) -> str:
         """Resume an interrupted pipeline from its last completed node."""
-        task = asyncio.create_task(self._resume_graph_task(pipeline_id))
+        run_id = uuid.UUID(str(pipeline_id))
+        # Re-opens the run's event log; per-node and final events follow as on a fresh run
+        pipeline_events.publish(run_id, "STATE_UPDATE", {"status": "running", "messages": []})
+        task = asyncio.create_task(self._run_graph(run_id, None))
         task.add_done_callback(lambda t: (
             print(f"[RESUME ERROR] {t.exception()}") if t.exception() else None
         ))
         return pipeline_id
 
-    async def _resume_graph_task(self, pipeline_id: str):
-        async with AsyncPostgresSaver.from_conn_string(self.db_url) as checkpointer:
-            graph = build_graph(checkpointer=checkpointer)
-            config = {"configurable": {"thread_id": pipeline_id}}
-            await graph.ainvoke(None, config=config)
-
-    async def _run_graph(self, run_id, initial_state: AgentState):
-        """Background execution — runs the LangGraph pipeline and persists results."""
+    async def _run_graph(self, run_id, initial_state: Optional[AgentState]):
+        """
+        Background execution — runs the LangGraph pipeline and persists results.
+        With no initial state the run continues from its last checkpoint (resume).
+        """
         from app.core.database import async_session
         
         async with async_session() as session:
@@ -105,17 +117,33 @@ class MasterOrchestratorAgent:
                     run.status = final.get("status", "completed")
                     run.current_stage = final.get("current_stage", 7)
                     run.completed_at = datetime.utcnow()
+                    run.updated_at = run.completed_at
                     run.state_json = dict(final)
                     session.add(run)
                     await session.commit()
+                    invalidate_dashboard(run.user_id)
+
+                    pipeline_events.publish(run_id, event_type_for(run.status), {
+                        "status": run.status,
+                        "current_stage": run.current_stage,
+                        "messages": [],
+                    }, close=run.status in TERMINAL_STATUSES)
                 
             except Exception as e:
                 import traceback
                 traceback.print_exc()
                 run.status = "failed"
-                run.state_json["error_log"] = run.state_json.get("error_log", []) + [str(e)]
+                run.updated_at = datetime.utcnow()
+                run.state_json = {**run.state_json, "error_log": run.state_json.get("error_log", []) + [str(e)]}
                 session.add(run)
                 await session.commit()
+                invalidate_dashboard(run.user_id)
+
+                pipeline_events.publish(run_id, "FAILED", {
+                    "status": "failed",
+                    "current_stage": run.current_stage,
+                    "error": str(e),
+                }, close=True)
 
     async def _sync_state(self, run: PipelineRun, node_output: dict):
         """Update pipeline_runs row and broadcast WebSocket after each node completes."""
@@ -126,20 +154,26 @@ class MasterOrchestratorAgent:
         
         # Merge node output into existing state_json
         run.state_json = {**run.state_json, **node_output}
+        run.updated_at = datetime.utcnow()
         self.session.add(run)
         await self.session.commit()
+        invalidate_dashboard(run.user_id)
+
+        payload = {
+            "type": "STATE_UPDATE",
+            "status": node_output.get("status", "running"),
+            "current_stage": node_output.get("current_stage"),
+            "messages": node_output.get("messages", [])
+        }
+
+        # Append to the in-process event log (served over SSE)
+        pipeline_events.publish(run.id, "STATE_UPDATE", {k: v for k, v in payload.items() if k != "type"})
         
         # Broadcast WebSocket
         try:
             from app.routers.pipeline import manager
             user_id = str(run.user_id)
             if user_id in manager.active_connections:
-                payload = {
-                    "type": "STATE_UPDATE",
-                    "status": node_output.get("status", "running"),
-                    "current_stage": node_output.get("current_stage"),
-                    "messages": node_output.get("messages", [])
-                }
                 aws = [ws.send_json(payload) for ws in manager.active_connections[user_id]]
                 await asyncio.gather(*aws, return_exceptions=True)
         except Exception as e:
@@ -149,14 +183,24 @@ class MasterOrchestratorAgent:
         """Persist pipeline results to dedicated PostgreSQL tables."""
         user_id = run.user_id
         pipeline_id = run.id
+        sb_data = state.get("salary_benchmarks") or {}
         
         try:
             # Save CV version
             if state.get("optimised_cv"):
+                cv_text = state.get("cv_raw", "")
+                content_hash = text_hash(cv_text)
+                if cv_text:
+                    try:
+                        # Stores the version's embedding (a no-op for text embedded before)
+                        content_hash, _ = await get_or_embed(session, cv_text)
+                    except Exception as e:
+                        print(f"[Embedding] CV version not embedded: {e}")
                 cv_version = CVVersion(
                     user_id=user_id,
                     pipeline_id=pipeline_id,
-                    cv_text=state.get("cv_raw", ""),
+                    cv_text=cv_text,
+                    content_hash=content_hash,
                     ats_score=state.get("ats_score"),
                     match_score=state.get("skill_match_score"),  # GraphRAG score
                     job_target=state.get("job_description", "")[:100]
@@ -164,7 +208,6 @@ class MasterOrchestratorAgent:
                 session.add(cv_version)
 
             # Save salary benchmark
-            sb_data = state.get("salary_benchmarks") or {}
             if sb_data.get("salary_min"):
                 sb = SalaryBenchmark(
                     role_title=state.get("job_description", "Unknown")[:100],
@@ -175,32 +218,6 @@ class MasterOrchestratorAgent:
                 )
                 session.add(sb)
 
-            # Save job matches from market analysis snippets
-            # Backend state matches Frontend expectation: state.market_analysis.market_analysis
-            market_results_root = state.get("market_analysis") or {}
-            market_data = market_results_root.get("market_analysis") or {}
-            for category, info in market_data.items():
-                if not isinstance(info, dict): continue
-                snippets = info.get("snippets", [])
-                for snippet in snippets:
-                    # snippet format: "Title at Company"
-                    parts = snippet.split(" at ")
-                    title = parts[0].strip() if len(parts) > 0 else snippet
-                    company = parts[1].strip() if len(parts) > 1 else "Unknown"
-                    
-                    jm = JobMatch(
-                        user_id=user_id,
-                        pipeline_id=pipeline_id,
-                        job_title=title[:100],
-                        company=company[:100],
-                        match_score=state.get("skill_match_score"),  # GraphRAG score
-                        tier=state.get("job_tier"),
-                        missing_skills=state.get("skill_gaps", []) or state.get("missing_skills", []),
-                        salary_min=sb_data.get("salary_min"),
-                        salary_max=sb_data.get("salary_max"),
-                    )
-                    session.add(jm)
-
             # Save skill roadmap
             if state.get("skill_roadmap"):
                 sr = SkillRoadmap(
@@ -216,3 +233,22 @@ class MasterOrchestratorAgent:
             
         except Exception as e:
             print(f"[PERSIST] ⚠️ Non-fatal persistence error: {e}")
+
+        # Materialize ranked job cards from market analysis snippets, so the dashboard
+        # reads them instead of rebuilding on every hit. Separate from the results above:
+        # a failure here (SkillScorer, the skill graph, the insert) only costs the cards.
+        try:
+            cards = build_job_cards_from_market(state)
+            matches = job_matches_from_cards(
+                cards,
+                user_id=user_id,
+                pipeline_id=pipeline_id,
+                salary_min=sb_data.get("salary_min"),
+                salary_max=sb_data.get("salary_max"),
+            )
+            # Savepoint: a failed insert rolls back the cards without expiring `run`
+            async with session.begin_nested():
+                session.add_all(matches)
+            await session.commit()
+        except Exception as e:
+            print(f"[PERSIST] ⚠️ Job cards not materialized for pipeline {pipeline_id}: {e}")
@@ -0,0 +1,126 @@
+"""
+Streaming readers for the ESCO v1.x CSV export in backend/esco/.
+
+Every reader yields plain records one row at a time, so callers (the
+in-memory skill graph, the Postgres and Neo4j importers) never hold a
+whole file in memory. Missing files are reported and yield nothing.
+"""
+import csv
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+ESCO_DIR = os.getenv(
+    "ESCO_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "esco"),
+)
+
+# Full skill pillar; when absent, the per-collection exports are used instead
+SKILLS_FILE = "skills_en.csv"
+SKILL_COLLECTION_FILES = (
+    "digitalSkillsCollection_en.csv",
+    "digCompSkillsCollection_en.csv",
+    "transversalSkillsCollection_en.csv",
+    "languageSkillsCollection_en.csv",
+    "researchSkillsCollection_en.csv",
+)
+SKILL_GROUPS_FILE = "skillGroups_en.csv"
+SKILL_RELATIONS_FILE = "skillSkillRelations_en.csv"
+BROADER_SKILL_RELATIONS_FILE = "broaderRelationsSkillPillar_en.csv"
+OCCUPATIONS_FILE = "occupations_en.csv"
+OCCUPATION_SKILL_RELATIONS_FILE = "occupationSkillRelations_en.csv"
+
+# altLabels are newline-separated in the main exports and " | "-separated in collections
+_LABEL_SPLIT = re.compile(r"\n|\s\|\s")
+
+
+@dataclass
+class EscoConcept:
+    uri: str
+    name: str
+    description: Optional[str] = None
+    alt_labels: list[str] = field(default_factory=list)
+    concept_type: str = "KnowledgeSkillCompetence"
+    skill_type: str = "skill"
+    code: Optional[str] = None
+
+
+@dataclass
+class EscoEdge:
+    source_uri: str
+    target_uri: str
+    relation_type: str
+
+
+def esco_path(filename: str, esco_dir: Optional[str] = None) -> str:
+    return os.path.join(esco_dir or ESCO_DIR, filename)
+
+
+def _rows(filename: str, esco_dir: Optional[str] = None) -> Iterator[dict]:
+    path = esco_path(filename, esco_dir)
+    if not os.path.exists(path):
+        print(f"[ESCO] File not found: {path}")
+        return
+    with open(path, mode="r", encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def _split_labels(value: Optional[str]) -> list[str]:
+    return [label.strip() for label in _LABEL_SPLIT.split(value or "") if label.strip()]
+
+
+def _concept(row: dict, default_type: str) -> EscoConcept:
+    return EscoConcept(
+        uri=row["conceptUri"],
+        name=(row.get("preferredLabel") or "").strip(),
+        description=row.get("description") or None,
+        alt_labels=_split_labels(row.get("altLabels")),
+        concept_type=row.get("conceptType") or default_type,
+        skill_type=row.get("skillType") or default_type,
+        code=row.get("code") or row.get("iscoGroup") or None,
+    )
+
+
+def read_skills(esco_dir: Optional[str] = None) -> Iterator[EscoConcept]:
+    """Yield skill/knowledge concepts from skills_en.csv, or the collections if it is absent."""
+    if os.path.exists(esco_path(SKILLS_FILE, esco_dir)):
+        for row in _rows(SKILLS_FILE, esco_dir):
+            yield _concept(row, "skill")
+        return
+
+    seen = set()
+    for filename in SKILL_COLLECTION_FILES:
+        for row in _rows(filename, esco_dir):
+            if row["conceptUri"] in seen:
+                continue
+            seen.add(row["conceptUri"])
+            yield _concept(row, "skill")
+
+
+def read_skill_groups(esco_dir: Optional[str] = None) -> Iterator[EscoConcept]:
+    for row in _rows(SKILL_GROUPS_FILE, esco_dir):
+        yield _concept(row, "skill group")
+
+
+def read_occupations(esco_dir: Optional[str] = None) -> Iterator[EscoConcept]:
+    for row in _rows(OCCUPATIONS_FILE, esco_dir):
+        yield _concept(row, "occupation")
+
+
+def read_skill_relations(esco_dir: Optional[str] = None) -> Iterator[EscoEdge]:
+    """Skill → related skill, typed 'essential' or 'optional'."""
+    for row in _rows(SKILL_RELATIONS_FILE, esco_dir):
+        yield EscoEdge(row["originalSkillUri"], row["relatedSkillUri"], row.get("relationType") or "optional")
+
+
+def read_broader_skill_relations(esco_dir: Optional[str] = None) -> Iterator[EscoEdge]:
+    """Skill or skill group → its broader concept in the skills hierarchy."""
+    for row in _rows(BROADER_SKILL_RELATIONS_FILE, esco_dir):
+        yield EscoEdge(row["conceptUri"], row["broaderUri"], "broader")
+
+
+def read_occupation_skill_relations(esco_dir: Optional[str] = None) -> Iterator[EscoEdge]:
+    """Occupation → skill, typed 'essential' or 'optional'."""
+    for row in _rows(OCCUPATION_SKILL_RELATIONS_FILE, esco_dir):
+        yield EscoEdge(row["occupationUri"], row["skillUri"], row.get("relationType") or "optional")
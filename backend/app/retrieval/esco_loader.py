@@ -0,0 +1,260 @@
+"""
+Helpers for loading the full ESCO export into Postgres with asyncpg.
+
+Rows get client-side ids derived from their ESCO URIs (uuid5), so
+relations can be written without looking skills up, and a re-run (or a
+later diff import) produces the same ids for the same concepts. Tables are
+filled with COPY; the secondary indexes on esco_skills / esco_relations
+are dropped for the load and rebuilt afterwards, the HNSW index last,
+once the embeddings are in place.
+
+Embeddings are written in batches for every skill (and occupation) whose
+embedding is still NULL, so an interrupted run resumes where it stopped.
+
+Each skill / occupation row stores a content_hash of its imported fields;
+`diff_rows` compares a new release against the stored hashes so an import
+only inserts, updates and deletes what changed.
+
+Usage:
+    conn = await asyncpg.connect(asyncpg_dsn(DATABASE_URL))
+    skills = skill_rows()
+    await copy_rows(conn, "esco_skills", SKILL_COLUMNS, skills)
+    await embed_pending(conn)
+"""
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Hashable, Iterable, Optional
+
+from app.agents.gemini_client import gemini_client
+from app.retrieval import esco_csv
+
+EMBEDDING_MODEL = "text-embedding-004"
+ESCO_INDEX_BUILD_MEMORY = os.getenv("ESCO_INDEX_BUILD_MEMORY", "1GB")
+
+SKILL_COLUMNS = ("id", "uri", "name", "description", "skill_type", "content_hash")
+RELATION_COLUMNS = ("id", "source_skill_id", "target_skill_id", "relation_type")
+OCCUPATION_COLUMNS = ("id", "uri", "name", "description", "isco_code", "content_hash")
+OCCUPATION_SKILL_COLUMNS = ("id", "occupation_id", "skill_id", "relation_type")
+
+# Tables whose rows are embedded from name + description
+EMBEDDED_TABLES = ("esco_skills", "esco_occupations")
+
+# Secondary indexes rebuilt after a bulk load (definitions match the migrations); the HNSW index is last
+DEFERRED_INDEXES = {
+    "ix_esco_skills_name": "CREATE INDEX IF NOT EXISTS ix_esco_skills_name ON esco_skills (name)",
+    "ix_esco_skills_search_tsv": "CREATE INDEX IF NOT EXISTS ix_esco_skills_search_tsv ON esco_skills USING gin (search_tsv)",
+    "ix_esco_relations_source_skill_id": "CREATE INDEX IF NOT EXISTS ix_esco_relations_source_skill_id ON esco_relations (source_skill_id)",
+    "ix_esco_relations_target_skill_id": "CREATE INDEX IF NOT EXISTS ix_esco_relations_target_skill_id ON esco_relations (target_skill_id)",
+    "ix_esco_relations_relation_type": "CREATE INDEX IF NOT EXISTS ix_esco_relations_relation_type ON esco_relations (relation_type)",
+    "ix_esco_occupation_skills_occupation_id": (
+        "CREATE INDEX IF NOT EXISTS ix_esco_occupation_skills_occupation_id ON esco_occupation_skills (occupation_id)"
+    ),
+    "ix_esco_occupation_skills_skill_id": "CREATE INDEX IF NOT EXISTS ix_esco_occupation_skills_skill_id ON esco_occupation_skills (skill_id)",
+    "ix_esco_occupation_skills_relation_type": (
+        "CREATE INDEX IF NOT EXISTS ix_esco_occupation_skills_relation_type ON esco_occupation_skills (relation_type)"
+    ),
+    "ix_esco_skills_embedding_hnsw": (
+        "CREATE INDEX IF NOT EXISTS ix_esco_skills_embedding_hnsw ON esco_skills "
+        "USING hnsw (embedding vector_l2_ops) WITH (m = 16, ef_construction = 64)"
+    ),
+}
+
+
+def asyncpg_dsn(database_url: str) -> str:
+    """asyncpg takes plain postgresql:// URLs, without SQLAlchemy's driver suffix."""
+    return database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+def concept_uuid(uri: str) -> uuid.UUID:
+    return uuid.uuid5(uuid.NAMESPACE_URL, uri)
+
+
+def relation_uuid(source_uri: str, target_uri: str, relation_type: str) -> uuid.UUID:
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"{source_uri}|{relation_type}|{target_uri}")
+
+
+def content_hash(*fields: Optional[str]) -> str:
+    """Fingerprint of a row's imported fields, stored to detect changes between ESCO releases."""
+    return hashlib.blake2b("\x1f".join(f or "" for f in fields).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def embedding_text(name: str, description: Optional[str]) -> str:
+    """Text embedded for a skill or occupation: its label, plus the description when there is one."""
+    return f"{name}: {description}" if description else name
+
+
+# ── Rows from the CSV export ──────────────────────────────────
+
+def skill_rows(esco_dir: Optional[str] = None) -> list[tuple]:
+    """(id, uri, name, description, skill_type, content_hash) for every skill and skill group, one per URI."""
+    rows = {}
+    for stream in (esco_csv.read_skills(esco_dir), esco_csv.read_skill_groups(esco_dir)):
+        for concept in stream:
+            if concept.uri not in rows and concept.name:
+                fields = (concept.uri, concept.name, concept.description, concept.skill_type)
+                rows[concept.uri] = (concept_uuid(concept.uri), *fields, content_hash(*fields))
+    return list(rows.values())
+
+
+def relation_rows(known_uris: Iterable[str], esco_dir: Optional[str] = None) -> list[tuple]:
+    """(id, source_skill_id, target_skill_id, relation_type); edges to concepts not loaded are skipped."""
+    known = set(known_uris)
+    rows = {}
+    for stream in (esco_csv.read_skill_relations(esco_dir), esco_csv.read_broader_skill_relations(esco_dir)):
+        for edge in stream:
+            if edge.source_uri in known and edge.target_uri in known:
+                row_id = relation_uuid(edge.source_uri, edge.target_uri, edge.relation_type)
+                rows[row_id] = (row_id, concept_uuid(edge.source_uri), concept_uuid(edge.target_uri), edge.relation_type)
+    return list(rows.values())
+
+
+def occupation_rows(esco_dir: Optional[str] = None) -> list[tuple]:
+    """(id, uri, name, description, isco_code, content_hash) for every occupation."""
+    rows = {}
+    for concept in esco_csv.read_occupations(esco_dir):
+        if concept.uri not in rows and concept.name:
+            fields = (concept.uri, concept.name, concept.description, concept.code)
+            rows[concept.uri] = (concept_uuid(concept.uri), *fields, content_hash(*fields))
+    return list(rows.values())
+
+
+def occupation_skill_rows(
+    known_occupation_uris: Iterable[str], known_skill_uris: Iterable[str], esco_dir: Optional[str] = None,
+) -> list[tuple]:
+    """(id, occupation_id, skill_id, relation_type) for essential / optional occupation skills."""
+    occupations, skills = set(known_occupation_uris), set(known_skill_uris)
+    rows = {}
+    for edge in esco_csv.read_occupation_skill_relations(esco_dir):
+        if edge.source_uri in occupations and edge.target_uri in skills:
+            row_id = relation_uuid(edge.source_uri, edge.target_uri, edge.relation_type)
+            rows[row_id] = (row_id, concept_uuid(edge.source_uri), concept_uuid(edge.target_uri), edge.relation_type)
+    return list(rows.values())
+
+
+# ── Diffs between releases ────────────────────────────────────
+
+@dataclass
+class RowDiff:
+    inserted: list = field(default_factory=list)
+    updated: list = field(default_factory=list)
+    deleted: list = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+    def summary(self) -> str:
+        return f"+{len(self.inserted)} ~{len(self.updated)} -{len(self.deleted)}"
+
+
+def diff_rows(new: dict[Hashable, Optional[str]], current: dict[Hashable, Optional[str]]) -> RowDiff:
+    """Ids to insert, update (hash differs, or was never stored) and delete, given id -> content hash maps."""
+    return RowDiff(
+        inserted=[row_id for row_id in new if row_id not in current],
+        updated=[row_id for row_id, row_hash in new.items() if row_id in current and (current[row_id] is None or current[row_id] != row_hash)],
+        deleted=[row_id for row_id in current if row_id not in new],
+    )
+
+
+# ── Bulk load ─────────────────────────────────────────────────
+
+async def copy_rows(conn, table: str, columns: Iterable[str], rows: list[tuple]) -> float:
+    """COPY `rows` into `table`; returns rows per second."""
+    start = time.perf_counter()
+    await conn.copy_records_to_table(table, records=rows, columns=list(columns))
+    elapsed = time.perf_counter() - start
+    rate = len(rows) / elapsed if elapsed else float(len(rows))
+    print(f"[ESCO] COPY {len(rows)} rows into {table} ({rate:,.0f} rows/s)")
+    return rate
+
+
+async def drop_deferred_indexes(conn) -> None:
+    for name in DEFERRED_INDEXES:
+        await conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+async def create_deferred_indexes(conn) -> None:
+    await conn.execute(f"SET maintenance_work_mem = '{ESCO_INDEX_BUILD_MEMORY}'")
+    for name, statement in DEFERRED_INDEXES.items():
+        start = time.perf_counter()
+        await conn.execute(statement)
+        print(f"[ESCO] Index {name} ready ({time.perf_counter() - start:.1f}s)")
+    for table in ("esco_skills", "esco_relations", "esco_occupations", "esco_occupation_skills"):
+        await conn.execute(f"ANALYZE {table}")
+
+
+async def record_dataset_version(conn, source: str, notes: Optional[str] = None) -> int:
+    """Bump the ESCO dataset version the retrieval caches key on (see graph_cache.py)."""
+    return await conn.fetchval(
+        "INSERT INTO esco_dataset_versions (source, notes, imported_at) "
+        "VALUES ($1, $2, now() AT TIME ZONE 'utc') RETURNING id",
+        source, notes,
+    )
+
+
+# ── Embeddings ────────────────────────────────────────────────
+
+async def _embed_batch(texts: list[str], max_retries: int) -> list[list[float]]:
+    for attempt in range(max_retries + 1):
+        try:
+            return await asyncio.to_thread(gemini_client.embed_contents, EMBEDDING_MODEL, texts, strict=True)
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            delay = 2 ** attempt
+            print(f"[ESCO] Embedding batch failed ({e}); retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+
+async def embed_pending(
+    conn,
+    ids: Optional[list[uuid.UUID]] = None,
+    batch_size: int = 100,
+    concurrency: int = 4,
+    max_retries: int = 3,
+    table: str = "esco_skills",
+) -> int:
+    """
+    Embed every row of `table` (skills or occupations) whose embedding is NULL (or only
+    `ids`), `concurrency` API batches at a time, committing each round. Returns the number
+    of rows embedded; on failure the rows written so far are kept and a re-run resumes
+    from the rest.
+    """
+    if table not in EMBEDDED_TABLES:
+        raise ValueError(f"{table} has no embedding column")
+    query = f"SELECT id, name, description FROM {table} WHERE embedding IS NULL"
+    params: tuple = ()
+    if ids is not None:
+        query += " AND id = ANY($2::uuid[])"
+        params = (ids,)
+    query += " ORDER BY id LIMIT $1"
+
+    total = await conn.fetchval(
+        f"SELECT count(*) FROM {table} WHERE embedding IS NULL" + (" AND id = ANY($1::uuid[])" if ids is not None else ""),
+        *params,
+    )
+    label = table.removeprefix("esco_")
+    done = 0
+    start = time.perf_counter()
+    while True:
+        rows = await conn.fetch(query, batch_size * concurrency, *params)
+        if not rows:
+            break
+        batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+        vectors = await asyncio.gather(*(
+            _embed_batch([embedding_text(r["name"], r["description"]) for r in batch], max_retries)
+            for batch in batches
+        ))
+        await conn.execute(
+            f"UPDATE {table} SET embedding = v.embedding::vector "
+            f"FROM unnest($1::uuid[], $2::text[]) AS v(id, embedding) WHERE {table}.id = v.id",
+            [r["id"] for batch in batches for r in batch],
+            [str(list(vector)) for batch_vectors in vectors for vector in batch_vectors],
+        )
+        done += len(rows)
+        rate = done / (time.perf_counter() - start)
+        print(f"[ESCO] Embedded {done}/{total} {label} ({rate:,.0f}/s)")
+    return done
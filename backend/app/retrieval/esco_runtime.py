@@ -0,0 +1,263 @@
+"""
+Process-wide ESCO skill graph, loaded once at startup.
+
+ESCO_GRAPH_SOURCE selects where it comes from:
+    csv       — the ESCO export in ESCO_DIR (default)
+    snapshot  — the mmap-able binary snapshot at ESCO_SNAPSHOT_PATH
+                (scripts/build_esco_snapshot.py); falls back to csv if missing
+    postgres  — the esco_skills / esco_relations tables
+    off       — no in-memory graph; callers fall back to Neo4j / SQL
+
+If the offline implication closure (scripts/build_skill_closure.py) exists
+at ESCO_CLOSURE_PATH it is loaded alongside the graph, and refreshed
+incrementally if the graph has changed since it was built.
+
+ESCO_LOCAL_SEARCH selects the in-process hybrid skill search (vector_index.py):
+    auto      — from the snapshot's embeddings, when the snapshot is loaded (default)
+    postgres  — from the esco_skills embedding column, loaded once at startup
+    off       — always search in Postgres
+It records the ESCO dataset version it was built from. When a newer version
+is seen (graph_rag passes `current_esco_version()`), a postgres-built search
+is rebuilt in the background and a snapshot-built one is dropped until the
+snapshot is rebuilt; searches go to Postgres meanwhile. Snapshots built
+without a version (0) are never considered stale.
+
+ESCO_OCCUPATION_MATCHING selects the JD → occupation resolver (occupation_matcher.py)
+with the same auto / postgres / off values; it needs occupation embeddings.
+
+Callers use `get_skill_graph()` / `get_skill_closure()` / `get_esco_snapshot()` /
+`get_occupation_matcher()` and must handle
+`None` (not loaded yet, disabled, or the source was unavailable).
+`get_skill_normalizer()` / `get_skill_extractor()` always return an instance
+(curated aliases only until a graph is loaded).
+"""
+import asyncio
+import os
+import time
+from typing import Optional
+
+from app.retrieval.esco_csv import ESCO_DIR
+from app.retrieval.esco_snapshot import EscoSnapshot
+from app.retrieval.graph_cache import current_esco_version, invalidate_graph_caches
+from app.retrieval.occupation_matcher import OccupationMatcher
+from app.retrieval.skill_closure import SkillClosure
+from app.retrieval.skill_extractor import SkillExtractor
+from app.retrieval.skill_graph import SkillGraph
+from app.retrieval.skill_normalizer import SkillNormalizer
+from app.retrieval.vector_index import LocalSkillSearch
+
+ESCO_GRAPH_SOURCE = os.getenv("ESCO_GRAPH_SOURCE", "csv").lower()
+ESCO_CLOSURE_PATH = os.getenv("ESCO_CLOSURE_PATH", os.path.join(ESCO_DIR, "skill_closure.npz"))
+ESCO_LOCAL_SEARCH = os.getenv("ESCO_LOCAL_SEARCH", "auto").lower()
+ESCO_OCCUPATION_MATCHING = os.getenv("ESCO_OCCUPATION_MATCHING", "auto").lower()
+ESCO_SNAPSHOT_PATH = os.getenv("ESCO_SNAPSHOT_PATH", os.path.join(ESCO_DIR, "esco_snapshot.bin"))
+
+_skill_graph: Optional[SkillGraph] = None
+_skill_closure: Optional[SkillClosure] = None
+_esco_snapshot: Optional[EscoSnapshot] = None
+_local_skill_search: Optional[LocalSkillSearch] = None
+_local_skill_search_version = 0     # dataset version the local search was built from
+_local_skill_search_rebuild: Optional[asyncio.Task] = None
+_occupation_matcher: Optional[OccupationMatcher] = None
+_skill_normalizer: Optional[SkillNormalizer] = None
+_skill_extractor: Optional[SkillExtractor] = None
+
+
+def get_skill_graph() -> Optional[SkillGraph]:
+    return _skill_graph
+
+
+def set_skill_graph(graph: Optional[SkillGraph]) -> None:
+    global _skill_graph
+    _skill_graph = graph
+
+
+def get_skill_closure() -> Optional[SkillClosure]:
+    return _skill_closure
+
+
+def set_skill_closure(closure: Optional[SkillClosure]) -> None:
+    global _skill_closure
+    _skill_closure = closure
+
+
+def get_esco_snapshot() -> Optional[EscoSnapshot]:
+    return _esco_snapshot
+
+
+def set_esco_snapshot(snapshot: Optional[EscoSnapshot]) -> None:
+    global _esco_snapshot
+    _esco_snapshot = snapshot
+
+
+def get_local_skill_search(dataset_version: Optional[int] = None) -> Optional[LocalSkillSearch]:
+    """The local search, or None once `dataset_version` is newer than the data it was built from."""
+    global _local_skill_search_rebuild
+    if (
+        _local_skill_search is not None and dataset_version and _local_skill_search_version
+        and dataset_version > _local_skill_search_version
+    ):
+        print(f"[ESCO] Local skill search built from v{_local_skill_search_version}, dataset is v{dataset_version}; "
+              "searching in Postgres until it is rebuilt")
+        set_local_skill_search(None)
+        if ESCO_LOCAL_SEARCH == "postgres" and (_local_skill_search_rebuild is None or _local_skill_search_rebuild.done()):
+            _local_skill_search_rebuild = asyncio.get_running_loop().create_task(load_local_skill_search("postgres"))
+    return _local_skill_search
+
+
+def set_local_skill_search(search: Optional[LocalSkillSearch], dataset_version: int = 0) -> None:
+    global _local_skill_search, _local_skill_search_version
+    _local_skill_search = search
+    _local_skill_search_version = dataset_version
+
+
+def get_occupation_matcher() -> Optional[OccupationMatcher]:
+    return _occupation_matcher
+
+
+def set_occupation_matcher(matcher: Optional[OccupationMatcher]) -> None:
+    global _occupation_matcher
+    _occupation_matcher = matcher
+
+
+def get_skill_normalizer() -> SkillNormalizer:
+    """Normalizer for the current graph; rebuilt if the graph was swapped."""
+    global _skill_normalizer
+    graph = _skill_graph
+    if _skill_normalizer is None or _skill_normalizer.graph is not graph:
+        _skill_normalizer = SkillNormalizer(graph)
+    return _skill_normalizer
+
+
+def set_skill_normalizer(normalizer: Optional[SkillNormalizer]) -> None:
+    global _skill_normalizer
+    _skill_normalizer = normalizer
+
+
+def get_skill_extractor() -> SkillExtractor:
+    """Extractor over the current normalizer's dictionary; rebuilt if it was swapped."""
+    global _skill_extractor
+    normalizer = get_skill_normalizer()
+    if _skill_extractor is None or _skill_extractor.normalizer is not normalizer:
+        _skill_extractor = SkillExtractor(normalizer)
+    return _skill_extractor
+
+
+def load_skill_closure(graph: SkillGraph, path: str = ESCO_CLOSURE_PATH) -> Optional[SkillClosure]:
+    """Load the closure for `graph` from `path`, refreshing (and re-saving) it if stale."""
+    if not os.path.exists(path):
+        print(f"[ESCO] No skill closure at {path}; run scripts/build_skill_closure.py to enable it.")
+        return None
+
+    closure = SkillClosure.load(path)
+    if not closure.matches(graph):
+        closure, recomputed = closure.refresh(graph)
+        print(f"[ESCO] Skill closure refreshed: {recomputed} of {closure.num_nodes} rows recomputed")
+        try:
+            closure.save(path)
+        except OSError as e:
+            print(f"[ESCO] Could not save refreshed skill closure: {e}")
+    return closure
+
+
+async def load_skill_graph(source: str = ESCO_GRAPH_SOURCE) -> Optional[SkillGraph]:
+    """Build the graph from `source` and install it; failures leave the fallbacks in place."""
+    if source == "off":
+        return None
+
+    start = time.perf_counter()
+    if source == "snapshot" and not os.path.exists(ESCO_SNAPSHOT_PATH):
+        print(f"[ESCO] No snapshot at {ESCO_SNAPSHOT_PATH}; run scripts/build_esco_snapshot.py. Using CSV.")
+        source = "csv"
+    try:
+        if source == "snapshot":
+            snapshot = EscoSnapshot.open(ESCO_SNAPSHOT_PATH)
+            graph = await asyncio.to_thread(snapshot.to_graph)
+            set_esco_snapshot(snapshot)
+        elif source == "postgres":
+            from app.core.database import async_session
+            async with async_session() as session:
+                graph = await SkillGraph.from_session(session)
+        else:
+            graph = await asyncio.to_thread(SkillGraph.from_esco_csv)
+    except Exception as e:
+        print(f"[ESCO] Skill graph not loaded from {source}: {e}")
+        return None
+
+    if graph.num_nodes == 0:
+        print(f"[ESCO] Skill graph source '{source}' is empty; using Neo4j / SQL expansion.")
+        return None
+
+    set_skill_graph(graph)
+    set_skill_normalizer(await asyncio.to_thread(SkillNormalizer, graph))
+    await asyncio.to_thread(get_skill_extractor)
+    invalidate_graph_caches()   # results computed without (or with an older) graph
+    try:
+        set_skill_closure(await asyncio.to_thread(load_skill_closure, graph))
+    except Exception as e:
+        print(f"[ESCO] Skill closure not loaded: {e}")
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"[ESCO] Skill graph loaded from {source}: {graph.num_nodes} nodes, {graph.num_edges} edges in {elapsed:.0f} ms")
+    return graph
+
+
+async def load_local_skill_search(source: str = ESCO_LOCAL_SEARCH) -> Optional[LocalSkillSearch]:
+    """Build the in-process hybrid skill search and install it; failures leave search in Postgres."""
+    if source == "off":
+        return None
+
+    start = time.perf_counter()
+    try:
+        if source == "postgres":
+            from app.core.database import async_session
+            # Read first: an import landing during the load makes the search look older, not newer
+            version = await current_esco_version()
+            async with async_session() as session:
+                search = await LocalSkillSearch.from_session(session)
+        elif _esco_snapshot is not None:
+            version = _esco_snapshot.dataset_version
+            search = await asyncio.to_thread(LocalSkillSearch.from_snapshot, _esco_snapshot)
+        else:
+            return None
+    except Exception as e:
+        print(f"[ESCO] Local skill search not loaded from {source}: {e}")
+        return None
+
+    if search is None:
+        print(f"[ESCO] No ESCO embeddings in '{source}'; skill search stays in Postgres.")
+        return None
+
+    set_local_skill_search(search, version)
+    invalidate_graph_caches()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"[ESCO] Local skill search ready ({search.index.backend}): {len(search)} skills, v{version}, in {elapsed:.0f} ms")
+    return search
+
+
+async def load_occupation_matcher(source: str = ESCO_OCCUPATION_MATCHING) -> Optional[OccupationMatcher]:
+    """Build the JD → occupation resolver and install it; without it the agent uses extracted skills only."""
+    if source == "off":
+        return None
+
+    start = time.perf_counter()
+    try:
+        if source == "postgres":
+            from app.core.database import async_session
+            async with async_session() as session:
+                matcher = await OccupationMatcher.from_session(session)
+        elif _esco_snapshot is not None:
+            matcher = await asyncio.to_thread(OccupationMatcher.from_snapshot, _esco_snapshot)
+        else:
+            return None
+    except Exception as e:
+        print(f"[ESCO] Occupation matcher not loaded from {source}: {e}")
+        return None
+
+    if matcher is None:
+        print(f"[ESCO] No occupation embeddings in '{source}'; occupation matching disabled.")
+        return None
+
+    set_occupation_matcher(matcher)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"[ESCO] Occupation matcher ready: {matcher.num_embedded} of {len(matcher)} occupations in {elapsed:.0f} ms")
+    return matcher
@@ -0,0 +1,317 @@
+"""
+Versioned binary snapshot of the ESCO data every worker needs.
+
+One file holds the skill graph (string tables, per-relation CSR arrays),
+skill descriptions and types, occupations with their occupation → skill
+CSR, and optional float16 embedding matrices for skills and occupations. Workers `mmap` it read-only:
+every array is a zero-copy NumPy view into the mapping, so load time is a
+header parse plus decoding the name tables, and the pages are shared by
+all processes through the OS page cache.
+
+Layout (all integers little-endian):
+
+    b"ESCOSNAP" | u32 format version | u32 header length | JSON header
+    | padding | sections, each aligned to 64 bytes
+
+The JSON header records the dataset version, counts, the relation and
+type vocabularies, and {name: [offset, dtype, shape]} for every section.
+A string table is two sections: `<name>.offsets` (int64, n + 1 byte
+offsets) and `<name>.data` (the UTF-8 bytes).
+
+Snapshots are written to a temporary file and renamed into place, so
+workers that still map the previous file keep a consistent view.
+
+Usage:
+    write_snapshot(path, graph, concepts, occupations, occupation_edges, embeddings)
+    snapshot = EscoSnapshot.open(path)
+    graph = snapshot.to_graph()
+    snapshot.embeddings[graph.ids_for(["Python"])]
+"""
+import json
+import mmap
+import os
+import struct
+import time
+from collections import defaultdict
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from app.retrieval.esco_csv import EscoConcept, EscoEdge
+from app.retrieval.skill_graph import SkillGraph
+
+MAGIC = b"ESCOSNAP"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGN = 64
+
+
+class StringTable:
+    """Read-only list of strings backed by an offsets array and a UTF-8 blob."""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def tolist(self) -> list[str]:
+        blob = self.data.tobytes()
+        bounds = self.offsets.tolist()
+        return [blob[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(self))]
+
+
+def _string_sections(name: str, values: Iterable[Optional[str]]) -> dict[str, np.ndarray]:
+    encoded = [(v or "").encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return {
+        f"{name}.offsets": offsets,
+        f"{name}.data": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+    }
+
+
+def _bipartite_csr(num_rows: int, src: list[int], dst: list[int]) -> tuple[np.ndarray, np.ndarray]:
+    """Deduplicated CSR for row -> column edges between two different id spaces."""
+    pairs = np.unique(np.column_stack([src, dst]).astype(np.int64).reshape(-1, 2), axis=0)
+    indptr = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pairs[:, 0], minlength=num_rows), out=indptr[1:])
+    return indptr, pairs[:, 1].astype(np.int32)
+
+
+def _codes(values: Sequence[str]) -> tuple[list[str], np.ndarray]:
+    vocab = sorted(set(values))
+    index = {v: i for i, v in enumerate(vocab)}
+    return vocab, np.asarray([index[v] for v in values], dtype=np.uint8)
+
+
+def write_snapshot(
+    path: str,
+    graph: SkillGraph,
+    concepts: Optional[dict[str, EscoConcept]] = None,
+    occupations: Sequence[EscoConcept] = (),
+    occupation_edges: Iterable[EscoEdge] = (),
+    embeddings: Optional[dict[int, Sequence[float]]] = None,
+    dataset_version: int = 0,
+    occupation_embeddings: Optional[dict[int, Sequence[float]]] = None,
+) -> dict:
+    """
+    Compile `graph` and its metadata into a snapshot at `path`; returns the header.
+    `concepts` (by URI) supplies descriptions and types; `embeddings` maps graph ids to vectors,
+    `occupation_embeddings` maps positions in `occupations` to vectors.
+    """
+    concepts = concepts or {}
+    nodes = [concepts.get(uri) for uri in graph.uris]
+    sections: dict[str, np.ndarray] = {}
+    sections.update(_string_sections("skills.uri", graph.uris))
+    sections.update(_string_sections("skills.name", graph.names))
+    sections.update(_string_sections("skills.description", (c.description if c else None for c in nodes)))
+    skill_types, sections["skills.skill_type"] = _codes([c.skill_type if c else "" for c in nodes])
+    concept_types, sections["skills.concept_type"] = _codes([c.concept_type if c else "" for c in nodes])
+
+    # Labels that resolve differently from a node's own name: alt labels, in the graph's lower-case form
+    own_names = {name.strip().lower() for name in graph.names if name}
+    aliases = [(label, node_id) for label, node_id in graph.name_to_id.items() if label not in own_names]
+    sections.update(_string_sections("aliases.label", (label for label, _ in aliases)))
+    sections["aliases.id"] = np.asarray([node_id for _, node_id in aliases], dtype=np.int32)
+
+    relations = sorted(graph.csr)
+    for relation in relations:
+        indptr, indices = graph.csr[relation]
+        sections[f"relations.{relation}.indptr"] = np.asarray(indptr, dtype=np.int64)
+        sections[f"relations.{relation}.indices"] = np.asarray(indices, dtype=np.int32)
+
+    # Occupations → skills, one CSR per relation type; edges to unknown skills are dropped
+    occupation_index = {o.uri: i for i, o in enumerate(occupations)}
+    sections.update(_string_sections("occupations.uri", (o.uri for o in occupations)))
+    sections.update(_string_sections("occupations.name", (o.name for o in occupations)))
+    sections.update(_string_sections("occupations.code", (o.code for o in occupations)))
+    sections.update(_string_sections("occupations.description", (o.description for o in occupations)))
+    occupation_pairs: dict[str, tuple[list[int], list[int]]] = defaultdict(lambda: ([], []))
+    for edge in occupation_edges:
+        occupation_id, skill_id = occupation_index.get(edge.source_uri), graph.uri_to_id.get(edge.target_uri)
+        if occupation_id is not None and skill_id is not None:
+            occupation_pairs[edge.relation_type][0].append(occupation_id)
+            occupation_pairs[edge.relation_type][1].append(skill_id)
+    occupation_relations = sorted(occupation_pairs)
+    for relation in occupation_relations:
+        src, dst = occupation_pairs[relation]
+        indptr, indices = _bipartite_csr(len(occupations), src, dst)
+        sections[f"occupations.{relation}.indptr"] = indptr
+        sections[f"occupations.{relation}.indices"] = indices
+
+    embedding_dim = 0
+    if embeddings:
+        embedding_dim = len(next(iter(embeddings.values())))
+        matrix = np.zeros((graph.num_nodes, embedding_dim), dtype=np.float16)
+        mask = np.zeros(graph.num_nodes, dtype=np.uint8)
+        for node_id, vector in embeddings.items():
+            matrix[node_id] = vector
+            mask[node_id] = 1
+        sections["embeddings.matrix"] = matrix
+        sections["embeddings.mask"] = mask
+    if occupation_embeddings:
+        dim = len(next(iter(occupation_embeddings.values())))
+        matrix = np.zeros((len(occupations), dim), dtype=np.float16)
+        mask = np.zeros(len(occupations), dtype=np.uint8)
+        for occupation_id, vector in occupation_embeddings.items():
+            matrix[occupation_id] = vector
+            mask[occupation_id] = 1
+        sections["occupations.embeddings.matrix"] = matrix
+        sections["occupations.embeddings.mask"] = mask
+
+    header = {
+        "format": FORMAT_VERSION,
+        "dataset_version": dataset_version,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "num_skills": graph.num_nodes,
+        "num_edges": graph.num_edges,
+        "num_occupations": len(occupations),
+        "embedding_dim": embedding_dim,
+        "relations": relations,
+        "occupation_relations": occupation_relations,
+        "skill_types": skill_types,
+        "concept_types": concept_types,
+        "sections": {},
+    }
+
+    # Section offsets depend on the header length, which depends on the offsets: reserve generously
+    arrays = {name: np.ascontiguousarray(array) for name, array in sections.items()}
+    reserved = len(json.dumps(header)) + 96 * len(arrays) + _ALIGN
+    offset = -(-(_PREAMBLE.size + reserved) // _ALIGN) * _ALIGN
+    for name, array in arrays.items():
+        header["sections"][name] = [offset, array.dtype.str, list(array.shape)]
+        offset = -(-(offset + array.nbytes) // _ALIGN) * _ALIGN
+    header_bytes = json.dumps(header).encode("utf-8")
+    if _PREAMBLE.size + len(header_bytes) > header["sections"][next(iter(arrays))][0]:
+        raise ValueError("snapshot header does not fit its reserved space")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(header["sections"][name][0])
+            f.write(array.tobytes())
+        f.truncate(offset)
+    os.replace(tmp_path, path)
+    return header
+
+
+class EscoSnapshot:
+    def __init__(self, path: str, buffer: mmap.mmap, header: dict):
+        self.path = path
+        self.header = header
+        self._buffer = buffer
+        self._graph: Optional[SkillGraph] = None
+
+        self.skill_uris = self._strings("skills.uri")
+        self.skill_names = self._strings("skills.name")
+        self.skill_descriptions = self._strings("skills.description")
+        self.occupation_uris = self._strings("occupations.uri")
+        self.occupation_names = self._strings("occupations.name")
+        self.occupation_codes = self._strings("occupations.code")
+        self.occupation_descriptions = self._strings("occupations.description")
+        self.embeddings: Optional[np.ndarray] = self._array("embeddings.matrix") if self.embedding_dim else None
+        self.embedding_mask: Optional[np.ndarray] = (
+            self._array("embeddings.mask").view(bool) if self.embedding_dim else None
+        )
+        has_occupation_embeddings = "occupations.embeddings.matrix" in header["sections"]
+        self.occupation_embeddings: Optional[np.ndarray] = (
+            self._array("occupations.embeddings.matrix") if has_occupation_embeddings else None
+        )
+        self.occupation_embedding_mask: Optional[np.ndarray] = (
+            self._array("occupations.embeddings.mask").view(bool) if has_occupation_embeddings else None
+        )
+
+    @classmethod
+    def open(cls, path: str) -> "EscoSnapshot":
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = _PREAMBLE.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            buffer.close()
+            raise ValueError(f"{path} is not an ESCO snapshot")
+        if version != FORMAT_VERSION:
+            buffer.close()
+            raise ValueError(f"{path} has snapshot format {version}, expected {FORMAT_VERSION}")
+        header = json.loads(buffer[_PREAMBLE.size:_PREAMBLE.size + header_length])
+        return cls(path, buffer, header)
+
+    def close(self) -> None:
+        # Views into the mapping must be dropped first; a live view keeps it open
+        self.embeddings = self.embedding_mask = None
+        self.occupation_embeddings = self.occupation_embedding_mask = None
+        self._graph = None
+        try:
+            self._buffer.close()
+        except BufferError:
+            pass
+
+    def _array(self, name: str) -> np.ndarray:
+        offset, dtype, shape = self.header["sections"][name]
+        count = int(np.prod(shape)) if shape else 1
+        return np.frombuffer(self._buffer, dtype=np.dtype(dtype), count=count, offset=offset).reshape(shape)
+
+    def _strings(self, name: str) -> StringTable:
+        return StringTable(self._array(f"{name}.offsets"), self._array(f"{name}.data"))
+
+    # ── Metadata ──────────────────────────────────────────────
+
+    @property
+    def dataset_version(self) -> int:
+        return self.header["dataset_version"]
+
+    @property
+    def num_skills(self) -> int:
+        return self.header["num_skills"]
+
+    @property
+    def num_occupations(self) -> int:
+        return self.header["num_occupations"]
+
+    @property
+    def embedding_dim(self) -> int:
+        return self.header["embedding_dim"]
+
+    def skill_type(self, skill_id: int) -> str:
+        return self.header["skill_types"][int(self._array("skills.skill_type")[skill_id])]
+
+    def concept_type(self, skill_id: int) -> str:
+        return self.header["concept_types"][int(self._array("skills.concept_type")[skill_id])]
+
+    # ── Graph / occupations ───────────────────────────────────
+
+    def to_graph(self) -> SkillGraph:
+        """SkillGraph over the mapped CSR arrays (built once; only the name tables are decoded)."""
+        if self._graph is None:
+            csr = {
+                relation: (self._array(f"relations.{relation}.indptr"), self._array(f"relations.{relation}.indices"))
+                for relation in self.header["relations"]
+            }
+            labels = self._strings("aliases.label").tolist()
+            aliases = dict(zip(labels, self._array("aliases.id").tolist()))
+            self._graph = SkillGraph(self.skill_uris.tolist(), self.skill_names.tolist(), csr, aliases)
+        return self._graph
+
+    def occupation_skill_csr(self, relation: str) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        """(indptr, indices) of one occupation → skill relation type, or None if it has no edges."""
+        if relation not in self.header["occupation_relations"]:
+            return None
+        return self._array(f"occupations.{relation}.indptr"), self._array(f"occupations.{relation}.indices")
+
+    def occupation_skills(self, occupation_id: int, relations: Optional[Iterable[str]] = None) -> np.ndarray:
+        """Skill ids linked to an occupation (all relation types unless `relations` is given)."""
+        found = []
+        for relation in relations or self.header["occupation_relations"]:
+            if relation not in self.header["occupation_relations"]:
+                continue
+            indptr = self._array(f"occupations.{relation}.indptr")
+            indices = self._array(f"occupations.{relation}.indices")
+            found.append(indices[indptr[occupation_id]:indptr[occupation_id + 1]])
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int32)
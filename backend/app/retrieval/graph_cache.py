@@ -0,0 +1,117 @@
+"""
+Result caches for GraphRAG lookups, shared by every user.
+
+Popular skill sets (Python / React / SQL, ...) produce the same ESCO context
+for thousands of users, so results are cached under the sorted canonical
+skill ids (see SkillNormalizer) plus the ESCO dataset version:
+
+    skill_context_cache    fetch_skill_context / fetch_skill_context_many matches and relations
+    expanded_skills_cache  GraphRAGAgent.get_expanded_skills related names
+    occupation_cache       GraphRAGAgent.resolve_occupation hit per JD text hash
+                           (saves the JD embedding call for repeated JDs)
+
+The dataset version is the latest row in esco_dataset_versions, written by
+each ESCO import (`bump_esco_version`). It is re-read at most every
+ESCO_VERSION_REFRESH_SECONDS; when it moves, all caches are cleared. A
+reload of the in-memory graph clears them too.
+
+Usage:
+    key = skill_set_key("context", skill_ids, limit, await current_esco_version())
+    context = skill_context_cache.get(key)
+    graph_cache_stats()   # sizes, hits, misses, hit rates
+"""
+import os
+import time
+from typing import Hashable, Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+GRAPH_CACHE_TTL = float(os.getenv("GRAPH_CACHE_TTL", "3600"))
+ESCO_VERSION_REFRESH_SECONDS = float(os.getenv("ESCO_VERSION_REFRESH_SECONDS", "30"))
+ESCO_VERSION_TIMEOUT = float(os.getenv("ESCO_VERSION_TIMEOUT", "2"))
+
+skill_context_cache = TTLCache(maxsize=4096, ttl=GRAPH_CACHE_TTL)
+expanded_skills_cache = TTLCache(maxsize=8192, ttl=GRAPH_CACHE_TTL)
+occupation_cache = TTLCache(maxsize=2048, ttl=GRAPH_CACHE_TTL)
+
+# One failed lookup backs off for a refresh interval instead of slowing every request
+_version_breaker = CircuitBreaker("esco_version", failure_threshold=1, reset_timeout=ESCO_VERSION_REFRESH_SECONDS)
+_esco_version = 0
+_version_checked_at: Optional[float] = None
+
+
+def skill_set_key(kind: str, skill_ids: Iterable[int], *extra: Hashable) -> tuple:
+    """Order- and duplicate-insensitive cache key for a set of canonical skill ids."""
+    return (kind, tuple(sorted(set(skill_ids))), *extra)
+
+
+def invalidate_graph_caches() -> None:
+    skill_context_cache.invalidate()
+    expanded_skills_cache.invalidate()
+    occupation_cache.invalidate()
+
+
+async def _read_esco_version() -> int:
+    from app.core.database import async_session
+    async with async_session() as session:
+        result = await session.execute(text("SELECT coalesce(max(id), 0) FROM esco_dataset_versions"))
+        return int(result.scalar() or 0)
+
+
+async def current_esco_version() -> int:
+    """Latest ESCO dataset version; cached, and the last known value if the lookup fails."""
+    global _esco_version, _version_checked_at
+    now = time.monotonic()
+    if _version_checked_at is not None and now - _version_checked_at < ESCO_VERSION_REFRESH_SECONDS:
+        return _esco_version
+    _version_checked_at = now
+
+    try:
+        version = await _version_breaker.call(_read_esco_version, timeout=ESCO_VERSION_TIMEOUT)
+    except CircuitOpenError:
+        return _esco_version
+    except Exception as e:
+        print(f"[GraphCache] ESCO dataset version unavailable, keeping v{_esco_version}: {e}")
+        return _esco_version
+
+    if version != _esco_version:
+        print(f"[GraphCache] ESCO dataset version {_esco_version} -> {version}; clearing GraphRAG caches")
+        invalidate_graph_caches()
+        _esco_version = version
+    return version
+
+
+async def bump_esco_version(session: AsyncSession, source: str, notes: Optional[str] = None) -> int:
+    """Record a finished ESCO import; API processes drop their cached results on their next version check."""
+    result = await session.execute(
+        text("INSERT INTO esco_dataset_versions (source, notes, imported_at) VALUES (:source, :notes, now() AT TIME ZONE 'utc') RETURNING id"),
+        {"source": source, "notes": notes},
+    )
+    version = int(result.scalar())
+    await session.commit()
+    invalidate_graph_caches()
+    return version
+
+
+def _cache_stats(cache: TTLCache) -> dict:
+    lookups = cache.hits + cache.misses
+    return {
+        "size": len(cache),
+        "maxsize": cache.maxsize,
+        "hits": cache.hits,
+        "misses": cache.misses,
+        "hit_rate": round(cache.hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+def graph_cache_stats() -> dict:
+    return {
+        "esco_version": _esco_version,
+        "skill_context": _cache_stats(skill_context_cache),
+        "expanded_skills": _cache_stats(expanded_skills_cache),
+        "occupations": _cache_stats(occupation_cache),
+    }
@@ -1,33 +1,88 @@
+import asyncio
+import os
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from app.agents.gemini_client import gemini_client
+from app.retrieval.esco_runtime import get_local_skill_search, get_skill_graph, get_skill_normalizer
+from app.retrieval.graph_cache import current_esco_version, skill_context_cache, skill_set_key
 
-async def fetch_skill_context(query: str, session: AsyncSession, limit: int = 3) -> str:
-    """
-    Execute a Hybrid GraphRAG pipeline for a given skill query:
-    1. Hybrid Search (Vector + FTS via RRF) to find base ESCO skills matching the query.
-    2. Graph Expansion (CTE) to fetch their relational context.
-    Returns a formatted string representing the knowledge graph context.
-    """
-    
-    # 1. Generate Query Vector
-    query_vector = gemini_client.embed_content('text-embedding-004', query)
-    
-    # 2. Hybrid Search Query with Reciprocal Rank Fusion
-    hybrid_query = text("""
+# pgvector HNSW search breadth (pgvector default is 40; must be >= the 20 candidates we fetch)
+ESCO_HNSW_EF_SEARCH = int(os.getenv("ESCO_HNSW_EF_SEARCH", "40"))
+
+# Fallback expansion when the in-memory ESCO graph is not loaded
+EXPANSION_CTE = text("""
+    WITH RECURSIVE skill_relations AS (
+        -- Base case: Direct connections
+        SELECT
+            er.source_skill_id,
+            er.target_skill_id,
+            er.relation_type,
+            1 as depth
+        FROM esco_relations er
+        WHERE er.source_skill_id = ANY(:skill_ids) OR er.target_skill_id = ANY(:skill_ids)
+
+        UNION
+
+        -- Recursive step: Connections from the discovered nodes, up to depth 2
+        SELECT
+            er.source_skill_id,
+            er.target_skill_id,
+            er.relation_type,
+            sr.depth + 1
+        FROM esco_relations er
+        INNER JOIN skill_relations sr
+            ON er.source_skill_id = sr.target_skill_id OR er.target_skill_id = sr.source_skill_id
+        WHERE sr.depth < 2
+    )
+    SELECT DISTINCT
+        ss.name as source_name,
+        sr.relation_type,
+        ts.name as target_name
+    FROM skill_relations sr
+    JOIN esco_skills ss ON sr.source_skill_id = ss.id
+    JOIN esco_skills ts ON sr.target_skill_id = ts.id;
+""")
+
+
+async def _expand_with_cte(session: AsyncSession, skill_ids: list) -> list[tuple[str, str, str]]:
+    """(source_name, relation_type, target_name) up to 2 edges from `skill_ids`, via SQL."""
+    if not skill_ids:
+        return []
+    result = await session.execute(EXPANSION_CTE, {"skill_ids": skill_ids})
+    return [tuple(row) for row in result.fetchall()]
+
+
+# Hybrid search (vector + FTS fused with Reciprocal Rank Fusion) for a batch of
+# queries in one round trip: each (query, vector) pair drives a LATERAL top-k.
+# Each leg orders and limits in a subquery before ranking, so Postgres can
+# answer it from an index (HNSW on embedding, GIN on search_tsv) instead of
+# ranking every row.
+HYBRID_SEARCH_MANY = text("""
+    SELECT q.ord, hits.id, hits.name, hits.description, hits.skill_type
+    FROM unnest(CAST(:queries AS text[]), CAST(:vectors AS text[]))
+         WITH ORDINALITY AS q(query, vector, ord)
+    CROSS JOIN LATERAL (
         WITH vector_search AS (
             SELECT id, name, description, skill_type,
-                   ROW_NUMBER() OVER (ORDER BY embedding <-> :vector) as rank_vector
-            FROM esco_skills
-            ORDER BY embedding <-> :vector
-            LIMIT 20
+                   ROW_NUMBER() OVER (ORDER BY distance) as rank_vector
+            FROM (
+                SELECT id, name, description, skill_type, embedding <-> q.vector::vector AS distance
+                FROM esco_skills
+                ORDER BY embedding <-> q.vector::vector
+                LIMIT 20
+            ) nearest
         ),
         keyword_search AS (
             SELECT id, name, description, skill_type,
-                   ROW_NUMBER() OVER (ORDER BY ts_rank(to_tsvector('english', name || ' ' || coalesce(description, '')), plainto_tsquery('english', :query)) DESC) as rank_keyword
-            FROM esco_skills
-            WHERE to_tsvector('english', name || ' ' || coalesce(description, '')) @@ plainto_tsquery('english', :query)
-            LIMIT 20
+                   ROW_NUMBER() OVER (ORDER BY rank DESC) as rank_keyword
+            FROM (
+                SELECT id, name, description, skill_type,
+                       ts_rank(search_tsv, plainto_tsquery('english', q.query)) AS rank
+                FROM esco_skills
+                WHERE search_tsv @@ plainto_tsquery('english', q.query)
+                ORDER BY rank DESC
+                LIMIT 20
+            ) matched
         ),
         rrf AS (
             SELECT 
@@ -41,76 +96,157 @@ async def fetch_skill_context(query: str, session: AsyncSession, limit: int = 3)
             FROM vector_search v
             FULL OUTER JOIN keyword_search k ON v.id = k.id
         )
-        SELECT id, name, description, skill_type
+        SELECT id, name, description, skill_type, rrf_score
         FROM rrf
         ORDER BY rrf_score DESC
-        LIMIT :limit;
-    """)
-    
-    # pgvector expects vectors passed as strings dynamically in parameterized queries like '[0.1, 0.2, ...]'
-    result = await session.execute(hybrid_query, {"vector": str(query_vector), "query": query, "limit": limit})
-    base_skills = result.fetchall()
-    
+        LIMIT :limit
+    ) hits
+    ORDER BY q.ord, hits.rrf_score DESC;
+""")
+
+
+async def _hybrid_search_many(session: AsyncSession, queries: list[str], limit: int, dataset_version: int = 0) -> tuple[list[list], bool]:
+    """
+    Top-`limit` ESCO skills for each query, using one batched embedding call and
+    one SQL query, or no query at all when the local skill search is loaded.
+    Also returns whether every query was embedded: a failed embedding comes back
+    as a zero vector, leaving keyword-only matches that must not be cached.
+    """
+    query_vectors = await asyncio.to_thread(gemini_client.embed_contents, 'text-embedding-004', queries)
+    embedded = all(any(v) for v in query_vectors)
+
+    local_search = get_local_skill_search(dataset_version)
+    if local_search is not None:
+        return local_search.search_many(queries, query_vectors, limit), embedded
+
+    # HNSW candidate list size for this transaction: higher = better recall, slower
+    await session.execute(
+        text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+        {"ef_search": str(ESCO_HNSW_EF_SEARCH)},
+    )
+
+    # pgvector parses vectors from their text form '[0.1, 0.2, ...]'
+    result = await session.execute(HYBRID_SEARCH_MANY, {
+        "queries": queries,
+        "vectors": [str(list(v)) for v in query_vectors],
+        "limit": limit,
+    })
+    matches = [[] for _ in queries]
+    for row in result.fetchall():
+        matches[row.ord - 1].append(row)
+    return matches, embedded
+
+
+async def _expand(session: AsyncSession, base_skills: list) -> list[tuple[str, str, str]]:
+    """
+    Relationships up to 2 edges away from the seed skills: served from the in-memory
+    ESCO graph when loaded, otherwise by a recursive CTE over esco_relations.
+    """
+    skill_graph = get_skill_graph()
+    if skill_graph is None:
+        return await _expand_with_cte(session, [s.id for s in base_skills])
+
+    seeds = skill_graph.ids_for(s.name for s in base_skills)
+    return [
+        (skill_graph.names[src], relation_type, skill_graph.names[dst])
+        for src, relation_type, dst in skill_graph.k_hop_edges(seeds, k=2)
+        if skill_graph.names[src] and skill_graph.names[dst]
+    ]
+
+
+def _format_skill(skill) -> str:
+    description_snippet = skill.description[:150] + "..." if skill.description else "No description available"
+    return f"{skill.name} ({skill.skill_type}): {description_snippet}"
+
+
+def _format_relations(relations: list[tuple[str, str, str]]) -> list[str]:
+    lines = ["Knowledge Graph Context (Broader / Narrower / Transversal):"]
+    if relations:
+        for source_name, relation_type, target_name in relations:
+            lines.append(f" - {source_name} is '{relation_type}' related to {target_name}")
+    else:
+        lines.append(" - No further relationships found in graph.")
+    return lines
+
+
+async def fetch_skill_context(query: str, session: AsyncSession, limit: int = 3) -> str:
+    """
+    Execute a Hybrid GraphRAG pipeline for a given skill query:
+    1. Hybrid Search (Vector + FTS via RRF) to find base ESCO skills matching the query.
+    2. Graph Expansion (in-memory ESCO graph, or a CTE) to fetch their relational context.
+    Returns a formatted string representing the knowledge graph context.
+    Matches and relations are cached per canonical skill and ESCO dataset version;
+    the text is formatted per call, so it always quotes the caller's own query.
+    """
+    version = await current_esco_version()
+    cache_key = skill_set_key("context", get_skill_normalizer().canonicalize([query]), limit, version)
+    cached = skill_context_cache.get(cache_key)
+    if cached is None:
+        matches, embedded = await _hybrid_search_many(session, [query], limit, version)
+        base_skills = matches[0]
+        relations = await _expand(session, base_skills) if base_skills else []
+        cached = (base_skills, relations)
+        if embedded:
+            skill_context_cache.set(cache_key, cached)
+    base_skills, relations = cached
+
     if not base_skills:
         return f"No ESCO skills matched the query: '{query}'."
 
-    # 3. Graph Expansion via CTE
-    # Find relationships up to a depth of 2 edges connected to our base seed skills
-    skill_ids = [s.id for s in base_skills]
-    
-    # Provide a dummy list [-1] if empty to prevent syntax errors (won't happen here due to the check above, but good practice)
-    if not skill_ids:
-        skill_ids = [-1]
-
-    cte_query = text("""
-        WITH RECURSIVE skill_relations AS (
-            -- Base case: Direct connections
-            SELECT 
-                er.source_skill_id, 
-                er.target_skill_id, 
-                er.relation_type,
-                1 as depth
-            FROM esco_relations er
-            WHERE er.source_skill_id = ANY(:skill_ids) OR er.target_skill_id = ANY(:skill_ids)
-            
-            UNION
-            
-            -- Recursive step: Connections from the discovered nodes, up to depth 2
-            SELECT 
-                er.source_skill_id, 
-                er.target_skill_id, 
-                er.relation_type,
-                sr.depth + 1
-            FROM esco_relations er
-            INNER JOIN skill_relations sr 
-                ON er.source_skill_id = sr.target_skill_id OR er.target_skill_id = sr.source_skill_id
-            WHERE sr.depth < 2
-        )
-        SELECT DISTINCT
-            sr.relation_type,
-            ss.name as source_name,
-            ts.name as target_name
-        FROM skill_relations sr
-        JOIN esco_skills ss ON sr.source_skill_id = ss.id
-        JOIN esco_skills ts ON sr.target_skill_id = ts.id;
-    """)
-    
-    relations_result = await session.execute(cte_query, {"skill_ids": skill_ids})
-    relations = relations_result.fetchall()
-    
-    # 4. Format Output for the Agent Prompt
+    # Format Output for the Agent Prompt
     context_lines = []
     context_lines.append(f"Query: '{query}'")
     context_lines.append("Matched ESCO Base Skills:")
     for skill in base_skills:
-        description_snippet = skill.description[:150] + "..." if skill.description else "No description available"
-        context_lines.append(f" - {skill.name} ({skill.skill_type}): {description_snippet}")
-        
-    context_lines.append("Knowledge Graph Context (Broader / Narrower / Transversal):")
-    if relations:
-        for rel in relations:
-            context_lines.append(f" - {rel.source_name} is '{rel.relation_type}' related to {rel.target_name}")
-    else:
-        context_lines.append(" - No further relationships found in graph.")
-        
+        context_lines.append(f" - {_format_skill(skill)}")
+    context_lines.extend(_format_relations(relations))
+    return "\n".join(context_lines)
+
+
+async def fetch_skill_context_many(skills: list[str], session: AsyncSession, limit: int = 3) -> str:
+    """
+    Hybrid GraphRAG for a list of skills: each skill gets its own embedding and
+    keyword query (instead of one blended query for the whole list), all resolved
+    in a single round trip, and one graph expansion is shared across the union of
+    matched seeds. Matches and relations are cached per canonical skill set and ESCO
+    dataset version (unless the embedding failed); the text is formatted per call
+    from the caller's queries.
+    """
+    queries = []
+    for skill in skills:
+        skill = (skill or "").strip()
+        if skill and skill.lower() not in {q.lower() for q in queries}:
+            queries.append(skill)
+    if not queries:
+        return "No skills provided for ESCO lookup."
+
+    skill_ids = get_skill_normalizer().canonicalize(queries)
+    version = await current_esco_version()
+    cache_key = skill_set_key("context_many", skill_ids, limit, version)
+    cached = skill_context_cache.get(cache_key)
+    if cached is None:
+        matches, embedded = await _hybrid_search_many(session, queries, limit, version)
+        seeds = {}
+        for skill_matches in matches:
+            for skill in skill_matches:
+                seeds.setdefault(skill.id, skill)
+        relations = await _expand(session, list(seeds.values())) if seeds else []
+        # Keyed by canonical id: another spelling of the same skills reuses the rows
+        cached = (dict(zip(skill_ids, matches)), relations)
+        if embedded:
+            skill_context_cache.set(cache_key, cached)
+    matches_by_id, relations = cached
+    matches = [matches_by_id.get(skill_id, []) for skill_id in skill_ids]
+
+    if not any(matches):
+        return f"No ESCO skills matched the queries: {', '.join(queries)}."
+
+    context_lines = [f"Queries: {', '.join(repr(q) for q in queries)}", "Matched ESCO Base Skills:"]
+    for query, skill_matches in zip(queries, matches):
+        context_lines.append(f" {query}:")
+        if not skill_matches:
+            context_lines.append("   - No ESCO match")
+        for skill in skill_matches:
+            context_lines.append(f"   - {_format_skill(skill)}")
+    context_lines.extend(_format_relations(relations))
     return "\n".join(context_lines)
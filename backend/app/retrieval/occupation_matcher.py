@@ -0,0 +1,187 @@
+"""
+Job description → ESCO occupation resolution, with each occupation's
+essential / optional skills precomputed for local gap scoring.
+
+    resolve       top-k occupations for a batch of JD embeddings, by cosine
+                  similarity against the occupation embeddings (name +
+                  description, the same text-embedding-004 space as skills)
+    weights       sparse (occupations x skills) matrix: essential skills 1.0,
+                  optional skills OPTIONAL_SKILL_WEIGHT
+
+Skill columns are lower-cased ESCO skill names, so results compare directly
+with the skill normalizer's names. With this loaded, a job description
+with no recognisable skill terms still gets a requirement list, and the
+gap computation needs no LLM call.
+
+Usage:
+    matcher = OccupationMatcher.from_snapshot(snapshot)
+    [hits] = matcher.resolve([jd_vector], k=3)
+    matcher.required_skills(hits[0].id)
+"""
+import os
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.retrieval.vector_index import VectorIndex
+
+OPTIONAL_SKILL_WEIGHT = float(os.getenv("OPTIONAL_SKILL_WEIGHT", "0.5"))
+# Below this cosine similarity a JD is not considered to describe the occupation
+OCCUPATION_MIN_SIMILARITY = float(os.getenv("OCCUPATION_MIN_SIMILARITY", "0.55"))
+
+RELATION_WEIGHTS = {"essential": 1.0, "optional": OPTIONAL_SKILL_WEIGHT}
+
+
+@dataclass
+class OccupationHit:
+    id: int
+    uri: str
+    name: str
+    similarity: float
+
+
+@dataclass
+class RequiredSkill:
+    name: str
+    relation_type: str
+    weight: float
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class OccupationMatcher:
+    def __init__(
+        self,
+        uris: Sequence[str],
+        names: Sequence[str],
+        vectors: np.ndarray,
+        embedded: Sequence[int],
+        skill_names: Sequence[str],
+        edges: Iterable[tuple[int, int, str]],
+    ):
+        """
+        `vectors` holds the embeddings of the occupations listed in `embedded` (row i is
+        occupation embedded[i]); `edges` are (occupation, skill column, relation type).
+        """
+        self.uris = list(uris)
+        self.names = list(names)
+        self.skill_names = [name.lower() for name in skill_names]
+        self._embedded = np.asarray(embedded, dtype=np.int64)
+        # Unit vectors: L2 order is cosine order, and similarity = 1 - d^2 / 2
+        self.index = VectorIndex(_unit_rows(vectors).reshape(len(self._embedded), -1))
+
+        # A pair listed under both relations counts as essential
+        relations: dict[tuple[int, int], str] = {}
+        for occupation_id, skill_col, relation in edges:
+            if relation in RELATION_WEIGHTS and relations.get((occupation_id, skill_col)) != "essential":
+                relations[(occupation_id, skill_col)] = relation
+        shape = (len(self.uris), len(self.skill_names))
+        rows = [occupation_id for occupation_id, _ in relations]
+        cols = [skill_col for _, skill_col in relations]
+        weights = [RELATION_WEIGHTS[relation] for relation in relations.values()]
+        # 2 = essential, 1 = optional (no zeros, so both matrices share one sparsity pattern)
+        kinds = [2 if relation == "essential" else 1 for relation in relations.values()]
+        self.weights = sparse.csr_matrix((np.asarray(weights, dtype=np.float32), (rows, cols)), shape=shape)
+        self._kinds = sparse.csr_matrix((np.asarray(kinds, dtype=np.int8), (rows, cols)), shape=shape)
+        self.weights.sort_indices()
+        self._kinds.sort_indices()
+
+    def __len__(self) -> int:
+        return len(self.uris)
+
+    @property
+    def num_embedded(self) -> int:
+        return len(self._embedded)
+
+    # ── Construction ──────────────────────────────────────────
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> Optional["OccupationMatcher"]:
+        """Occupations of an EscoSnapshot with their skill CSR; None without occupation embeddings."""
+        if snapshot.occupation_embeddings is None or not snapshot.num_occupations:
+            return None
+        embedded = np.flatnonzero(snapshot.occupation_embedding_mask)
+        edges = []
+        for relation in RELATION_WEIGHTS:
+            csr = snapshot.occupation_skill_csr(relation)
+            if csr is not None:
+                indptr, indices = csr
+                occupation_ids = np.repeat(np.arange(snapshot.num_occupations), np.diff(indptr))
+                edges.extend(zip(occupation_ids.tolist(), indices.tolist(), [relation] * len(indices)))
+        return cls(
+            snapshot.occupation_uris.tolist(),
+            snapshot.occupation_names.tolist(),
+            snapshot.occupation_embeddings[embedded],
+            embedded,
+            snapshot.skill_names.tolist(),
+            edges,
+        )
+
+    @classmethod
+    async def from_session(cls, session: AsyncSession) -> Optional["OccupationMatcher"]:
+        """esco_occupations / esco_occupation_skills; None if no occupation has an embedding."""
+        occupations = (await session.execute(
+            text("SELECT id, uri, name, embedding FROM esco_occupations ORDER BY uri")
+        )).fetchall()
+        if not any(o.embedding is not None for o in occupations):
+            return None
+        links = (await session.execute(text(
+            "SELECT os.occupation_id, lower(s.name) AS skill, os.relation_type "
+            "FROM esco_occupation_skills os JOIN esco_skills s ON s.id = os.skill_id"
+        ))).fetchall()
+
+        position = {o.id: i for i, o in enumerate(occupations)}
+        skill_names = sorted({link.skill for link in links})
+        skill_index = {name: i for i, name in enumerate(skill_names)}
+        embedded = [i for i, o in enumerate(occupations) if o.embedding is not None]
+        return cls(
+            [o.uri for o in occupations],
+            [o.name for o in occupations],
+            np.asarray([np.asarray(occupations[i].embedding, dtype=np.float32) for i in embedded]),
+            embedded,
+            skill_names,
+            ((position[link.occupation_id], skill_index[link.skill], link.relation_type) for link in links),
+        )
+
+    # ── Queries ───────────────────────────────────────────────
+
+    def resolve(
+        self, query_vectors: Any, k: int = 3, min_similarity: float = OCCUPATION_MIN_SIMILARITY,
+    ) -> list[list[OccupationHit]]:
+        """Top-`k` occupations per query embedding with cosine similarity >= `min_similarity`."""
+        queries = _unit_rows(np.atleast_2d(np.asarray(query_vectors, dtype=np.float32)))
+        rows, distances = self.index.search(queries, k)
+        results = []
+        for query, query_rows, query_distances in zip(queries, rows, distances):
+            if not query.any():   # zero vector: the embedding call failed
+                results.append([])
+                continue
+            hits = []
+            for row, distance in zip(query_rows.tolist(), query_distances.tolist()):
+                similarity = 1.0 - distance * distance / 2
+                if similarity >= min_similarity:
+                    occupation_id = int(self._embedded[row])
+                    hits.append(OccupationHit(occupation_id, self.uris[occupation_id], self.names[occupation_id], round(similarity, 4)))
+            results.append(hits)
+        return results
+
+    def required_skills(self, occupation_id: int) -> list[RequiredSkill]:
+        """An occupation's skills, essential first, then by name."""
+        start, end = self.weights.indptr[occupation_id], self.weights.indptr[occupation_id + 1]
+        skills = [
+            RequiredSkill(self.skill_names[col], "essential" if kind == 2 else "optional", float(weight))
+            for col, weight, kind in zip(
+                self.weights.indices[start:end].tolist(),
+                self.weights.data[start:end].tolist(),
+                self._kinds.data[start:end].tolist(),
+            )
+        ]
+        return sorted(skills, key=lambda s: (s.relation_type != "essential", s.name))
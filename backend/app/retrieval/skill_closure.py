@@ -0,0 +1,188 @@
+"""
+Precomputed ESCO implication closure.
+
+For every node of the SkillGraph, the set of skills it implies (itself plus
+everything reachable in 1..depth hops along the outgoing relations — the
+same walk as `GraphRAGAgent.get_expanded_skills`) is stored as one row of a
+packed bitset matrix. Candidate-vs-JD coverage is then an OR of a few rows
+followed by an AND / popcount against the required skills.
+
+Rows are keyed by ESCO URI and aligned with the graph's integer ids. Each
+row also records a fingerprint of its node's outgoing edges, so after an
+ESCO import only the rows that can reach a changed node are recomputed.
+
+Usage:
+    closure = SkillClosure.build(graph, depth=2)
+    closure.save(path)
+    mask = closure.implied(graph.ids_for(candidate_skills))
+    covered = closure.contains(mask, graph.ids_for(required_skills))
+"""
+import hashlib
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.retrieval.skill_graph import SkillGraph
+
+# Rows unpacked at a time when remapping columns after the id order changes
+_REMAP_CHUNK = 1024
+
+
+def _popcount(packed: np.ndarray) -> int:
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(packed).sum())
+    return int(np.unpackbits(packed).sum())
+
+
+def _set_bits(row: np.ndarray, ids: np.ndarray) -> None:
+    # np.packbits order: bit 7 of byte 0 is column 0
+    np.bitwise_or.at(row, ids >> 3, (128 >> (ids & 7)).astype(np.uint8))
+
+
+def edge_fingerprints(graph: SkillGraph, relations: Iterable[str]) -> np.ndarray:
+    """Per node: a 64-bit hash of its outgoing (relation, target uri) pairs."""
+    relations = sorted(r for r in relations if r in graph.csr)
+    fingerprints = np.zeros(graph.num_nodes, dtype=np.uint64)
+    for node_id in range(graph.num_nodes):
+        digest = hashlib.blake2b(digest_size=8)
+        for relation in relations:
+            indptr, indices = graph.csr[relation]
+            targets = sorted(graph.uris[t] for t in indices[indptr[node_id]:indptr[node_id + 1]])
+            if targets:
+                digest.update(relation.encode())
+                digest.update("\x00".join(targets).encode())
+        fingerprints[node_id] = int.from_bytes(digest.digest(), "little")
+    return fingerprints
+
+
+class SkillClosure:
+    def __init__(
+        self,
+        uris: list[str],
+        bits: np.ndarray,
+        fingerprints: np.ndarray,
+        depth: int,
+        relations: list[str],
+    ):
+        self.uris = uris
+        self.bits = bits
+        self.fingerprints = fingerprints
+        self.depth = depth
+        self.relations = relations
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.uris)
+
+    # ── Build / refresh ───────────────────────────────────────
+
+    @staticmethod
+    def _compute_rows(graph: SkillGraph, rows: Iterable[int], depth: int, relations: list[str], bits: np.ndarray) -> None:
+        for node_id in rows:
+            row = bits[node_id]
+            row[:] = 0
+            _set_bits(row, np.append(graph.k_hop([node_id], k=depth, relations=relations), node_id).astype(np.int64))
+
+    @classmethod
+    def build(cls, graph: SkillGraph, depth: int = 2, relations: Optional[Iterable[str]] = None) -> "SkillClosure":
+        relations = sorted(relations or graph.csr.keys())
+        bits = np.zeros((graph.num_nodes, (graph.num_nodes + 7) // 8), dtype=np.uint8)
+        cls._compute_rows(graph, range(graph.num_nodes), depth, relations, bits)
+        return cls(list(graph.uris), bits, edge_fingerprints(graph, relations), depth, relations)
+
+    def matches(self, graph: SkillGraph) -> bool:
+        """True if this closure is current for `graph` (same ids, same edges)."""
+        return (
+            self.uris == graph.uris
+            and np.array_equal(self.fingerprints, edge_fingerprints(graph, self.relations))
+        )
+
+    def refresh(self, graph: SkillGraph) -> tuple["SkillClosure", int]:
+        """
+        Closure for an updated `graph`, recomputing only affected rows.
+
+        A row depends on the outgoing edges of every node within depth-1 hops of
+        it, so the affected rows are the nodes whose edges changed (or that are
+        new) plus everything that reaches them in depth-1 hops. Returns the new
+        closure and the number of rows recomputed.
+        """
+        fingerprints = edge_fingerprints(graph, self.relations)
+        old_index = {uri: i for i, uri in enumerate(self.uris)}
+        old_rows = np.array([old_index.get(uri, -1) for uri in graph.uris], dtype=np.int64)
+
+        changed = np.flatnonzero((old_rows < 0) | (fingerprints != self.fingerprints[np.maximum(old_rows, 0)]))
+        affected = np.zeros(graph.num_nodes, dtype=bool)
+        affected[changed] = True
+        if changed.size and self.depth > 1:
+            affected[graph.k_hop(changed, k=self.depth - 1, relations=self.relations, direction="in")] = True
+
+        bits = np.zeros((graph.num_nodes, (graph.num_nodes + 7) // 8), dtype=np.uint8)
+        kept = np.flatnonzero(~affected)
+        if self.uris == graph.uris:
+            bits[kept] = self.bits[kept]
+        else:
+            # Ids moved: remap columns old id -> new id (unaffected rows never reference removed nodes)
+            new_ids = np.full(self.num_nodes, -1, dtype=np.int64)
+            new_ids[old_rows[old_rows >= 0]] = np.flatnonzero(old_rows >= 0)
+            valid = new_ids >= 0
+            for start in range(0, kept.size, _REMAP_CHUNK):
+                rows = kept[start:start + _REMAP_CHUNK]
+                old = np.unpackbits(self.bits[old_rows[rows]], axis=1, count=self.num_nodes).astype(bool)
+                new = np.zeros((rows.size, graph.num_nodes), dtype=bool)
+                new[:, new_ids[valid]] = old[:, valid]
+                bits[rows] = np.packbits(new, axis=1)
+
+        recomputed = np.flatnonzero(affected)
+        self._compute_rows(graph, recomputed, self.depth, self.relations, bits)
+        return SkillClosure(list(graph.uris), bits, fingerprints, self.depth, self.relations), int(recomputed.size)
+
+    # ── Persistence ───────────────────────────────────────────
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path,
+            uris=np.array(self.uris, dtype=object).astype(str),
+            bits=self.bits,
+            fingerprints=self.fingerprints,
+            depth=np.array(self.depth),
+            relations=np.array(self.relations, dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "SkillClosure":
+        with np.load(path) as data:
+            return cls(
+                data["uris"].tolist(),
+                data["bits"],
+                data["fingerprints"],
+                int(data["depth"]),
+                data["relations"].tolist(),
+            )
+
+    # ── Queries ───────────────────────────────────────────────
+
+    def implied(self, ids: Iterable[int]) -> np.ndarray:
+        """Packed bitset of every skill implied by any of `ids`."""
+        ids = list(ids)
+        if not ids:
+            return np.zeros(self.bits.shape[1], dtype=np.uint8)
+        return np.bitwise_or.reduce(self.bits[ids], axis=0)
+
+    def mask(self, ids: Iterable[int]) -> np.ndarray:
+        """Packed bitset with exactly `ids` set."""
+        row = np.zeros(self.bits.shape[1], dtype=np.uint8)
+        _set_bits(row, np.asarray(list(ids), dtype=np.int64))
+        return row
+
+    def contains(self, mask: np.ndarray, ids: Iterable[int]) -> np.ndarray:
+        """Boolean per id: is its bit set in `mask`."""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        return ((mask[ids >> 3] >> (7 - (ids & 7))) & 1).astype(bool)
+
+    def coverage(self, candidate_ids: Iterable[int], required_ids: Iterable[int]) -> float:
+        """Fraction of the required skills implied by the candidate's skills."""
+        required = self.mask(required_ids)
+        total = _popcount(required)
+        if total == 0:
+            return 0.0
+        return _popcount(self.implied(candidate_ids) & required) / total
@@ -0,0 +1,148 @@
+"""
+Local skill extraction: an Aho-Corasick automaton over every label in the
+SkillNormalizer dictionary (ESCO preferred/alt labels + curated aliases).
+
+The automaton works on normalized word tokens rather than characters, so
+matches always fall on word boundaries ("Java" never fires inside
+"JavaScript") and the trie stays small. A CV or JD is tagged in one linear
+pass; overlapping hits are resolved leftmost-longest ("machine learning
+engineer" yields "machine learning", not "learning"). Single-word labels
+are only used when they are a skill's own name or a curated alias: ESCO
+alt labels such as "Git" name one tool under a broader concept ('tools for
+software configuration management') and would tag it far too loosely.
+Single-word matches follow the normalizer's free-text rules (`counts_alone`,
+`needs_context`), so "go", "Net" or "every Node" are not skills here either.
+
+SKILL_EXTRACTION_MODE controls how callers use it:
+    hybrid  — extractor, enriched with the LLM's list (default)
+    local   — extractor only, no LLM call
+    llm     — LLM only (previous behaviour)
+`hybrid` stays the default until the extractor's recall has been checked
+against a labelled sample of CVs and JDs.
+
+Usage:
+    extractor = get_skill_extractor()
+    extractor.extract("Senior React.js engineer with Python and CI/CD")
+    # -> ["React", "Python (computer programming)", "CI/CD"]
+"""
+import os
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+from app.retrieval.skill_normalizer import SkillNormalizer, confirm_in_context, normalize_label, tokenize
+
+SKILL_EXTRACTION_MODE = os.getenv("SKILL_EXTRACTION_MODE", "hybrid").lower()
+
+
+@dataclass
+class SkillMention:
+    skill_id: int
+    start: int      # token index
+    end: int        # token index, exclusive
+    text: str
+
+
+class SkillExtractor:
+    def __init__(self, normalizer: SkillNormalizer):
+        self.normalizer = normalizer
+        self._vocab: dict[str, int] = {}
+        # Trie over token ids; transitions live in one dict keyed by (state, token)
+        self._goto: dict[tuple[int, int], int] = {}
+        self._output: list[Optional[tuple[int, int]]] = [None]  # (length in tokens, skill id)
+        children: list[list[tuple[int, int]]] = [[]]
+
+        for label, skill_id in normalizer.labels():
+            keys = [normalize_label(t) for t in tokenize(label)]
+            keys = [k for k in keys if k]
+            if not keys:
+                continue
+            if len(keys) == 1 and not normalizer.is_name(label):
+                continue
+            state = 0
+            for key in keys:
+                token = self._vocab.setdefault(key, len(self._vocab))
+                next_state = self._goto.get((state, token))
+                if next_state is None:
+                    next_state = len(self._output)
+                    self._goto[(state, token)] = next_state
+                    self._output.append(None)
+                    children.append([])
+                    children[state].append((token, next_state))
+                state = next_state
+            if self._output[state] is None:
+                self._output[state] = (len(keys), skill_id)
+
+        # Failure links and dictionary-suffix links, breadth-first
+        self._fail = [0] * len(self._output)
+        self._dict_link = [0] * len(self._output)
+        queue = [child for _, child in children[0]]
+        for state in queue:
+            for token, child in children[state]:
+                fallback = self._fail[state]
+                while fallback and (fallback, token) not in self._goto:
+                    fallback = self._fail[fallback]
+                target = self._goto.get((fallback, token), 0)
+                self._fail[child] = target if target != child else 0
+                link = self._fail[child]
+                self._dict_link[child] = link if self._output[link] is not None else self._dict_link[link]
+                queue.append(child)
+
+    @property
+    def num_states(self) -> int:
+        return len(self._output)
+
+    def _all_matches(self, tokens: list[str]) -> list[tuple[SkillMention, bool]]:
+        """Every match with whether it is tentative (a CONTEXT_WORDS alias, kept only near another skill)."""
+        matches = []
+        state = 0
+        for position, raw in enumerate(tokens):
+            token = self._vocab.get(normalize_label(raw), -1)
+            while state and (state, token) not in self._goto:
+                state = self._fail[state]
+            state = self._goto.get((state, token), 0)
+
+            hit = state if self._output[state] is not None else self._dict_link[state]
+            while hit:
+                length, skill_id = self._output[hit]
+                start = position - length + 1
+                if length > 1 or self.normalizer.counts_alone(raw):
+                    mention = SkillMention(skill_id, start, position + 1, " ".join(tokens[start:position + 1]))
+                    matches.append((mention, length == 1 and self.normalizer.needs_context(raw)))
+                hit = self._dict_link[hit]
+        return matches
+
+    def find(self, text: str) -> list[SkillMention]:
+        """Non-overlapping skill mentions in `text`, leftmost-longest."""
+        chosen = []
+        covered_until = 0
+        matches = sorted(self._all_matches(tokenize(text)), key=lambda m: (m[0].start, -(m[0].end - m[0].start)))
+        for mention, tentative in matches:
+            if mention.start >= covered_until:
+                chosen.append((mention, tentative))
+                covered_until = mention.end
+        confirmed = confirm_in_context([(m.start, m.end, tentative) for m, tentative in chosen])
+        return [mention for (mention, _), keep in zip(chosen, confirmed) if keep]
+
+    def extract_ids(self, text: str, limit: Optional[int] = None, by_frequency: bool = False) -> list[int]:
+        """Distinct skill ids in order of first mention (or most mentioned first)."""
+        mentions = self.find(text)
+        counts = Counter(m.skill_id for m in mentions)
+        ordered = list(dict.fromkeys(m.skill_id for m in mentions))
+        if by_frequency:
+            ordered.sort(key=lambda skill_id: -counts[skill_id])   # stable: ties keep first-mention order
+        return ordered[:limit] if limit is not None else ordered
+
+    def extract(self, text: str, limit: Optional[int] = None, by_frequency: bool = False) -> list[str]:
+        """Canonical skill names mentioned in `text`."""
+        return [self.normalizer.name(i) for i in self.extract_ids(text, limit, by_frequency)]
+
+    def merge(self, skills: list[str], extra: list[str]) -> list[str]:
+        """`skills` followed by the entries of `extra` that are not already in it (by canonical id)."""
+        seen = set(self.normalizer.canonicalize(skills))
+        merged = list(skills)
+        for skill, skill_id in zip(extra, self.normalizer.canonicalize(extra)):
+            if skill_id not in seen:
+                seen.add(skill_id)
+                merged.append(skill)
+        return merged
@@ -0,0 +1,260 @@
+"""
+In-memory ESCO skill graph.
+
+Skills (and skill groups) get dense integer ids; each relation type
+('essential', 'optional', 'broader', ...) is stored as its own CSR pair of
+NumPy arrays (indptr, indices), with the reverse direction built lazily.
+A k-hop neighbourhood for a batch of seed skills is then a handful of
+vectorised gathers instead of a recursive CTE or one Neo4j round-trip per
+skill.
+
+Usage:
+    graph = SkillGraph.from_esco_csv()
+    seeds = graph.ids_for(["Python", "SQL"])
+    related = graph.names_for(graph.k_hop(seeds, k=2))
+"""
+from collections import defaultdict
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.retrieval import esco_csv
+
+DIRECTIONS = ("out", "in", "both")
+
+
+def _build_csr(num_nodes: int, src: np.ndarray, dst: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Deduplicated CSR (indptr, indices) for edges src[i] -> dst[i]."""
+    if src.size:
+        keys = np.unique(src.astype(np.int64) * num_nodes + dst)
+        src, dst = keys // num_nodes, keys % num_nodes
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=num_nodes), out=indptr[1:])
+    return indptr, dst.astype(np.int32)
+
+
+def _gather(csr: tuple[np.ndarray, np.ndarray], frontier: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """All (source, neighbour) pairs leaving `frontier`, without a Python loop."""
+    indptr, indices = csr
+    starts = indptr[frontier]
+    lengths = indptr[frontier + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int32)
+        return empty, empty
+    # Position of every neighbour inside `indices`: run-length expand each row's start
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+    return np.repeat(frontier, lengths).astype(np.int32), indices[offsets]
+
+
+class SkillGraph:
+    def __init__(
+        self,
+        uris: list[str],
+        names: list[str],
+        csr: dict[str, tuple[np.ndarray, np.ndarray]],
+        aliases: Optional[dict[str, int]] = None,
+    ):
+        self.uris = uris
+        self.names = names
+        self.csr = csr
+        self._reverse: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self.uri_to_id = {uri: i for i, uri in enumerate(uris)}
+
+        # Alternative labels first so preferred labels win on collisions
+        self.name_to_id: dict[str, int] = {}
+        for label, node_id in (aliases or {}).items():
+            self.name_to_id.setdefault(label.strip().lower(), node_id)
+        for node_id, name in enumerate(names):
+            if name:
+                self.name_to_id[name.strip().lower()] = node_id
+
+    # ── Construction ──────────────────────────────────────────
+
+    @classmethod
+    def from_edges(
+        cls,
+        uris: list[str],
+        names: list[str],
+        edges: dict[str, tuple[Iterable[int], Iterable[int]]],
+        aliases: Optional[dict[str, int]] = None,
+    ) -> "SkillGraph":
+        num_nodes = len(uris)
+        csr = {
+            relation: _build_csr(
+                num_nodes,
+                np.asarray(list(src), dtype=np.int64),
+                np.asarray(list(dst), dtype=np.int64),
+            )
+            for relation, (src, dst) in edges.items()
+        }
+        return cls(uris, names, csr, aliases)
+
+    @classmethod
+    def from_esco_csv(cls, esco_dir: Optional[str] = None) -> "SkillGraph":
+        """Build from the ESCO CSV export (skills, skill groups, skill-skill and broader relations)."""
+        uris: list[str] = []
+        names: list[str] = []
+        aliases: dict[str, int] = {}
+        index: dict[str, int] = {}
+
+        def node(uri: str, name: str = "") -> int:
+            node_id = index.get(uri)
+            if node_id is None:
+                node_id = index[uri] = len(uris)
+                uris.append(uri)
+                names.append(name)
+            elif name and not names[node_id]:
+                names[node_id] = name
+            return node_id
+
+        for concepts in (esco_csv.read_skills(esco_dir), esco_csv.read_skill_groups(esco_dir)):
+            for concept in concepts:
+                node_id = node(concept.uri, concept.name)
+                for label in concept.alt_labels:
+                    aliases.setdefault(label, node_id)
+
+        # Relations may reference concepts outside the loaded files; they stay as unnamed
+        # nodes so the hierarchy remains connected.
+        edges: dict[str, tuple[list[int], list[int]]] = defaultdict(lambda: ([], []))
+        relation_streams = (
+            esco_csv.read_skill_relations(esco_dir),
+            esco_csv.read_broader_skill_relations(esco_dir),
+        )
+        for stream in relation_streams:
+            for edge in stream:
+                src, dst = edges[edge.relation_type]
+                src.append(node(edge.source_uri))
+                dst.append(node(edge.target_uri))
+
+        return cls.from_edges(uris, names, edges, aliases)
+
+    @classmethod
+    async def from_session(cls, session: AsyncSession) -> "SkillGraph":
+        """Build from the esco_skills / esco_relations tables (node uri = ESCO URI, or the row id)."""
+        skills = (await session.execute(text("SELECT id, uri, name FROM esco_skills"))).fetchall()
+        uris = [s.uri or str(s.id) for s in skills]
+        names = [s.name for s in skills]
+        index = {str(s.id): i for i, s in enumerate(skills)}
+
+        relations = await session.execute(
+            text("SELECT source_skill_id, target_skill_id, relation_type FROM esco_relations")
+        )
+        edges: dict[str, tuple[list[int], list[int]]] = defaultdict(lambda: ([], []))
+        for row in relations.fetchall():
+            src, dst = index.get(str(row.source_skill_id)), index.get(str(row.target_skill_id))
+            if src is None or dst is None:
+                continue
+            relation = row.relation_type
+            # 'narrower' is stored on some rows; keep a single direction for the hierarchy
+            if relation == "narrower":
+                relation, src, dst = "broader", dst, src
+            edges[relation][0].append(src)
+            edges[relation][1].append(dst)
+
+        return cls.from_edges(uris, names, edges)
+
+    # ── Lookup ────────────────────────────────────────────────
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.uris)
+
+    @property
+    def num_edges(self) -> int:
+        return sum(int(indices.size) for _, indices in self.csr.values())
+
+    def ids_for(self, names: Iterable[str]) -> list[int]:
+        """Node ids for the given labels (preferred or alternative, case-insensitive); unknowns are dropped."""
+        ids = []
+        for name in names:
+            node_id = self.name_to_id.get(name.strip().lower())
+            if node_id is not None:
+                ids.append(node_id)
+        return ids
+
+    def names_for(self, ids: Iterable[int]) -> list[str]:
+        return [self.names[i] for i in ids if self.names[i]]
+
+    # ── Traversal ─────────────────────────────────────────────
+
+    def _reverse_csr(self, relation: str) -> tuple[np.ndarray, np.ndarray]:
+        if relation not in self._reverse:
+            indptr, indices = self.csr[relation]
+            src = np.repeat(np.arange(self.num_nodes), np.diff(indptr))
+            self._reverse[relation] = _build_csr(self.num_nodes, indices.astype(np.int64), src)
+        return self._reverse[relation]
+
+    def _adjacency(self, relations: Optional[Iterable[str]], direction: str):
+        """(relation, csr, reversed) triples to traverse."""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {DIRECTIONS}")
+        selected = [r for r in (relations or self.csr.keys()) if r in self.csr]
+        adjacency = []
+        for relation in selected:
+            if direction in ("out", "both"):
+                adjacency.append((relation, self.csr[relation], False))
+            if direction in ("in", "both"):
+                adjacency.append((relation, self._reverse_csr(relation), True))
+        return adjacency
+
+    def k_hop(
+        self,
+        seeds: Iterable[int],
+        k: int = 2,
+        relations: Optional[Iterable[str]] = None,
+        direction: str = "out",
+    ) -> np.ndarray:
+        """Ids reachable from `seeds` in 1..k hops (seeds excluded), nearest hops first."""
+        adjacency = self._adjacency(relations, direction)
+        frontier = np.unique(np.asarray(list(seeds), dtype=np.int32))
+        visited = np.zeros(self.num_nodes, dtype=bool)
+        visited[frontier] = True
+        found = []
+
+        for _ in range(k):
+            if not frontier.size:
+                break
+            reached = [_gather(csr, frontier)[1] for _, csr, _ in adjacency]
+            frontier = np.unique(np.concatenate(reached)) if reached else frontier[:0]
+            frontier = frontier[~visited[frontier]]
+            visited[frontier] = True
+            found.append(frontier)
+
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int32)
+
+    def k_hop_batch(self, seed_batches: Iterable[Iterable[int]], k: int = 2, **kwargs) -> list[np.ndarray]:
+        """`k_hop` for several independent seed sets."""
+        return [self.k_hop(seeds, k=k, **kwargs) for seeds in seed_batches]
+
+    def k_hop_edges(
+        self,
+        seeds: Iterable[int],
+        k: int = 2,
+        relations: Optional[Iterable[str]] = None,
+        direction: str = "both",
+    ) -> list[tuple[int, str, int]]:
+        """Distinct (source, relation, target) edges touching the 0..k-1 hop frontier of `seeds`."""
+        adjacency = self._adjacency(relations, direction)
+        frontier = np.unique(np.asarray(list(seeds), dtype=np.int32))
+        visited = np.zeros(self.num_nodes, dtype=bool)
+        visited[frontier] = True
+        edges: dict[tuple[int, str, int], None] = {}
+
+        for _ in range(k):
+            if not frontier.size:
+                break
+            reached = []
+            for relation, csr, is_reverse in adjacency:
+                origin, neighbour = _gather(csr, frontier)
+                pairs = zip(neighbour.tolist(), origin.tolist()) if is_reverse else zip(origin.tolist(), neighbour.tolist())
+                for src, dst in pairs:
+                    edges.setdefault((src, relation, dst), None)
+                reached.append(neighbour)
+            frontier = np.unique(np.concatenate(reached)) if reached else frontier[:0]
+            frontier = frontier[~visited[frontier]]
+            visited[frontier] = True
+
+        return list(edges)
@@ -0,0 +1,287 @@
+"""
+Canonical skill dictionary shared by every skill matcher.
+
+Labels are reduced to a compact key (NFKC, lower-case, only letters, digits,
+'+' and '#'), so "ReactJS", "React.js" and "react js" all key to "reactjs".
+A leading dot is kept (".NET" keys to ".net"), so the word "net" is not .NET.
+Keys resolve to one integer id per canonical skill through a single dict:
+
+    0 .. num_esco-1      ESCO concepts (the SkillGraph node ids, preferred and alt labels)
+    num_esco ..          curated skills not in ESCO (React, Kubernetes, ...)
+    < 0                  unknown skills: a stable hash of the key, so two
+                         spellings of the same unknown skill still compare equal
+
+The curated alias table overrides ESCO labels, since common tech shorthand
+("node", "ts", "k8s") otherwise collides with unrelated ESCO concepts. It
+also names tools ESCO only has as alt labels of a broader concept ("Git"
+under 'tools for software configuration management'), so they resolve to
+themselves.
+
+`mentions` scans free text, where single words are often just English:
+two-letter keys ("go", "ai") and CASED_WORDS ("excel") only count when
+written like a name ("Go", "AI", "Excel"), and single-word ESCO labels written in lower case ("manage") only
+count as part of a longer label. Curated aliases that are everyday words
+("node", "express", "spring") only count when written with a capital within
+CONTEXT_WINDOW tokens of another skill ("Java, Spring, Hibernate", not "Each
+Node is replicated"); the full spellings ("Node.js", "Express.js") always
+count. `lookup` / `canonicalize` take skills one at a time and resolve every
+label as before.
+
+Usage:
+    normalizer = get_skill_normalizer()
+    normalizer.canonicalize(["ReactJS", "postgres"]) == normalizer.canonicalize(["React", "PostgreSQL"])
+    normalizer.mentions("Senior React.js Engineer")
+"""
+import re
+import unicodedata
+import zlib
+from typing import Iterable, Optional
+
+from app.retrieval.skill_graph import SkillGraph
+
+# Canonical label -> common aliases / spellings
+CURATED_SKILLS: dict[str, list[str]] = {
+    "JavaScript": ["js", "ecmascript", "es6", "vanilla js"],
+    "TypeScript": ["ts"],
+    "React": ["reactjs", "react.js"],
+    "React Native": ["reactnative"],
+    "Node.js": ["node", "nodejs"],
+    "Vue.js": ["vue", "vuejs"],
+    "Angular": ["angularjs", "angular.js"],
+    "Next.js": ["nextjs"],
+    "Express.js": ["express", "expressjs"],
+    "Python": ["python3", "py"],
+    "Django": ["django rest framework", "drf"],
+    "Go": ["golang"],
+    "C#": ["csharp", "c sharp"],
+    "C++": ["cpp"],
+    ".NET": ["dotnet", ".net core", "asp.net"],
+    "Java": ["java se", "core java"],
+    "Spring Boot": ["springboot", "spring"],
+    "PostgreSQL": ["postgres", "postgre", "psql"],
+    "MySQL": ["my sql"],
+    "MongoDB": ["mongo"],
+    "SQL": ["structured query language"],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+    "Docker": ["docker containers"],
+    "Kubernetes": ["k8s", "kube"],
+    "Amazon Web Services": ["aws", "amazon aws"],
+    "Google Cloud Platform": ["gcp", "google cloud"],
+    "Microsoft Azure": ["azure"],
+    "CI/CD": ["continuous integration", "continuous delivery", "continuous deployment"],
+    "REST APIs": ["restful", "rest api", "restful apis", "restful api"],
+    "GraphQL": ["graph ql"],
+    "Machine Learning": ["ml"],
+    "Artificial Intelligence": ["ai"],
+    "Natural Language Processing": ["nlp"],
+    "scikit-learn": ["sklearn"],
+    "Quality Assurance": ["qa"],
+    "DevOps": ["dev ops"],
+    # Tools and frameworks ESCO only lists as alt labels of broader concepts ("Git", "Jenkins")
+    "Git": [],
+    "GitHub": [],
+    "GitLab": [],
+    "Jira": [],
+    "Confluence": [],
+    "Linux": [],
+    "Unix": [],
+    "Bash": ["shell scripting"],
+    "Microsoft Excel": ["excel", "ms excel"],
+    "Power BI": ["powerbi"],
+    "Tableau": [],
+    "Apache Spark": ["spark", "pyspark"],
+    "Hadoop": ["apache hadoop"],
+    "Apache Kafka": ["kafka"],
+    "Apache Airflow": ["airflow"],
+    "TensorFlow": [],
+    "PyTorch": [],
+    "Keras": [],
+    "Pandas": [],
+    "NumPy": [],
+    "Jenkins": [],
+    "Maven": ["apache maven"],
+    "Gradle": [],
+    "Hibernate": [],
+    "Oracle Database": ["oracle", "oracle db"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search"],
+    "Terraform": [],
+    "Ansible": [],
+    "Flask": [],
+    "FastAPI": [],
+    "PHP": [],
+    "Laravel": [],
+    "Ruby": [],
+    "Ruby on Rails": ["rails", "ror"],
+    "Rust": [],
+    "Swift": [],
+    "Kotlin": [],
+    "Flutter": [],
+    "Selenium": [],
+    "Postman": [],
+    "Figma": [],
+}
+
+# Names that are also everyday words in lower case ("excel at"): in free text they need a capital
+CASED_WORDS = {"excel", "spark", "ruby", "rust", "swift", "rails"}
+# Aliases that are also everyday words: in free text they need a capital and a neighbouring skill
+CONTEXT_WORDS = {"node", "express", "spring", "net"}
+CONTEXT_WINDOW = 3   # tokens
+
+# Token boundaries for `mentions`; '.', '+' and '#' stay inside tokens (node.js, c++, c#).
+# Split pieces are re-joined by the n-gram keys, so "ci/cd" and "scikit-learn" still match.
+_TOKEN_SPLIT = re.compile(r"[\s,;:()\[\]{}|\"'!?/\-]+")
+_PARENTHETICAL = re.compile(r"\s*\([^)]*\)")
+_DOTTED_NAME = re.compile(r"\.[^\W\d_]")
+
+
+def normalize_label(label: str) -> str:
+    """Compact matching key: 'React.js' / 'react js' / 'ReactJS' -> 'reactjs', '.NET' -> '.net'."""
+    text = unicodedata.normalize("NFKC", label or "").lower().strip()
+    key = "".join(ch for ch in text if ch.isalnum() or ch in "+#")
+    return "." + key if key and _DOTTED_NAME.match(text) else key
+
+
+def tokenize(text: str) -> list[str]:
+    """Raw word tokens as used for skill mentions ("Node.js / CI-CD" -> ["Node.js", "CI", "CD"])."""
+    tokens = (t.rstrip(".") for t in _TOKEN_SPLIT.split(text or ""))
+    return [t for t in (t if _DOTTED_NAME.match(t) else t.lstrip(".") for t in tokens) if t]
+
+
+def confirm_in_context(spans: list[tuple[int, int, bool]], window: int = CONTEXT_WINDOW) -> list[bool]:
+    """
+    Which (start, end, tentative) token spans stand: firm spans always, tentative ones
+    (CONTEXT_WORDS) only within `window` tokens of a firm span.
+    """
+    firm = [(start, end) for start, end, tentative in spans if not tentative]
+    return [
+        not tentative or any(start - window < f_end and f_start < end + window for f_start, f_end in firm)
+        for start, end, tentative in spans
+    ]
+
+
+def unknown_skill_id(key: str) -> int:
+    """Stable negative id for a key not in the dictionary."""
+    return -(zlib.crc32(key.encode()) + 1)
+
+
+class SkillNormalizer:
+    def __init__(self, graph: Optional[SkillGraph] = None, curated: dict[str, list[str]] = CURATED_SKILLS):
+        self.graph = graph
+        self.curated = curated
+        self.names: list[str] = list(graph.names) if graph is not None else []
+        self.num_esco = len(self.names)
+        self._ids: dict[str, int] = {}
+
+        if graph is not None:
+            # Preferred labels, then alt labels, then labels without ESCO's "(qualifier)"
+            for node_id, name in enumerate(graph.names):
+                if name:
+                    self._ids.setdefault(normalize_label(name), node_id)
+            for label, node_id in graph.name_to_id.items():
+                self._ids.setdefault(normalize_label(label), node_id)
+            for label, node_id in graph.name_to_id.items():
+                if "(" in label:
+                    self._ids.setdefault(normalize_label(_PARENTHETICAL.sub("", label)), node_id)
+        self._ids.pop("", None)
+
+        esco_names = {normalize_label(_PARENTHETICAL.sub("", name)) for name in self.names if name}
+        for canonical, aliases in curated.items():
+            key = normalize_label(canonical)
+            # Reuse an ESCO concept named this; an ESCO alt label ("Git") belongs to a broader concept
+            canonical_id = self._ids.get(key) if key in esco_names else None
+            if canonical_id is None:
+                canonical_id = len(self.names)
+                self.names.append(canonical)
+            self._ids[key] = canonical_id
+            for alias in aliases:
+                self._ids[normalize_label(alias)] = canonical_id
+
+        # A skill's own name or curated alias, as opposed to an ESCO alt label of a broader concept
+        self._name_keys = {normalize_label(_PARENTHETICAL.sub("", name)) for name in self.names}
+        self._name_keys.update(normalize_label(alias) for aliases in curated.values() for alias in aliases)
+        # Keys a lone token in free text must not resolve to on its own (see `mentions`)
+        self._short_keys = {key for key in self._ids if len(key) <= 2 and key.isalpha()}
+        self._generic_keys = self._lowercase_single_words()
+        self.max_ngram = min(max((len(tokenize(label)) for label, _ in self.labels()), default=1), 6)
+
+    def labels(self) -> Iterable[tuple[str, int]]:
+        """Every raw label in the dictionary with the id its key resolves to."""
+        raw_labels = []
+        if self.graph is not None:
+            raw_labels.extend(self.graph.name_to_id.keys())
+            raw_labels.extend(_PARENTHETICAL.sub("", label) for label in self.graph.name_to_id if "(" in label)
+        raw_labels.extend(self.names[self.num_esco:])
+        raw_labels.extend(alias for aliases in self.curated.values() for alias in aliases)
+        for label in raw_labels:
+            skill_id = self._ids.get(normalize_label(label))
+            if skill_id is not None:
+                yield label, skill_id
+
+    def _lowercase_single_words(self) -> set[str]:
+        """Keys of one-word labels never written with a capital ("manage", not "Python" or curated "Docker")."""
+        single = {normalize_label(label) for label, _ in self.labels() if len(tokenize(label)) == 1}
+        named = {normalize_label(_PARENTHETICAL.sub("", name)) for name in self.names if name != name.lower()}
+        named.update(normalize_label(alias) for aliases in self.curated.values() for alias in aliases)
+        return single - named
+
+    def counts_alone(self, token: str) -> bool:
+        """Whether a one-token match of `token` in free text counts (context aside, see `needs_context`)."""
+        key = normalize_label(token)
+        if key in self._generic_keys:
+            return False
+        if key in self._short_keys or key in CASED_WORDS or key in CONTEXT_WORDS:
+            return not token.islower()
+        return True
+
+    @staticmethod
+    def needs_context(token: str) -> bool:
+        """Whether a one-token match of `token` only counts next to another skill."""
+        return normalize_label(token) in CONTEXT_WORDS
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def is_name(self, label: str) -> bool:
+        """
+        True if `label` is a skill's own name or a curated alias; False for ESCO alt labels
+        that name an example of a broader concept ("Git" under 'tools for software configuration management').
+        """
+        return normalize_label(label) in self._name_keys
+
+    def lookup(self, skill: str) -> Optional[int]:
+        """Canonical id of `skill`, or None if it is not in the dictionary."""
+        return self._ids.get(normalize_label(skill))
+
+    def canonicalize(self, skills: Iterable[str]) -> list[int]:
+        """One id per skill (same order); unknown skills get a stable negative id."""
+        ids = []
+        for skill in skills:
+            key = normalize_label(skill)
+            ids.append(self._ids.get(key, unknown_skill_id(key)))
+        return ids
+
+    def esco_ids(self, skills: Iterable[str]) -> list[int]:
+        """Ids of the skills that are ESCO graph nodes (usable with SkillGraph / SkillClosure)."""
+        return [i for i in self.canonicalize(skills) if 0 <= i < self.num_esco]
+
+    def name(self, skill_id: int) -> Optional[str]:
+        return self.names[skill_id] if 0 <= skill_id < len(self.names) else None
+
+    def mentions(self, text: str) -> set[int]:
+        """
+        Ids of every known skill mentioned in a short text (titles, snippets), via n-gram lookup.
+        Pass the text in its original case: "Go" is a skill, "go" is not.
+        """
+        tokens = tokenize(text)
+        matches = []
+        for start in range(len(tokens)):
+            key = ""
+            for n, token in enumerate(tokens[start:start + self.max_ngram], 1):
+                key += normalize_label(token)
+                skill_id = self._ids.get(key)
+                if skill_id is not None and (n > 1 or self.counts_alone(token)):
+                    matches.append((skill_id, (start, start + n, n == 1 and self.needs_context(token))))
+        confirmed = confirm_in_context([span for _, span in matches])
+        return {skill_id for (skill_id, _), keep in zip(matches, confirmed) if keep}
@@ -0,0 +1,141 @@
+"""
+Deterministic CV-vs-JD skill coverage, for one candidate against many jobs
+in one call.
+
+Skills become sparse vectors over the normalizer's canonical ids (ESCO
+graph nodes first, then curated skills; skills outside the dictionary get
+per-call columns of their own):
+
+    requirements  (jobs x skills) CSR matrix: essential skills 1.0,
+                  optional skills OPTIONAL_SKILL_WEIGHT
+    credit        dense vector: 1.0 for each skill the candidate lists,
+                  SKILL_DISTANCE_DECAY ** d for skills d hops away in the
+                  ESCO graph (up to SKILL_MAX_HOPS), so "Python" earns part
+                  of a "computer programming" requirement
+
+coverage = (requirements @ credit) / requirement weight per job, one sparse
+mat-vec for every job; gaps are the required skills with no credit at all,
+and tiers use the same thresholds as the job cards. Nothing here calls an
+LLM, so classify and job-card ranking can use it as their fast path.
+
+Usage:
+    scorer = SkillScorer(get_skill_normalizer(), get_skill_graph())
+    result = scorer.score(["Python", "SQL"], [["Python", "Docker"], [("SQL", "optional")]])
+    result.coverage, result.tiers, result.gaps
+"""
+import os
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+from scipy import sparse
+
+from app.retrieval.occupation_matcher import RELATION_WEIGHTS
+from app.retrieval.skill_graph import SkillGraph
+from app.retrieval.skill_normalizer import SkillNormalizer, normalize_label
+
+SKILL_DISTANCE_DECAY = float(os.getenv("SKILL_DISTANCE_DECAY", "0.5"))
+SKILL_MAX_HOPS = int(os.getenv("SKILL_MAX_HOPS", "2"))
+
+# Coverage thresholds shared by job classification and job cards
+REALISTIC_THRESHOLD = 0.7
+STRETCH_THRESHOLD = 0.45
+
+# A required skill: a name (essential) or (name, 'essential' | 'optional')
+Requirement = Union[str, tuple[str, str]]
+
+
+def tier_for(scores: Union[float, Sequence[float], np.ndarray]) -> Union[str, list[str]]:
+    """'Realistic' / 'Stretch' / 'Reach' for one score or an array of scores."""
+    values = np.asarray(scores, dtype=np.float32)
+    tiers = np.where(values >= REALISTIC_THRESHOLD, "Realistic", np.where(values >= STRETCH_THRESHOLD, "Stretch", "Reach"))
+    return str(tiers) if tiers.ndim == 0 else tiers.tolist()
+
+
+@dataclass
+class CoverageResult:
+    coverage: np.ndarray        # (jobs,) weighted share of each job's requirements the candidate covers
+    tiers: list[str]
+    gaps: list[list[str]]       # per job: required skills with no credit, essential first
+    num_required: np.ndarray    # (jobs,) distinct required skills per job
+
+
+class SkillScorer:
+    def __init__(
+        self,
+        normalizer: SkillNormalizer,
+        graph: Optional[SkillGraph] = None,
+        max_hops: int = SKILL_MAX_HOPS,
+        decay: float = SKILL_DISTANCE_DECAY,
+    ):
+        self.normalizer = normalizer
+        self.graph = graph if graph is not None else normalizer.graph
+        self.max_hops = max_hops
+        self.decay = decay
+        self.num_known = len(normalizer.names)
+
+    def credit(self, skills: Iterable[str], extra: Optional[dict[int, int]] = None) -> np.ndarray:
+        """Credit per skill column for a candidate; `extra` maps unknown-skill ids to their columns."""
+        extra = extra or {}
+        vector = np.zeros(self.num_known + len(extra), dtype=np.float32)
+        ids = self.normalizer.canonicalize(skills)
+        vector[[i for i in ids if i >= 0]] = 1.0
+        vector[[extra[i] for i in ids if i < 0 and i in extra]] = 1.0
+
+        # Graph neighbours by BFS layer: a skill d hops away earns decay ** d
+        esco_ids = [i for i in ids if 0 <= i < self.normalizer.num_esco]
+        if self.graph is not None and esco_ids and self.max_hops > 0:
+            frontier = np.unique(np.asarray(esco_ids, dtype=np.int32))
+            seen = set(frontier.tolist())
+            for hop in range(1, self.max_hops + 1):
+                layer = [i for i in self.graph.k_hop(frontier, k=1).tolist() if i not in seen]
+                if not layer:
+                    break
+                seen.update(layer)
+                frontier = np.asarray(layer, dtype=np.int32)
+                vector[frontier] = np.maximum(vector[frontier], self.decay ** hop)
+        return vector
+
+    def requirements(self, jobs: Sequence[Sequence[Requirement]]) -> tuple[sparse.csr_matrix, dict[int, int], dict[int, str]]:
+        """(jobs x columns) weight matrix, unknown-skill id -> column, and column -> label as first written."""
+        extra: dict[int, int] = {}
+        labels: dict[int, str] = {}
+        rows, cols, weights = [], [], []
+        for row, requirements in enumerate(jobs):
+            job: dict[int, float] = {}
+            for requirement in requirements:
+                name, relation = (requirement, "essential") if isinstance(requirement, str) else requirement
+                if not name or not normalize_label(name):
+                    continue
+                skill_id = self.normalizer.canonicalize([name])[0]
+                if skill_id < 0:
+                    skill_id = extra.setdefault(skill_id, self.num_known + len(extra))
+                labels.setdefault(skill_id, name)
+                job[skill_id] = max(job.get(skill_id, 0.0), RELATION_WEIGHTS.get(relation, RELATION_WEIGHTS["optional"]))
+            rows.extend([row] * len(job))
+            cols.extend(job)
+            weights.extend(job.values())
+        matrix = sparse.csr_matrix(
+            (np.asarray(weights, dtype=np.float32), (rows, cols)), shape=(len(jobs), self.num_known + len(extra)),
+        )
+        return matrix, extra, labels
+
+    def score(self, candidate_skills: Iterable[str], jobs: Sequence[Sequence[Requirement]]) -> CoverageResult:
+        """Coverage, tier and gaps of one candidate against every job."""
+        matrix, extra, labels = self.requirements(jobs)
+        credit = self.credit(candidate_skills, extra)
+        totals = np.asarray(matrix.sum(axis=1)).ravel()
+        covered = matrix @ credit
+        coverage = np.divide(covered, totals, out=np.zeros_like(covered), where=totals > 0)
+
+        gaps = []
+        uncovered = credit[matrix.indices] == 0
+        for row in range(matrix.shape[0]):
+            start, end = matrix.indptr[row], matrix.indptr[row + 1]
+            missing = [
+                (weight, labels[col])
+                for col, weight, is_gap in zip(matrix.indices[start:end].tolist(), matrix.data[start:end].tolist(), uncovered[start:end])
+                if is_gap
+            ]
+            gaps.append([label for _, label in sorted(missing, key=lambda m: (-m[0], m[1].lower()))])
+        return CoverageResult(coverage, tier_for(coverage), gaps, np.diff(matrix.indptr))
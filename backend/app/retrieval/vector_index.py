@@ -0,0 +1,221 @@
+"""
+In-process nearest-neighbour search over the ESCO skill embeddings.
+
+The ESCO embedding matrix (~14k x 768) fits comfortably in memory, so the
+hybrid skill search can run without a Postgres round trip:
+
+    VectorIndex       L2 top-k for a batch of queries: one float32 matmul
+                      (exact, the default) or an hnswlib graph (approximate,
+                      VECTOR_INDEX_BACKEND=hnsw, needs `pip install hnswlib`)
+    LocalSkillSearch  the same hybrid search as graph_rag.HYBRID_SEARCH_MANY:
+                      top-20 vector hits and top-20 keyword hits per query,
+                      fused with Reciprocal Rank Fusion (k = 60)
+
+The keyword leg approximates Postgres' english full-text search (lower-case
+word tokens, stop words dropped, light suffix stemming, all query terms
+required, ranked by term frequency); the vector leg and the fusion are the
+same as the SQL.
+
+Usage:
+    search = LocalSkillSearch.from_snapshot(snapshot)
+    hits = search.search_many(["Python", "SQL"], query_vectors, limit=3)
+"""
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.retrieval.esco_loader import concept_uuid
+
+try:
+    import hnswlib
+except ImportError:  # optional: exact search is always available
+    hnswlib = None
+
+VECTOR_INDEX_BACKEND = os.getenv("VECTOR_INDEX_BACKEND", "exact").lower()
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "64"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))
+
+# Same candidate depth and RRF constant as HYBRID_SEARCH_MANY
+CANDIDATES = 20
+RRF_K = 60
+
+# Queries scored against the matrix at a time, bounding the (queries x skills) distance block
+_QUERY_CHUNK = 256
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their this to was were with".split()
+)
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "es", "ed", "s")
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def lexemes(text_value: str) -> list[str]:
+    """Keyword-search terms of a text: lower-cased, stop words dropped, stemmed."""
+    return [_stem(w) for w in _WORD.findall((text_value or "").lower()) if w not in _STOP_WORDS]
+
+
+class VectorIndex:
+    def __init__(self, vectors: np.ndarray, backend: str = VECTOR_INDEX_BACKEND):
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+        self.backend = backend
+        self._hnsw = None
+        if backend == "hnsw":
+            if hnswlib is None:
+                print("[VectorIndex] hnswlib is not installed; using exact search.")
+                self.backend = "exact"
+            elif len(self.vectors):
+                self._hnsw = hnswlib.Index(space="l2", dim=self.dim)
+                self._hnsw.init_index(max_elements=len(self.vectors), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+                self._hnsw.add_items(self.vectors, np.arange(len(self.vectors)))
+                self._hnsw.set_ef(max(HNSW_EF_SEARCH, CANDIDATES))
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    def search(self, queries: Any, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """(row ids, L2 distances), each (len(queries), k), nearest first."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, len(self))
+        if k == 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+        if self._hnsw is not None:
+            labels, squared = self._hnsw.knn_query(queries, k=k)
+            return labels.astype(np.int64), np.sqrt(np.maximum(squared, 0))
+
+        ids = np.empty((len(queries), k), dtype=np.int64)
+        distances = np.empty((len(queries), k), dtype=np.float32)
+        for start in range(0, len(queries), _QUERY_CHUNK):
+            block = queries[start:start + _QUERY_CHUNK]
+            # |q - v|^2 = |q|^2 - 2 q.v + |v|^2, for the whole block in one matmul
+            squared = np.einsum("ij,ij->i", block, block)[:, None] - 2 * block @ self.vectors.T + self.norms
+            top = np.argpartition(squared, k - 1, axis=1)[:, :k]
+            top_squared = np.take_along_axis(squared, top, axis=1)
+            order = np.argsort(top_squared, axis=1, kind="stable")
+            ids[start:start + len(block)] = np.take_along_axis(top, order, axis=1)
+            distances[start:start + len(block)] = np.sqrt(np.maximum(np.take_along_axis(top_squared, order, axis=1), 0))
+        return ids, distances
+
+
+@dataclass
+class SkillHit:
+    """One hybrid search result; same fields as a HYBRID_SEARCH_MANY row."""
+    id: Any
+    name: str
+    description: Optional[str]
+    skill_type: str
+    rrf_score: float
+
+
+class LocalSkillSearch:
+    def __init__(
+        self,
+        ids: Sequence[Any],
+        names: Sequence[str],
+        descriptions: Sequence[Optional[str]],
+        skill_types: Sequence[str],
+        vectors: np.ndarray,
+        backend: str = VECTOR_INDEX_BACKEND,
+    ):
+        self.ids = list(ids)
+        self.names = list(names)
+        self.descriptions = list(descriptions)
+        self.skill_types = list(skill_types)
+        self.index = VectorIndex(vectors, backend)
+
+        # Inverted index: lexeme -> {row: term frequency}
+        self._postings: dict[str, dict[int, int]] = defaultdict(dict)
+        for row, (name, description) in enumerate(zip(self.names, self.descriptions)):
+            for lexeme in lexemes(f"{name} {description or ''}"):
+                postings = self._postings[lexeme]
+                postings[row] = postings.get(row, 0) + 1
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ── Construction ──────────────────────────────────────────
+
+    @classmethod
+    def from_snapshot(cls, snapshot, backend: str = VECTOR_INDEX_BACKEND) -> Optional["LocalSkillSearch"]:
+        """
+        Skills of an EscoSnapshot that have embeddings; None without embeddings. Ids are the
+        esco_skills row UUIDs (uuid5 of the URI), as from `from_session`, so hits work with the
+        SQL expansion fallback too.
+        """
+        if snapshot.embeddings is None:
+            return None
+        rows = np.flatnonzero(snapshot.embedding_mask)
+        return cls(
+            [concept_uuid(snapshot.skill_uris[i]) for i in rows],
+            [snapshot.skill_names[i] for i in rows],
+            [snapshot.skill_descriptions[i] or None for i in rows],
+            [snapshot.skill_type(i) or "skill" for i in rows],
+            snapshot.embeddings[rows],
+            backend,
+        )
+
+    @classmethod
+    async def from_session(cls, session: AsyncSession, backend: str = VECTOR_INDEX_BACKEND) -> Optional["LocalSkillSearch"]:
+        """Every esco_skills row with an embedding (ids are row UUIDs); None if there are none."""
+        result = await session.execute(
+            text("SELECT id, name, description, skill_type, embedding FROM esco_skills WHERE embedding IS NOT NULL")
+        )
+        rows = result.fetchall()
+        if not rows:
+            return None
+        return cls(
+            [r.id for r in rows],
+            [r.name for r in rows],
+            [r.description for r in rows],
+            [r.skill_type for r in rows],
+            np.asarray([np.asarray(r.embedding, dtype=np.float32) for r in rows]),
+            backend,
+        )
+
+    # ── Search ────────────────────────────────────────────────
+
+    def keyword_search(self, query: str, k: int = CANDIDATES) -> list[int]:
+        """Rows containing every query term, best term-frequency score first."""
+        terms = set(lexemes(query))
+        if not terms:
+            return []
+        postings = [self._postings.get(term, {}) for term in terms]
+        matched = set.intersection(*(set(p) for p in postings))
+        scores = {row: sum(p[row] for p in postings) for row in matched}
+        return sorted(scores, key=lambda row: (-scores[row], row))[:k]
+
+    def search_many(self, queries: Sequence[str], query_vectors: Any, limit: int = 3) -> list[list[SkillHit]]:
+        """Top-`limit` skills per query by RRF over the vector and keyword legs."""
+        vector_rows, _ = self.index.search(query_vectors, CANDIDATES)
+        results = []
+        for query, nearest in zip(queries, vector_rows):
+            scores: dict[int, float] = defaultdict(float)
+            for rank, row in enumerate(nearest.tolist(), start=1):
+                scores[row] += 1.0 / (RRF_K + rank)
+            for rank, row in enumerate(self.keyword_search(query), start=1):
+                scores[row] += 1.0 / (RRF_K + rank)
+            best = sorted(scores, key=lambda row: -scores[row])[:limit]
+            results.append([
+                SkillHit(self.ids[row], self.names[row], self.descriptions[row], self.skill_types[row], scores[row])
+                for row in best
+            ])
+        return results
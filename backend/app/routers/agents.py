@@ -5,6 +5,8 @@ from typing import List
 from app.agents.market_trends.agent import market_trends_agent
 from app.agents.graph_rag.agent import graph_rag_agent
 from app.core.agent_iam import verify_agent_token
+from app.retrieval.graph_cache import graph_cache_stats
+from app.services.embedding_service import embedding_service
 
 router = APIRouter()
 
@@ -32,3 +34,17 @@ async def get_related_skills(
         return graph_rag_agent(request.skills)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/graph/cache")
+async def get_graph_cache_stats(
+    agent: dict = Depends(verify_agent_token),
+):
+    """Protected: GraphRAG result cache sizes and hit rates, with the ESCO dataset version."""
+    return graph_cache_stats()
+
+@router.get("/embedding/stats")
+async def get_embedding_stats(
+    agent: dict = Depends(verify_agent_token),
+):
+    """Protected: embedding service batch sizes, latency and throughput."""
+    return embedding_service.stats()
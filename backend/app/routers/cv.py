@@ -9,6 +9,8 @@ from app.models.user import User
 from app.models.cv_history import CVVersion
 from app.models.profile import CandidateProfile
 from app.agents.cv_parser_agent import CVParserAgent
+from app.services.dashboard_cache import invalidate_dashboard
+from app.services.embedding_store import EMBEDDING_KEY, get_or_embed
 from sqlmodel import select
 
 router = APIRouter()
@@ -37,7 +39,15 @@ async def upload_cv(
     existing_versions = result.scalars().all()
     next_version = len(existing_versions) + 1
     
-    new_cv = Resume(user_id=current_user.id, content_text=text)
+    # Embedded once per distinct text: the Resume and its CVVersion share the text_embeddings row
+    content_hash, embedding = await get_or_embed(session, text)
+    new_cv = Resume(
+        user_id=current_user.id,
+        content_text=text,
+        content_hash=content_hash,
+        embedding=embedding,
+        embedding_model=EMBEDDING_KEY,
+    )
     session.add(new_cv)
     await session.commit()
     await session.refresh(new_cv)
@@ -45,10 +55,12 @@ async def upload_cv(
     new_version = CVVersion(
         user_id=current_user.id,
         version_number=next_version,
-        cv_text=text
+        cv_text=text,
+        content_hash=content_hash,
     )
     session.add(new_version)
     await session.commit()
+    invalidate_dashboard(current_user.id)
     
     # 5. Extract Structured Data via Agent
     parser = CVParserAgent()
@@ -1,18 +1,29 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Response
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, desc
-from app.core.database import get_session
+from app.core.database import get_session, async_session
 from app.core.security import get_current_user
+from app.core.http_cache import weak_etag, etag_matches, cache_headers, not_modified
 from app.models.user import User
 from app.models.pipeline import PipelineRun
 from app.models.cv_history import CVVersion
 from app.models.interview_roadmap import InterviewSession, SkillRoadmap
 from app.models.job_market import JobMatch, SalaryBenchmark
-
-import hashlib
+from app.services.dashboard_cache import cached_dashboard, dashboard_version, store_dashboard
+from app.services.interview_trend import interview_trend_query
+from app.services.job_cards import build_job_cards_from_market, job_card_from_match
 
 router = APIRouter()
 
+MAX_JOB_CARDS = 50
+# Pooled connections one dashboard load may hold at once (the engine's pool is 5 + 10 overflow)
+DASHBOARD_QUERY_CONCURRENCY = int(os.getenv("DASHBOARD_QUERY_CONCURRENCY", "3"))
+
 @router.post("/test-digest")
 async def trigger_test_digest(
     current_user: User = Depends(get_current_user),
@@ -26,74 +37,6 @@ async def trigger_test_digest(
     result = await agent.run(current_user.id, session)
     return result
 
-def _build_job_cards_from_market(state_json: dict) -> list[dict]:
-    """
-    Transforms the market_analysis data from the pipeline into JobCard-shaped dicts.
-    """
-    market_data = state_json.get("market_analysis", {})
-    if not market_data:
-        return []
-
-    analysis = market_data.get("market_analysis", {})
-    user_skills_lower = [s.lower() for s in state_json.get("skills", [])]
-    missing_skills = state_json.get("missing_skills", [])
-
-    cards = []
-    seen_titles = set()
-
-    for skill, info in analysis.items():
-        if not isinstance(info, dict):
-            continue
-        status = info.get("status", "")
-        snippets = info.get("snippets", [])
-
-        for snippet in snippets:
-            parts = snippet.split(" at ", 1)
-            if len(parts) == 2:
-                title = parts[0].strip()
-                company = parts[1].strip()
-            else:
-                title = snippet.strip()
-                company = "Sri Lanka"
-
-            title_key = title.lower()
-            if title_key in seen_titles:
-                continue
-            seen_titles.add(title_key)
-
-            title_lower = title.lower()
-            matched_count = sum(1 for s in user_skills_lower if s in title_lower)
-            base_score = min(0.95, 0.3 + (matched_count * 0.15))
-
-            if "active hiring" in status.lower() or "high demand" in status.lower():
-                base_score = min(0.95, base_score + 0.1)
-
-            if base_score >= 0.7:
-                tier = "Realistic"
-            elif base_score >= 0.45:
-                tier = "Stretch"
-            else:
-                tier = "Reach"
-
-            card_id = hashlib.md5(f"{title}|{company}".encode()).hexdigest()[:10]
-
-            cards.append({
-                "id": card_id,
-                "title": title,
-                "company": company,
-                "match_score": round(base_score, 2),
-                "tier": tier,
-                "missing_skills": missing_skills[:6] if tier != "Realistic" else [],
-                "market_status": status,
-                "source_skill": skill,
-            })
-
-    tier_order = {"Realistic": 0, "Stretch": 1, "Reach": 2}
-    cards.sort(key=lambda c: (tier_order.get(c["tier"], 3), -c["match_score"]))
-
-    return cards
-
-
 def _build_job_cards_from_db(db_matches: list[JobMatch]) -> list[dict]:
     """Convert persisted JobMatch rows into frontend-compatible cards."""
     cards = []
@@ -112,56 +55,114 @@ def _build_job_cards_from_db(db_matches: list[JobMatch]) -> list[dict]:
     return cards
 
 
-@router.get("/")
-async def get_dashboard_summary(
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
-):
+async def _fetch_one(slots: asyncio.Semaphore, query):
+    """Run a single-row query on its own pooled connection."""
+    async with slots, async_session() as s:
+        res = await s.execute(query)
+        return res.scalar_one_or_none()
+
+
+async def _fetch_all(slots: asyncio.Semaphore, query):
+    """Run a multi-row query on its own pooled connection."""
+    async with slots, async_session() as s:
+        res = await s.execute(query)
+        return res.scalars().all()
+
+
+async def _fetch_rows(slots: asyncio.Semaphore, query):
+    """Run a column-projection query on its own pooled connection."""
+    async with slots, async_session() as s:
+        res = await s.execute(query)
+        return res.all()
+
+
+async def _load_dashboard_rows(user_id) -> dict:
     """
-    Aggregates data for the Candidate Dashboard (Feature 9).
-    Reads from both state_json (live) and dedicated tables (persisted).
+    Fetch every table the dashboard reads from.
+    The queries are independent, so they run concurrently on separate
+    connections instead of one after another on the request session, at most
+    DASHBOARD_QUERY_CONCURRENCY at a time for this load; other users' loads
+    do not wait on these slots.
     """
-    user_id = current_user.id
-    
-    # 1. Pipeline Status
-    latest_run_query = select(PipelineRun).where(PipelineRun.user_id == user_id).order_by(desc(PipelineRun.created_at)).limit(1)
-    run_res = await session.execute(latest_run_query)
-    latest_run = run_res.scalar_one_or_none()
-    
-    # 2. CV Health
-    latest_cv_query = select(CVVersion).where(CVVersion.user_id == user_id).order_by(desc(CVVersion.version_number)).limit(1)
-    cv_res = await session.execute(latest_cv_query)
-    latest_cv = cv_res.scalar_one_or_none()
-    
-    # 3. Interview Readiness
-    latest_interview_query = select(InterviewSession).where(InterviewSession.user_id == user_id).order_by(desc(InterviewSession.completed_at)).limit(1)
-    int_res = await session.execute(latest_interview_query)
-    latest_interview = int_res.scalar_one_or_none()
-
-    all_interviews_query = select(InterviewSession).where(InterviewSession.user_id == user_id).order_by(InterviewSession.completed_at)
-    all_int_res = await session.execute(all_interviews_query)
-    all_interviews = all_int_res.scalars().all()
-    trend_data = [{"date": intv.completed_at.strftime("%b %d") if intv.completed_at else "Unknown", "score": intv.overall_score} for intv in all_interviews if intv.overall_score is not None]
-
-    # 4. Persisted job matches (from dedicated table)
-    job_matches_query = select(JobMatch).where(JobMatch.user_id == user_id).order_by(desc(JobMatch.created_at)).limit(20)
-    jm_res = await session.execute(job_matches_query)
-    db_job_matches = jm_res.scalars().all()
-
-    # 5. Persisted skill roadmap (from dedicated table)
-    roadmap_query = select(SkillRoadmap).where(SkillRoadmap.user_id == user_id).order_by(desc(SkillRoadmap.created_at)).limit(1)
-    rm_res = await session.execute(roadmap_query)
-    db_roadmap = rm_res.scalar_one_or_none()
-
-    # 6. Salary benchmarks (from dedicated table)
-    salary_query = select(SalaryBenchmark).order_by(desc(SalaryBenchmark.scraped_at)).limit(5)
-    sal_res = await session.execute(salary_query)
-    db_salaries = sal_res.scalars().all()
+    slots = asyncio.Semaphore(DASHBOARD_QUERY_CONCURRENCY)
+    latest_run_id = (
+        select(PipelineRun.id)
+        .where(PipelineRun.user_id == user_id)
+        .order_by(desc(PipelineRun.created_at))
+        .limit(1)
+        .scalar_subquery()
+    )
+    (
+        latest_run,
+        latest_cv,
+        latest_interview,
+        trend_rows,
+        materialized_matches,
+        db_roadmap,
+        db_salaries,
+    ) = await asyncio.gather(
+        # 1. Pipeline Status
+        _fetch_one(slots, select(PipelineRun).where(PipelineRun.user_id == user_id).order_by(desc(PipelineRun.created_at)).limit(1)),
+        # 2. CV Health
+        _fetch_one(slots, select(CVVersion).where(CVVersion.user_id == user_id).order_by(desc(CVVersion.version_number)).limit(1)),
+        # 3. Interview Readiness
+        _fetch_one(slots, select(InterviewSession).where(InterviewSession.user_id == user_id).order_by(desc(InterviewSession.completed_at)).limit(1)),
+        _fetch_rows(slots, interview_trend_query(user_id)),
+        # 4. Job cards materialized for the latest pipeline run
+        _fetch_all(
+            slots,
+            select(JobMatch)
+            .where(JobMatch.user_id == user_id, JobMatch.pipeline_id == latest_run_id)
+            .order_by(JobMatch.tier_rank, desc(JobMatch.match_score), JobMatch.rank)
+            .limit(MAX_JOB_CARDS)
+        ),
+        # 5. Persisted skill roadmap (from dedicated table)
+        _fetch_one(slots, select(SkillRoadmap).where(SkillRoadmap.user_id == user_id).order_by(desc(SkillRoadmap.created_at)).limit(1)),
+        # 6. Salary benchmarks (from dedicated table)
+        _fetch_all(slots, select(SalaryBenchmark).order_by(desc(SalaryBenchmark.scraped_at)).limit(5)),
+    )
+
+    # Latest run not materialized (still running, or predates materialization):
+    # load the user's most recent persisted matches as a fallback
+    db_job_matches = []
+    if not materialized_matches:
+        db_job_matches = await _fetch_all(
+            slots,
+            select(JobMatch).where(JobMatch.user_id == user_id).order_by(desc(JobMatch.created_at)).limit(20)
+        )
+
+    return {
+        "latest_run": latest_run,
+        "latest_cv": latest_cv,
+        "latest_interview": latest_interview,
+        "trend_rows": trend_rows,
+        "materialized_matches": materialized_matches,
+        "db_job_matches": db_job_matches,
+        "db_roadmap": db_roadmap,
+        "db_salaries": db_salaries,
+    }
+
+
+def _assemble_dashboard(rows: dict) -> dict:
+    """Build the dashboard payload from the rows loaded by `_load_dashboard_rows`."""
+    latest_run = rows["latest_run"]
+    latest_cv = rows["latest_cv"]
+    latest_interview = rows["latest_interview"]
+    trend_rows = rows["trend_rows"]
+    materialized_matches = rows["materialized_matches"]
+    db_job_matches = rows["db_job_matches"]
+    db_roadmap = rows["db_roadmap"]
+    db_salaries = rows["db_salaries"]
+
+    trend_data = [{"date": completed_at.strftime("%b %d") if completed_at else "Unknown", "score": score} for completed_at, score in trend_rows if score is not None]
 
     state_json = latest_run.state_json if latest_run else {}
 
-    # Build job cards: prefer live market_analysis data, supplement with DB matches
-    job_cards = _build_job_cards_from_market(state_json)
+    # Job cards: prefer the cards materialized at pipeline completion; rebuild live
+    # only for runs that have not completed yet, then fall back to older DB matches
+    job_cards = [job_card_from_match(jm) for jm in materialized_matches]
+    if not job_cards:
+        job_cards = build_job_cards_from_market(state_json)
     if not job_cards and db_job_matches:
         job_cards = _build_job_cards_from_db(db_job_matches)
 
@@ -239,3 +240,31 @@ async def get_dashboard_summary(
     }
     
     return dashboard_data
+
+
+@router.get("/")
+async def get_dashboard_summary(
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Aggregates data for the Candidate Dashboard (Feature 9).
+    Reads from both state_json (live) and dedicated tables (persisted).
+    The encoded payload and its ETag are cached per user and served while
+    the user's data version is unchanged; an unchanged dashboard is
+    answered with 304 Not Modified.
+    """
+    # Taken before loading: a write during the load leaves the entry behind the next version
+    async with async_session() as s:
+        version = await dashboard_version(s, current_user.id)
+    cached = cached_dashboard(current_user.id, version)
+    if cached is None:
+        rows = await _load_dashboard_rows(current_user.id)
+        body = json.dumps(jsonable_encoder(_assemble_dashboard(rows))).encode()
+        cached = (body, weak_etag(body))
+        store_dashboard(current_user.id, version, cached)
+
+    body, etag = cached
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag))
@@ -8,6 +8,8 @@ from app.models.user import User
 from app.models.interview_roadmap import InterviewSession
 from app.agents.interview_prep.agent import create_interview_session, get_session, process_interview_message
 from app.agents.interview_scorer_agent import InterviewScorerAgent
+from app.services.dashboard_cache import invalidate_dashboard
+from app.services.interview_trend import fetch_interview_trend
 import json
 import uuid
 
@@ -155,6 +157,7 @@ async def interview_websocket(websocket: WebSocket, session_id: str, db: AsyncSe
                 )
                 db.add(db_session)
                 await db.commit()
+                invalidate_dashboard(user_id)
                 print("Successfully configured and saved native audio interview score.")
             else:
                 print("Error scoring interview:", score_data.get('error'))
@@ -186,15 +189,14 @@ async def get_interview_trend(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db_session)
 ):
-    result = await db.execute(select(InterviewSession).where(InterviewSession.user_id == current_user.id).order_by(InterviewSession.completed_at))
-    sessions = result.scalars().all()
+    rows = await fetch_interview_trend(db, current_user.id)
     
     data = []
-    for sess in sessions:
-        if sess.completed_at:
+    for completed_at, overall_score in rows:
+        if completed_at:
             data.append({
-                "date": sess.completed_at.strftime("%b %d"),
-                "score": sess.overall_score
+                "date": completed_at.strftime("%b %d"),
+                "score": overall_score
             })
             
     return {"data": data}
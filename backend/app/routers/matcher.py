@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import uuid
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.models.resume import Resume
 from app.models.job import Job
-from app.utils.embedding import get_embedding
+from app.services.embedding_store import ensure_embedding, get_or_embed
+from app.services.job_search import JOB_SEARCH_OVERSAMPLE, MAX_K, RERANKERS, apply_reranker, search_jobs
 import numpy as np
 
 router = APIRouter()
@@ -23,14 +27,13 @@ async def match_job_to_cv(
     if not cv:
         raise HTTPException(status_code=404, detail="CV not found")
         
-    # 2. Generate Embeddings (if not already done)
-    if cv.embedding is None: 
-        cv.embedding = get_embedding(cv.content_text)
+    # 2. Generate Embeddings (if missing or made under another EMBEDDING_KEY; identical text is looked up by content hash)
+    if await ensure_embedding(session, cv, cv.content_text):
         session.add(cv)
         await session.commit()
     
-    # 3. Generate Job Embedding
-    job_embedding = get_embedding(job_text)
+    # 3. Generate Job Embedding (reused if the text is stored; ad-hoc text is not persisted)
+    _, job_embedding = await get_or_embed(session, job_text, store=False)
     
     # 4. Calculate Similarity
     score = cosine_similarity(cv.embedding, job_embedding)
@@ -42,4 +45,48 @@ async def match_job_to_cv(
         "cv_id": cv_id,
         "match_score": f"{match_percentage}%",
         "status": "High Match" if match_percentage > 70 else "Low Match"
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/search")
+async def search_jobs_for_cv(
+    cv_id: uuid.UUID,
+    k: int = Query(10, ge=1, le=MAX_K),
+    posted_within_days: Optional[int] = Query(None, ge=1),
+    company: Optional[str] = None,
+    rerank: str = "none",
+    session: Session = Depends(get_session)
+):
+    """Top-k stored jobs for a CV: one HNSW (cosine) query, optionally re-ranked."""
+    if rerank not in RERANKERS:
+        raise HTTPException(status_code=400, detail=f"Unknown reranker '{rerank}' (available: {', '.join(sorted(RERANKERS))})")
+
+    cv = await session.get(Resume, cv_id)
+    if not cv:
+        raise HTTPException(status_code=404, detail="CV not found")
+
+    # Jobs are compared under the current EMBEDDING_KEY, so the CV must be too
+    if await ensure_embedding(session, cv, cv.content_text):
+        session.add(cv)
+        await session.commit()
+
+    # Re-rankers choose from a wider candidate set
+    limit = k if rerank == "none" else k * JOB_SEARCH_OVERSAMPLE
+    hits = await search_jobs(session, cv.embedding, limit, posted_within_days, company)
+    hits = (await asyncio.to_thread(apply_reranker, rerank, cv.content_text, hits))[:k]
+
+    return {
+        "cv_id": str(cv_id),
+        "rerank": rerank,
+        "results": [
+            {
+                "job_id": hit.id,
+                "title": hit.title,
+                "company": hit.company,
+                "created_at": hit.created_at.isoformat() if hit.created_at else None,
+                "similarity": hit.similarity,
+                "score": hit.score,
+            }
+            for hit in hits
+        ],
+    }
@@ -0,0 +1,70 @@
+"""
+Per-user cache of the assembled dashboard payload, stored as the encoded
+JSON body together with its ETag.
+
+Every entry is tagged with the user's data version: one cheap query over
+the rows the dashboard reads (latest pipeline_runs.updated_at, CV version,
+interview, roadmap and job match counts and timestamps, newest salary
+benchmark). A request recomputes the version and only serves the cached
+body when it still matches, so a pipeline update, interview save or CV
+upload handled by any worker is seen by every worker on its next request.
+
+The version is taken before the dashboard is loaded; if the data changes
+during a slow load, the stored entry carries the old version and is
+rebuilt on the next request instead of serving stale data.
+
+`invalidate_dashboard` drops this worker's entry early to free memory; it
+is not needed for correctness.
+
+Usage:
+    version = await dashboard_version(session, user_id)
+    cached = cached_dashboard(user_id, version)
+    ...                                          # on a miss: load and assemble
+    store_dashboard(user_id, version, (body, etag))
+"""
+import os
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "300"))
+
+dashboard_cache = TTLCache(maxsize=2048, ttl=DASHBOARD_CACHE_TTL)
+
+DASHBOARD_VERSION_QUERY = text("""
+    SELECT
+        (SELECT max(updated_at) FROM pipeline_runs WHERE user_id = :user_id),
+        (SELECT count(*) FROM pipeline_runs WHERE user_id = :user_id),
+        (SELECT max(version_number) FROM cv_versions WHERE user_id = :user_id),
+        (SELECT count(*) FROM interview_sessions WHERE user_id = :user_id),
+        (SELECT max(completed_at) FROM interview_sessions WHERE user_id = :user_id),
+        (SELECT max(created_at) FROM skill_roadmaps WHERE user_id = :user_id),
+        (SELECT count(*) FROM job_matches WHERE user_id = :user_id),
+        (SELECT max(created_at) FROM job_matches WHERE user_id = :user_id),
+        (SELECT max(scraped_at) FROM salary_benchmarks)
+""")
+
+
+async def dashboard_version(session: AsyncSession, user_id) -> str:
+    """Changes whenever any row the dashboard reads for `user_id` is written."""
+    row = (await session.execute(DASHBOARD_VERSION_QUERY, {"user_id": user_id})).one()
+    return "|".join("" if value is None else str(value) for value in row)
+
+
+def cached_dashboard(user_id, version: str) -> Optional[tuple]:
+    """The cached (body, etag) for `user_id` if it was built from `version` of the data."""
+    entry = dashboard_cache.get(str(user_id))
+    if entry is None or entry[0] != version:
+        return None
+    return entry[1]
+
+
+def store_dashboard(user_id, version: str, value) -> None:
+    dashboard_cache.set(str(user_id), (version, value))
+
+
+def invalidate_dashboard(user_id) -> None:
+    dashboard_cache.invalidate(str(user_id))
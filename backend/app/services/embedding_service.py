@@ -0,0 +1,265 @@
+"""
+Embedding Service — micro-batches concurrent `get_embedding` calls.
+
+Requests arriving within EMBEDDING_BATCH_WINDOW_MS of each other (up to
+EMBEDDING_MAX_BATCH texts) are encoded together in one forward pass, off
+the event loop: in a thread pool (default) or, with
+EMBEDDING_EXECUTOR=process, in worker processes that each load the model
+once. Up to EMBEDDING_WORKERS batches encode at the same time while the
+next one is being collected.
+
+The model and its backend (torch, onnx, onnx-int8) are chosen in
+app/utils/embedding.py. Every batch's size, latency and throughput is
+recorded; `stats()` reports the totals and EMBEDDING_LOG_BATCHES=1 prints
+each batch.
+
+Lifecycle: with EMBEDDING_PRELOAD=lifespan (the default) `start()` loads
+the model and runs a warm-up encode in the background at app startup, and
+`readiness()` reports "loading" until it is done (GET /health/ready answers
+503 meanwhile). Process workers are forked only after the parent has loaded
+the model, so they share its weights copy-on-write instead of each loading
+their own copy.
+
+The queue, the batch slots and the collector task belong to the event loop
+of the first `embed` call. A call from a different loop (a new test loop, a
+restarted app) starts a fresh queue on that loop; requests still queued on
+the old loop are failed rather than left waiting. Callers whose batch is
+cancelled (`close()`, shutdown) get a RuntimeError instead of hanging.
+
+Usage:
+    await embedding_service.start()           # in the lifespan
+    vector = await embedding_service.embed(cv.content_text)
+    vectors = await embedding_service.embed_many([job.description_text for job in jobs])
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from app.utils.embedding import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_PRELOAD,
+    freeze_for_fork,
+    get_embeddings,
+    is_model_loaded,
+    warm_up,
+)
+
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "64"))
+EMBEDDING_EXECUTOR = os.getenv("EMBEDDING_EXECUTOR", "thread").lower()
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "1"))
+EMBEDDING_LOG_BATCHES = os.getenv("EMBEDDING_LOG_BATCHES", "0") == "1"
+
+
+def _encode(texts: list[str]) -> list[list[float]]:
+    # Module-level so process-pool workers can unpickle it; forked workers reuse the parent's model
+    return get_embeddings(texts, batch_size=len(texts))
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    # fork, where available, so workers inherit the already-loaded weights
+    if "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+class EmbeddingService:
+    def __init__(
+        self,
+        window_ms: float = EMBEDDING_BATCH_WINDOW_MS,
+        max_batch: int = EMBEDDING_MAX_BATCH,
+        executor: str = EMBEDDING_EXECUTOR,
+        workers: int = EMBEDDING_WORKERS,
+        encode=_encode,
+        preload: str = EMBEDDING_PRELOAD,
+        load=warm_up,
+    ):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.executor_kind = executor
+        self.workers = workers
+        self._encode = encode
+        self.preload = preload
+        self._load = load
+        self._loader: Optional[asyncio.Task] = None
+        self.load_seconds: Optional[float] = None
+        self.load_error: Optional[str] = None
+        self._executor: Optional[Executor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.texts = 0
+        self.encode_seconds = 0.0
+        self.max_batch_seen = 0
+
+    # ── Public API ────────────────────────────────────────────
+
+    async def embed(self, text: str) -> list[float]:
+        """Embedding of one text, encoded together with whatever else arrives in the same window."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        return list(await asyncio.gather(*(self.embed(t) for t in texts)))
+
+    async def start(self) -> None:
+        """Begin loading and warming up the model in the background (EMBEDDING_PRELOAD=lifespan)."""
+        if self.preload == "lifespan" and self._loader is None:
+            self._loader = asyncio.get_running_loop().create_task(self._preload())
+
+    async def wait_ready(self) -> None:
+        if self._loader is not None:
+            await asyncio.shield(self._loader)
+
+    def readiness(self) -> str:
+        """'ready', 'loading', 'failed', or 'lazy' when the model loads on first use."""
+        if self.load_error is not None:
+            return "failed"
+        if self.load_seconds is not None or (self.preload != "lifespan" and is_model_loaded()):
+            return "ready"
+        if self._loader is not None:
+            return "loading"
+        return "lazy" if self.preload == "lazy" else "loading"
+
+    def stats(self) -> dict:
+        return {
+            "backend": EMBEDDING_BACKEND,
+            "executor": self.executor_kind,
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "avg_batch_ms": round(1000 * self.encode_seconds / self.batches, 2) if self.batches else 0.0,
+            "texts_per_second": round(self.texts / self.encode_seconds, 1) if self.encode_seconds else 0.0,
+            "model": self.readiness(),
+            "load_seconds": round(self.load_seconds, 2) if self.load_seconds is not None else None,
+        }
+
+    async def close(self) -> None:
+        if self._loader is not None:
+            self._loader.cancel()
+            self._loader = None
+        self._abandon(self._queue, self._collector)
+        self._collector = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._queue = None
+        self._loop = None
+
+    # ── Lifecycle ─────────────────────────────────────────────
+
+    async def _preload(self) -> None:
+        try:
+            # In this process first: process workers forked afterwards start with the weights in memory
+            self.load_seconds = await asyncio.to_thread(self._load)
+            if self.executor_kind == "process":
+                freeze_for_fork()
+                self._ensure_started()
+                loop = asyncio.get_running_loop()
+                await asyncio.gather(*(
+                    loop.run_in_executor(self._executor, self._encode, ["Warm-up"]) for _ in range(self.workers)
+                ))
+        except Exception as e:
+            self.load_error = str(e)
+            print(f"[Embedding] Model preload failed: {e}")
+            return
+        print(f"[Embedding] Model ready in {self.load_seconds:.1f}s ({EMBEDDING_BACKEND}, {self.executor_kind} executor)")
+
+    # ── Batching ──────────────────────────────────────────────
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._collector is not None and not self._collector.done():
+            return
+        if self._loop is not None and self._loop is not loop and not self._loop.is_closed():
+            # Queues and futures cannot cross loops: shut the old collector down on its own loop
+            self._loop.call_soon_threadsafe(self._abandon, self._queue, self._collector)
+        if self._loop is not loop:
+            self._in_flight = set()
+        self._loop = loop
+        if self._executor is None:
+            self._executor = (
+                _process_pool(self.workers) if self.executor_kind == "process"
+                else ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="embedding")
+            )
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._collector = loop.create_task(self._collect())
+
+    @staticmethod
+    def _abandon(queue: Optional[asyncio.Queue], collector: Optional[asyncio.Task]) -> None:
+        """Stop a collector and fail the requests still queued for it (they would never be encoded)."""
+        if collector is not None:
+            collector.cancel()
+        while queue is not None and not queue.empty():
+            _, future = queue.get_nowait()
+            _fail(future)
+
+    async def _collect(self) -> None:
+        """Gather requests into batches: the first one opens a window, a full batch closes it early."""
+        loop = asyncio.get_running_loop()
+        batch: list[tuple[str, asyncio.Future]] = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.window
+                while len(batch) < self.max_batch:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                await self._slots.acquire()
+                task = loop.create_task(self._run_batch(batch))
+                batch = []
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+        finally:
+            # Cancelled mid-window: the requests gathered so far never reached an encoder
+            for _, future in batch:
+                _fail(future)
+
+    async def _run_batch(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in batch]
+        start = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            vectors = await asyncio.get_running_loop().run_in_executor(self._executor, self._encode, texts)
+            elapsed = time.perf_counter() - start
+            self.batches += 1
+            self.texts += len(texts)
+            self.encode_seconds += elapsed
+            self.max_batch_seen = max(self.max_batch_seen, len(texts))
+            if EMBEDDING_LOG_BATCHES:
+                print(f"[Embedding] batch of {len(texts)} in {elapsed * 1000:.1f} ms ({len(texts) / elapsed:,.0f} texts/s)")
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+        except Exception as e:
+            error = e
+        finally:
+            self._slots.release()
+            # Encoder errors reach every caller; a cancelled batch (close(), shutdown) must not leave any hanging
+            for _, future in batch:
+                _fail(future, error)
+
+
+def _fail(future: asyncio.Future, error: Optional[BaseException] = None) -> None:
+    if not future.done():
+        future.set_exception(error or RuntimeError("Embedding service stopped before the request was encoded"))
+
+embedding_service = EmbeddingService()
@@ -0,0 +1,159 @@
+"""
+Embedding Store — embeddings keyed by text content, so identical text is
+embedded once.
+
+Resumes, CV versions and jobs all go through `text_embeddings`, keyed by
+(text_hash(text), EMBEDDING_KEY). A re-upload of the same CV, a CV version
+restored from history or a job description seen before reuses the stored
+vector instead of running the model again. EMBEDDING_KEY names the model,
+its backend and the chunking / pooling settings, so changing any of them
+starts a fresh set of rows instead of mixing incompatible vectors. Resumes
+and jobs record the key of their own vector (`embedding_model`):
+`ensure_embedding` re-embeds a resume made under another key, job search
+only compares jobs embedded under the current key, and ingestion re-embeds
+the others (`reembed_stale_jobs`).
+
+Only texts that are stored anyway (CVs, CV versions, ingested jobs) are
+written; ad-hoc texts such as a pasted job description are looked up but
+not persisted (`store=False`), so the table does not grow with every request.
+
+Texts longer than the model's input window (256 word pieces for
+all-MiniLM-L6-v2, ~EMBEDDING_CHUNK_WORDS words) used to be truncated
+silently. They are now split into overlapping chunks, every chunk is
+embedded, and the chunk vectors are pooled (EMBEDDING_POOLING=mean or max)
+and re-normalized. Short texts are embedded whole, exactly as before.
+
+Usage:
+    cv.content_hash, cv.embedding = await get_or_embed(session, cv.content_text)
+    if await ensure_embedding(session, cv, cv.content_text): ...   # re-embeds under a new EMBEDDING_KEY
+    _, job_vector = await get_or_embed(session, job_text, store=False)
+    vector = await cached_embedding(session, text_hash(text))
+    vectors = embed_texts(descriptions)                    # sync, chunked, for batch jobs
+"""
+import hashlib
+import os
+from datetime import datetime
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.text_embedding import TextEmbedding
+from app.services.embedding_service import embedding_service
+from app.utils.embedding import EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME, get_embeddings
+
+EMBEDDING_CHUNK_WORDS = int(os.getenv("EMBEDDING_CHUNK_WORDS", "160"))
+EMBEDDING_CHUNK_OVERLAP = int(os.getenv("EMBEDDING_CHUNK_OVERLAP", "32"))
+EMBEDDING_POOLING = os.getenv("EMBEDDING_POOLING", "mean").lower()
+# Everything that changes the vector: model, backend (onnx-int8 is quantized), chunking and pooling
+EMBEDDING_KEY = (
+    f"{EMBEDDING_MODEL_NAME}/{EMBEDDING_BACKEND}/{EMBEDDING_POOLING}"
+    f"-{EMBEDDING_CHUNK_WORDS}w{EMBEDDING_CHUNK_OVERLAP}o"
+)
+
+LOOKUP_CACHED = "SELECT content_hash, embedding::text AS embedding FROM text_embeddings WHERE model = $1 AND content_hash = ANY($2::text[])"
+STORE_CACHED = """
+    INSERT INTO text_embeddings (content_hash, model, embedding, num_chunks, created_at)
+    VALUES ($1, $2, $3::vector, $4, now() AT TIME ZONE 'utc')
+    ON CONFLICT DO NOTHING
+"""
+
+
+def text_hash(text: str) -> str:
+    """Cache key of a text: exact content, ignoring leading and trailing whitespace."""
+    return hashlib.blake2b(text.strip().encode("utf-8"), digest_size=16).hexdigest()
+
+
+def chunk_text(text: str, words: int = EMBEDDING_CHUNK_WORDS, overlap: int = EMBEDDING_CHUNK_OVERLAP) -> list[str]:
+    """`text` itself if it fits in `words` words, else overlapping windows covering all of it."""
+    tokens = text.split()
+    if len(tokens) <= words:
+        return [text]
+    step = max(words - overlap, 1)
+    return [" ".join(tokens[start:start + words]) for start in range(0, len(tokens) - overlap, step)]
+
+
+def pool(vectors: Sequence[Sequence[float]], mode: str = EMBEDDING_POOLING) -> list[float]:
+    """Chunk vectors pooled into one unit vector (mean or element-wise max)."""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    pooled = matrix.max(axis=0) if mode == "max" else matrix.mean(axis=0)
+    norm = np.linalg.norm(pooled)
+    return (pooled / norm if norm > 0 else pooled).tolist()
+
+
+def _pool_chunks(chunk_counts: list[int], vectors: list[list[float]]) -> list[list[float]]:
+    pooled, start = [], 0
+    for count in chunk_counts:
+        pooled.append(vectors[start] if count == 1 else pool(vectors[start:start + count]))
+        start += count
+    return pooled
+
+
+def embed_texts(texts: list[str], batch_size: int = 64) -> list[list[float]]:
+    """Chunked embeddings of `texts`, all chunks encoded in one `get_embeddings` call (blocking)."""
+    chunks = [chunk_text(t) for t in texts]
+    vectors = get_embeddings([c for text_chunks in chunks for c in text_chunks], batch_size)
+    return _pool_chunks([len(c) for c in chunks], vectors)
+
+
+async def embed_text(text: str) -> tuple[list[float], int]:
+    """(vector, number of chunks) for one text, via the micro-batching embedding service."""
+    chunks = chunk_text(text)
+    vectors = await embedding_service.embed_many(chunks)
+    return _pool_chunks([len(chunks)], vectors)[0], len(chunks)
+
+
+async def cached_embedding(session: AsyncSession, content_hash: str) -> Optional[list[float]]:
+    row = await session.get(TextEmbedding, {"content_hash": content_hash, "model": EMBEDDING_KEY})
+    return [float(x) for x in row.embedding] if row is not None else None
+
+
+async def get_or_embed(session: AsyncSession, text: str, store: bool = True) -> tuple[str, list[float]]:
+    """
+    (content hash, vector) for `text`, embedding it only if no row exists yet; a new vector
+    is stored unless `store` is False. The caller commits.
+    """
+    content_hash = text_hash(text)
+    vector = await cached_embedding(session, content_hash)
+    if vector is not None:
+        return content_hash, vector
+    vector, num_chunks = await embed_text(text)
+    if not store:
+        return content_hash, vector
+    # Concurrent requests for the same new text: the first insert wins, both vectors are equal
+    await session.execute(
+        insert(TextEmbedding)
+        .values(
+            content_hash=content_hash, model=EMBEDDING_KEY, embedding=vector,
+            num_chunks=num_chunks, created_at=datetime.utcnow(),
+        )
+        .on_conflict_do_nothing()
+    )
+    return content_hash, vector
+
+
+async def ensure_embedding(session: AsyncSession, row, text: str) -> bool:
+    """
+    Give `row` (a Resume) a vector made under the current EMBEDDING_KEY, re-embedding
+    one made under another key. True if the row changed; the caller commits.
+    """
+    if row.embedding is not None and row.content_hash is not None and row.embedding_model == EMBEDDING_KEY:
+        return False
+    row.content_hash, row.embedding = await get_or_embed(session, text)
+    row.embedding_model = EMBEDDING_KEY
+    return True
+
+
+async def cached_embeddings_conn(conn, hashes: list[str]) -> dict[str, list[float]]:
+    """Stored vectors by content hash, for asyncpg connections (job ingestion)."""
+    rows = await conn.fetch(LOOKUP_CACHED, EMBEDDING_KEY, hashes)
+    return {r["content_hash"]: [float(x) for x in r["embedding"].strip("[]").split(",")] for r in rows}
+
+
+async def store_embeddings_conn(conn, texts: list[str], vectors: list[list[float]]) -> None:
+    if not texts:
+        return
+    await conn.executemany(STORE_CACHED, [
+        (text_hash(t), EMBEDDING_KEY, str(list(v)), len(chunk_text(t))) for t, v in zip(texts, vectors)
+    ])
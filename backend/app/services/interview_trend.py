@@ -0,0 +1,25 @@
+"""
+Interview score trend — a (completed_at, overall_score) projection over a
+user's interview sessions.
+
+Only the two plotted columns are selected, so the query is answered from
+the covering index ix_interview_sessions_user_completed without touching
+the JSONB transcripts stored alongside each session.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from app.models.interview_roadmap import InterviewSession
+
+
+def interview_trend_query(user_id):
+    return (
+        select(InterviewSession.completed_at, InterviewSession.overall_score)
+        .where(InterviewSession.user_id == user_id)
+        .order_by(InterviewSession.completed_at)
+    )
+
+
+async def fetch_interview_trend(session: AsyncSession, user_id) -> list:
+    """Return (completed_at, overall_score) rows in chronological order."""
+    result = await session.execute(interview_trend_query(user_id))
+    return result.all()
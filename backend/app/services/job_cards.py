@@ -0,0 +1,137 @@
+"""
+Job Cards — turns pipeline market analysis into ranked JobCard dicts.
+
+Cards are computed once when a pipeline completes and materialized into
+`job_matches` (one row per card, with its tier and rank). The dashboard
+then reads the top-N straight from the (user_id, pipeline_id, tier_rank,
+match_score) index; `build_job_cards_from_market` is only run live for
+pipelines that have not been materialized yet.
+
+Card scores come from the skill scoring engine (skill_scoring.py): every
+card's requirements (its source skill plus the skills its title mentions)
+are scored against the user's skills in one sparse mat-vec, and tiers use
+its shared thresholds.
+"""
+import hashlib
+import uuid
+from typing import Optional
+from app.models.job_market import JobMatch
+from app.retrieval.esco_runtime import get_skill_graph, get_skill_normalizer
+from app.retrieval.skill_scoring import SkillScorer, tier_for
+
+TIER_ORDER = {"Realistic": 0, "Stretch": 1, "Reach": 2}
+
+
+def build_job_cards_from_market(state_json: dict) -> list[dict]:
+    """
+    Transforms the market_analysis data from the pipeline into JobCard-shaped dicts,
+    sorted by tier then descending match score.
+    """
+    market_data = state_json.get("market_analysis", {})
+    if not market_data:
+        return []
+
+    analysis = market_data.get("market_analysis", {})
+    normalizer = get_skill_normalizer()
+    missing_skills = state_json.get("missing_skills", [])
+
+    cards = []
+    requirements = []
+    seen_titles = set()
+
+    for skill, info in analysis.items():
+        if not isinstance(info, dict):
+            continue
+        status = info.get("status", "")
+        snippets = info.get("snippets", [])
+
+        for snippet in snippets:
+            parts = snippet.split(" at ", 1)
+            if len(parts) == 2:
+                title = parts[0].strip()
+                company = parts[1].strip()
+            else:
+                title = snippet.strip()
+                company = "Sri Lanka"
+
+            title_key = title.lower()
+            if title_key in seen_titles:
+                continue
+            seen_titles.add(title_key)
+
+            card_id = hashlib.md5(f"{title}|{company}".encode()).hexdigest()[:10]
+            mentioned = [normalizer.name(i) for i in sorted(normalizer.mentions(title))]
+            requirements.append([skill, *mentioned])
+
+            cards.append({
+                "id": card_id,
+                "title": title,
+                "company": company,
+                "market_status": status,
+                "source_skill": skill,
+            })
+
+    if not cards:
+        return []
+
+    result = SkillScorer(normalizer, get_skill_graph()).score(state_json.get("skills", []), requirements)
+    for card, coverage, gaps in zip(cards, result.coverage.tolist(), result.gaps):
+        base_score = min(0.95, 0.3 + 0.6 * coverage)
+        status = card["market_status"].lower()
+        if "active hiring" in status or "high demand" in status:
+            base_score = min(0.95, base_score + 0.1)
+        tier = tier_for(base_score)
+        # The card's own gaps first, then the pipeline's missing keywords
+        missing = list(dict.fromkeys([*gaps, *missing_skills]))
+        card.update({
+            "match_score": round(base_score, 2),
+            "tier": tier,
+            "missing_skills": missing[:6] if tier != "Realistic" else [],
+        })
+
+    cards.sort(key=lambda c: (TIER_ORDER.get(c["tier"], 3), -c["match_score"]))
+
+    return cards
+
+
+def job_matches_from_cards(
+    cards: list[dict],
+    user_id: uuid.UUID,
+    pipeline_id: uuid.UUID,
+    salary_min: Optional[int] = None,
+    salary_max: Optional[int] = None,
+) -> list[JobMatch]:
+    """Materialize ranked cards as JobMatch rows, preserving their order in `rank`."""
+    return [
+        JobMatch(
+            user_id=user_id,
+            pipeline_id=pipeline_id,
+            card_key=card["id"],
+            job_title=card["title"][:100],
+            company=card["company"][:100],
+            match_score=card["match_score"],
+            tier=card["tier"],
+            tier_rank=TIER_ORDER.get(card["tier"], 3),
+            rank=position,
+            missing_skills=card["missing_skills"],
+            market_status=card["market_status"],
+            source_skill=card["source_skill"],
+            salary_min=salary_min,
+            salary_max=salary_max,
+        )
+        for position, card in enumerate(cards)
+    ]
+
+
+def job_card_from_match(jm: JobMatch) -> dict:
+    """Inverse of `job_matches_from_cards` for a materialized row."""
+    return {
+        "id": jm.card_key,
+        "title": jm.job_title,
+        "company": jm.company,
+        "match_score": jm.match_score,
+        "tier": jm.tier,
+        "missing_skills": jm.missing_skills or [],
+        "market_status": jm.market_status,
+        "source_skill": jm.source_skill,
+    }
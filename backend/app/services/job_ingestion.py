@@ -0,0 +1,209 @@
+"""
+Job Ingestion — streams scraped postings into the `jobs` table.
+
+Raw postings (dicts from a scraper, e.g. {'title', 'company'} from TopJobs,
+optionally a 'description') go through four steps per batch:
+
+    normalize   collapse whitespace, drop postings without a title
+    dedupe      content hash of the normalized title / company / description;
+                repeats inside the stream and rows already stored are skipped
+    embed       new postings are encoded in one `get_embeddings` call (long
+                descriptions chunked and pooled); descriptions already in
+                text_embeddings reuse the stored vector (embedding_store.py)
+    upsert      COPY into a temporary staging table, then one
+                INSERT ... ON CONFLICT (content_hash) that inserts new rows
+                and refreshes last_seen_at on known ones
+
+Every job records the EMBEDDING_KEY of its vector (`embedding_model`). A
+stored job embedded under another key is re-embedded when it is seen
+again; `reembed_stale_jobs` re-embeds the rest without re-scraping.
+
+Stored jobs are then found by vector (GET /jobs/search) instead of being
+re-scraped for every pipeline.
+
+Usage:
+    conn = await asyncpg.connect(asyncpg_dsn(DATABASE_URL))
+    stats = await ingest_postings(conn, scrape_topjobs_software_vacancies(), source="topjobs")
+    updated = await reembed_stale_jobs(conn)
+"""
+import asyncio
+import hashlib
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from app.services.embedding_store import EMBEDDING_KEY, cached_embeddings_conn, embed_texts, store_embeddings_conn, text_hash
+
+JOB_COLUMNS = (
+    "id", "title", "company", "description_text", "embedding", "embedding_model",
+    "content_hash", "source", "created_at", "last_seen_at",
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+UPSERT_FROM_STAGING = """
+    INSERT INTO jobs (id, title, company, description_text, embedding, embedding_model, content_hash, source, created_at, last_seen_at)
+    SELECT id, title, company, description_text, embedding::vector, embedding_model, content_hash, source, created_at, last_seen_at
+    FROM jobs_staging
+    ON CONFLICT (content_hash) DO UPDATE SET
+        last_seen_at = EXCLUDED.last_seen_at,
+        embedding = COALESCE(EXCLUDED.embedding, jobs.embedding),
+        embedding_model = COALESCE(EXCLUDED.embedding_model, jobs.embedding_model)
+    RETURNING (xmax = 0) AS inserted
+"""
+
+
+@dataclass
+class JobPosting:
+    title: str
+    company: Optional[str]
+    description_text: str
+    content_hash: str
+
+
+@dataclass
+class IngestStats:
+    seen: int = 0
+    invalid: int = 0
+    duplicates: int = 0     # repeated within the stream
+    inserted: int = 0
+    refreshed: int = 0      # already stored; last_seen_at updated
+    reused: int = 0         # new postings whose description was embedded before
+
+    def summary(self) -> str:
+        return (f"{self.seen} seen, {self.inserted} inserted, {self.refreshed} refreshed, "
+                f"{self.duplicates} duplicates, {self.invalid} invalid, {self.reused} embeddings reused")
+
+
+def _clean(value: Optional[str]) -> str:
+    return _WHITESPACE.sub(" ", value or "").strip()
+
+
+def posting_hash(title: str, company: Optional[str], description: str) -> str:
+    """Fingerprint of a normalized posting; case-insensitive so re-scrapes with other casing dedupe."""
+    key = "\x1f".join(part.lower() for part in (title, company or "", description))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def normalize_posting(raw: dict) -> Optional[JobPosting]:
+    """A JobPosting from a scraped dict, or None if it has no title."""
+    title = _clean(raw.get("title"))
+    if not title:
+        return None
+    company = _clean(raw.get("company")) or None
+    description = _clean(raw.get("description") or raw.get("description_text"))
+    # Listing pages only carry title and company; they stand in for the description
+    description_text = description or (f"{title} at {company}" if company else title)
+    return JobPosting(title, company, description_text, posting_hash(title, company, description))
+
+
+def _batches(postings: Iterable[dict], batch_size: int) -> Iterator[list[dict]]:
+    batch = []
+    for posting in postings:
+        batch.append(posting)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _upsert(conn, rows: list[tuple]) -> tuple[int, int]:
+    """(inserted, refreshed) for `rows` in JOB_COLUMNS order, via COPY into a staging table."""
+    async with conn.transaction():
+        await conn.execute(
+            "CREATE TEMP TABLE jobs_staging (id uuid, title text, company text, description_text text, "
+            "embedding text, embedding_model text, content_hash text, source text, created_at timestamp, last_seen_at timestamp) ON COMMIT DROP"
+        )
+        await conn.copy_records_to_table("jobs_staging", records=rows, columns=list(JOB_COLUMNS))
+        results = await conn.fetch(UPSERT_FROM_STAGING)
+    inserted = sum(1 for r in results if r["inserted"])
+    return inserted, len(results) - inserted
+
+
+async def ingest_postings(
+    conn,
+    postings: Iterable[dict],
+    source: str,
+    batch_size: int = 256,
+    embed_batch_size: int = 64,
+) -> IngestStats:
+    """Normalize, dedupe, embed and upsert `postings` (any iterable, consumed `batch_size` at a time)."""
+    stats = IngestStats()
+    seen_hashes: set[str] = set()
+    start = time.perf_counter()
+
+    for raw_batch in _batches(postings, batch_size):
+        stats.seen += len(raw_batch)
+        batch: list[JobPosting] = []
+        for raw in raw_batch:
+            posting = normalize_posting(raw)
+            if posting is None:
+                stats.invalid += 1
+            elif posting.content_hash in seen_hashes:
+                stats.duplicates += 1
+            else:
+                seen_hashes.add(posting.content_hash)
+                batch.append(posting)
+        if not batch:
+            continue
+
+        # Already stored under the current key: refresh without re-embedding
+        stored = {
+            r["content_hash"] for r in await conn.fetch(
+                "SELECT content_hash FROM jobs WHERE content_hash = ANY($1::text[]) AND embedding_model = $2",
+                [p.content_hash for p in batch], EMBEDDING_KEY,
+            )
+        }
+        now = datetime.utcnow()
+        fresh = [p for p in batch if p.content_hash not in stored]
+        # Same description under another title or company, or embedded by a previous run
+        cached = await cached_embeddings_conn(conn, list({text_hash(p.description_text) for p in fresh}))
+        missing = list(dict.fromkeys(p.description_text for p in fresh if text_hash(p.description_text) not in cached))
+        stats.reused += sum(1 for p in fresh if text_hash(p.description_text) in cached)
+        vectors = await asyncio.to_thread(embed_texts, missing, embed_batch_size)
+        await store_embeddings_conn(conn, missing, vectors)
+        cached.update(zip(map(text_hash, missing), vectors))
+        embedded = {p.content_hash: cached[text_hash(p.description_text)] for p in fresh}
+        rows = [
+            (
+                uuid.uuid4(), p.title, p.company, p.description_text,
+                str(list(embedded[p.content_hash])) if p.content_hash in embedded else None,
+                EMBEDDING_KEY if p.content_hash in embedded else None,
+                p.content_hash, source, now, now,
+            )
+            for p in batch
+        ]
+        inserted, refreshed = await _upsert(conn, rows)
+        stats.inserted += inserted
+        stats.refreshed += refreshed
+        rate = stats.seen / (time.perf_counter() - start)
+        print(f"[Jobs] {stats.seen} postings processed ({rate:,.0f}/s): {stats.inserted} new, {stats.refreshed} refreshed")
+    return stats
+
+
+async def reembed_stale_jobs(conn, batch_size: int = 256, embed_batch_size: int = 64) -> int:
+    """Re-embed stored jobs whose vector was made under another EMBEDDING_KEY (or none); returns the count."""
+    updated = 0
+    while True:
+        rows = await conn.fetch(
+            "SELECT id, description_text FROM jobs WHERE embedding_model IS DISTINCT FROM $1 LIMIT $2",
+            EMBEDDING_KEY, batch_size,
+        )
+        if not rows:
+            return updated
+        texts = [r["description_text"] for r in rows]
+        cached = await cached_embeddings_conn(conn, list({text_hash(t) for t in texts}))
+        missing = list(dict.fromkeys(t for t in texts if text_hash(t) not in cached))
+        vectors = await asyncio.to_thread(embed_texts, missing, embed_batch_size)
+        await store_embeddings_conn(conn, missing, vectors)
+        cached.update(zip(map(text_hash, missing), vectors))
+        await conn.executemany(
+            "UPDATE jobs SET embedding = $2::vector, embedding_model = $3 WHERE id = $1",
+            [(r["id"], str(list(cached[text_hash(r["description_text"])])), EMBEDDING_KEY) for r in rows],
+        )
+        updated += len(rows)
+        print(f"[Jobs] {updated} jobs re-embedded under {EMBEDDING_KEY}")
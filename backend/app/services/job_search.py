@@ -0,0 +1,150 @@
+"""
+Job Search — top-k stored jobs for a CV in one pgvector query.
+
+The CV embedding is compared against every embedded row of `jobs` through
+the HNSW cosine index (ix_jobs_embedding_hnsw), with optional recency and
+company filters applied in the same query. When a re-ranker is requested,
+JOB_SEARCH_OVERSAMPLE x k candidates are fetched and the re-ranker orders
+them before the top k are returned.
+
+Re-rankers are plain functions registered by name:
+
+    @register_reranker("my_ranker")
+    def my_ranker(cv_text: str, hits: list[JobHit]) -> list[JobHit]: ...
+
+Built in:
+    none      cosine similarity only
+    recency   similarity blended with an exponential decay of the posting's age
+    skills    similarity blended with ESCO skill coverage (skill_scoring.py)
+
+Usage:
+    hits = await search_jobs(session, cv.embedding, k=10, company="WSO2")
+    hits = apply_reranker("skills", cv.content_text, hits)[:10]
+"""
+import math
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.retrieval.esco_runtime import get_skill_extractor, get_skill_graph, get_skill_normalizer
+from app.retrieval.skill_scoring import SkillScorer
+from app.services.embedding_store import EMBEDDING_KEY
+
+JOB_SEARCH_EF_SEARCH = int(os.getenv("JOB_SEARCH_EF_SEARCH", "64"))
+JOB_SEARCH_OVERSAMPLE = int(os.getenv("JOB_SEARCH_OVERSAMPLE", "4"))
+# pgvector >= 0.8: keep scanning the HNSW graph until enough rows pass the filters ("relaxed_order")
+JOB_SEARCH_ITERATIVE_SCAN = os.getenv("JOB_SEARCH_ITERATIVE_SCAN", "")
+JOB_RECENCY_HALF_LIFE_DAYS = float(os.getenv("JOB_RECENCY_HALF_LIFE_DAYS", "30"))
+MAX_K = 100
+
+JOB_SEARCH = """
+    SELECT id, title, company, created_at, description_text,
+           embedding <=> CAST(:vector AS vector) AS distance
+    FROM jobs
+    WHERE embedding IS NOT NULL AND embedding_model = :embedding_model {filters}
+    ORDER BY embedding <=> CAST(:vector AS vector)
+    LIMIT :limit
+"""
+
+
+@dataclass
+class JobHit:
+    id: str
+    title: str
+    company: Optional[str]
+    created_at: Optional[datetime]
+    description_text: str
+    similarity: float
+    score: float
+
+
+Reranker = Callable[[str, list[JobHit]], list[JobHit]]
+RERANKERS: dict[str, Reranker] = {}
+
+
+def register_reranker(name: str) -> Callable[[Reranker], Reranker]:
+    def decorator(func: Reranker) -> Reranker:
+        RERANKERS[name] = func
+        return func
+    return decorator
+
+
+def apply_reranker(name: str, cv_text: str, hits: list[JobHit]) -> list[JobHit]:
+    """Hits ordered by the `name` re-ranker; raises KeyError for unknown names."""
+    return RERANKERS[name](cv_text, hits)
+
+
+@register_reranker("none")
+def _similarity_only(cv_text: str, hits: list[JobHit]) -> list[JobHit]:
+    return hits
+
+
+@register_reranker("recency")
+def _recency(cv_text: str, hits: list[JobHit]) -> list[JobHit]:
+    now = datetime.utcnow()
+    for hit in hits:
+        age_days = (now - hit.created_at).total_seconds() / 86400 if hit.created_at else JOB_RECENCY_HALF_LIFE_DAYS
+        freshness = math.pow(0.5, max(age_days, 0.0) / JOB_RECENCY_HALF_LIFE_DAYS)
+        hit.score = round(0.8 * hit.similarity + 0.2 * freshness, 4)
+    return sorted(hits, key=lambda h: -h.score)
+
+
+@register_reranker("skills")
+def _skill_coverage(cv_text: str, hits: list[JobHit]) -> list[JobHit]:
+    if not hits:
+        return hits
+    extractor = get_skill_extractor()
+    result = SkillScorer(get_skill_normalizer(), get_skill_graph()).score(
+        extractor.extract(cv_text), [extractor.extract(hit.description_text) for hit in hits],
+    )
+    for hit, coverage, required in zip(hits, result.coverage.tolist(), result.num_required.tolist()):
+        # Jobs that name no skills keep their similarity
+        hit.score = round(0.5 * hit.similarity + 0.5 * coverage, 4) if required else hit.similarity
+    return sorted(hits, key=lambda h: -h.score)
+
+
+async def search_jobs(
+    session: AsyncSession,
+    vector: list[float],
+    k: int = 10,
+    posted_within_days: Optional[int] = None,
+    company: Optional[str] = None,
+) -> list[JobHit]:
+    """Nearest `k` jobs to `vector` by cosine distance, with the filters applied in the same query."""
+    # Only jobs embedded under the current EMBEDDING_KEY share the CV vector's space
+    filters, params = [], {"vector": str(list(vector)), "limit": k, "embedding_model": EMBEDDING_KEY}
+    if posted_within_days is not None:
+        filters.append("AND created_at >= :since")
+        params["since"] = datetime.utcnow() - timedelta(days=posted_within_days)
+    if company:
+        # Case-insensitive equality, served by ix_jobs_company_lower
+        filters.append("AND lower(company) = lower(:company)")
+        params["company"] = company
+
+    # HNSW candidate list: at least k, or the index returns fewer than k rows
+    await session.execute(
+        text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+        {"ef_search": str(max(JOB_SEARCH_EF_SEARCH, k))},
+    )
+    if filters and JOB_SEARCH_ITERATIVE_SCAN:
+        await session.execute(
+            text("SELECT set_config('hnsw.iterative_scan', :mode, true)"), {"mode": JOB_SEARCH_ITERATIVE_SCAN},
+        )
+
+    result = await session.execute(text(JOB_SEARCH.format(filters=" ".join(filters))), params)
+    return [
+        JobHit(
+            id=str(row.id),
+            title=row.title,
+            company=row.company,
+            created_at=row.created_at,
+            description_text=row.description_text,
+            similarity=round(1.0 - float(row.distance), 4),
+            score=round(1.0 - float(row.distance), 4),
+        )
+        for row in result
+    ]
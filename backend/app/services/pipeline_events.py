@@ -0,0 +1,266 @@
+"""
+Pipeline Event Log — in-process, per-run log of pipeline progress events.
+
+Every pipeline run gets an append-only log whose event IDs increase
+monotonically. The orchestrator publishes to it after each LangGraph node,
+and the SSE endpoint replays everything after a client's `Last-Event-ID`
+before waiting for new events. Reconnecting clients are served straight
+from memory.
+
+With several uvicorn workers, an SSE client may land on a worker other
+than the one running the pipeline. `PostgresEventBridge` relays every
+published event to the other workers over Postgres LISTEN/NOTIFY on
+PIPELINE_EVENTS_CHANNEL: each worker keeps one listening connection, and
+relayed events are appended to its local log under the publisher's event
+id. No worker polls pipeline_runs. Payloads over Postgres' NOTIFY limit are
+relayed as their status and stage only.
+
+Usage:
+    bridge = PostgresEventBridge(pipeline_events, lambda: asyncpg.connect(dsn))
+    await bridge.start()                           # in the lifespan
+    pipeline_events.publish(run_id, "STATE_UPDATE", {"status": "running"})
+    async for event in pipeline_events.subscribe(run_id, last_event_id=3):
+        ...
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+PIPELINE_EVENTS_CHANNEL = os.getenv("PIPELINE_EVENTS_CHANNEL", "pipeline_events")
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_PAYLOAD_LIMIT = 7900
+PIPELINE_EVENTS_RECONNECT_SECONDS = float(os.getenv("PIPELINE_EVENTS_RECONNECT_SECONDS", "5"))
+
+# Statuses after which no further events are expected for a run
+TERMINAL_STATUSES = {"completed", "failed", "partial", "waiting_for_input"}
+
+# Event type announcing each terminal status
+FINAL_EVENT_TYPES = {
+    "completed": "COMPLETED",
+    "partial": "PARTIAL",
+    "waiting_for_input": "WAITING_FOR_INPUT",
+    "failed": "FAILED",
+}
+
+
+def event_type_for(status: Optional[str]) -> str:
+    """Final event type for a terminal status, STATE_UPDATE for any other."""
+    return FINAL_EVENT_TYPES.get(status or "", "STATE_UPDATE")
+
+
+@dataclass
+class PipelineEvent:
+    id: int
+    type: str
+    data: dict
+
+
+class PipelineEventLog:
+    """Bounded, append-only event log for a single pipeline run."""
+
+    def __init__(self, max_events: int = 500):
+        self.events: deque[PipelineEvent] = deque(maxlen=max_events)
+        self.last_id = 0
+        self.closed = False
+        self.updated_at = time.monotonic()
+        self._changed = asyncio.Event()
+
+    def append(self, event_type: str, data: dict, close: bool = False, event_id: Optional[int] = None) -> PipelineEvent:
+        # Relayed events keep the publishing worker's id, so Last-Event-ID means the same everywhere
+        self.last_id = max(self.last_id + 1, event_id or 0)
+        event = PipelineEvent(id=self.last_id, type=event_type, data=data)
+        self.events.append(event)
+        # A new event on a closed log (e.g. a resumed run) re-opens it
+        self.closed = close
+        self.updated_at = time.monotonic()
+        self._notify()
+        return event
+
+    def events_after(self, last_event_id: int) -> list[PipelineEvent]:
+        return [e for e in self.events if e.id > last_event_id]
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until a new event is appended. Returns False on timeout."""
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _notify(self):
+        # Wake every current waiter, then hand out a fresh Event for the next round
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+
+class PipelineEventBroker:
+    """Registry of event logs keyed by pipeline run id."""
+
+    def __init__(
+        self,
+        max_events: int = 500,
+        retention_seconds: float = 900,
+        idle_seconds: float = 6 * 3600,
+    ):
+        self.max_events = max_events
+        # How long a finished run's log is kept for late reconnects
+        self.retention_seconds = retention_seconds
+        # Open logs with no activity for this long belong to runs that died
+        self.idle_seconds = idle_seconds
+        self.logs: dict[str, PipelineEventLog] = {}
+        # Set by PostgresEventBridge.start(): forwards local events to the other workers
+        self.bridge: Optional["PostgresEventBridge"] = None
+
+    def get(self, run_id) -> Optional[PipelineEventLog]:
+        self._prune()
+        return self.logs.get(str(run_id))
+
+    def publish(self, run_id, event_type: str, data: dict, close: bool = False, relay: bool = True) -> PipelineEvent:
+        """Append an event to the run's log and, unless `relay` is False, send it to the other workers."""
+        event = self._log_for(run_id).append(event_type, data, close=close)
+        if relay and self.bridge is not None:
+            self.bridge.send(str(run_id), event, close)
+        return event
+
+    def receive(self, run_id, event_id: int, event_type: str, data: dict, close: bool = False) -> PipelineEvent:
+        """Append an event relayed from another worker."""
+        return self._log_for(run_id).append(event_type, data, close=close, event_id=event_id)
+
+    def _log_for(self, run_id) -> PipelineEventLog:
+        self._prune()
+        key = str(run_id)
+        log = self.logs.get(key)
+        if log is None:
+            log = self.logs[key] = PipelineEventLog(self.max_events)
+        return log
+
+    async def subscribe(
+        self,
+        run_id,
+        last_event_id: int = 0,
+        keepalive_seconds: float = 15,
+    ) -> AsyncIterator[Optional[PipelineEvent]]:
+        """
+        Yield events after `last_event_id`, then follow the log live.
+        Yields None when `keepalive_seconds` pass without an event so the
+        caller can emit a heartbeat. Stops once a closed log is drained,
+        or immediately if the run has no log.
+        """
+        key = str(run_id)
+        cursor = last_event_id
+        while True:
+            log = self.logs.get(key)
+            if log is None:
+                return
+
+            pending = log.events_after(cursor)
+            for event in pending:
+                cursor = event.id
+                yield event
+            if pending:
+                continue
+            if log.closed:
+                return
+            if not await log.wait(keepalive_seconds):
+                yield None
+
+    def _prune(self):
+        now = time.monotonic()
+        expired = [
+            key for key, log in self.logs.items()
+            if now - log.updated_at > (self.retention_seconds if log.closed else self.idle_seconds)
+        ]
+        for key in expired:
+            del self.logs[key]
+
+
+class PostgresEventBridge:
+    """Relays a broker's events to the brokers of the other workers over LISTEN/NOTIFY."""
+
+    def __init__(
+        self,
+        broker: PipelineEventBroker,
+        connect: Callable[[], Awaitable[Any]],
+        channel: str = PIPELINE_EVENTS_CHANNEL,
+    ):
+        self.broker = broker
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._connect = connect
+        self._conn = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._sender: Optional[asyncio.Task] = None
+        self._reconnect: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Open the listening connection and start relaying this worker's events."""
+        await self._listen()
+        self._outbox = asyncio.Queue()
+        self._sender = asyncio.get_running_loop().create_task(self._send_loop())
+        self.broker.bridge = self
+
+    async def close(self) -> None:
+        self.broker.bridge = None
+        for task in (self._sender, self._reconnect):
+            if task is not None:
+                task.cancel()
+        self._sender = self._reconnect = None
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await conn.close()
+
+    def send(self, run_id: str, event: PipelineEvent, close: bool) -> None:
+        # Queued so events reach the channel in publish order
+        if self._outbox is not None:
+            self._outbox.put_nowait(self._encode(run_id, event, close))
+
+    def _encode(self, run_id: str, event: PipelineEvent, close: bool) -> str:
+        message = {"origin": self.origin, "run_id": run_id, "id": event.id, "type": event.type, "close": close}
+        payload = json.dumps({**message, "data": event.data}, default=str)
+        if len(payload.encode()) < NOTIFY_PAYLOAD_LIMIT:
+            return payload
+        brief = {k: event.data[k] for k in ("status", "current_stage") if k in event.data}
+        return json.dumps({**message, "data": {**brief, "truncated": True}}, default=str)
+
+    async def _listen(self) -> None:
+        self._conn = await self._connect()
+        await self._conn.add_listener(self.channel, self._on_notify)
+        self._conn.add_termination_listener(self._on_lost)
+
+    async def _send_loop(self) -> None:
+        while True:
+            payload = await self._outbox.get()
+            try:
+                await self._conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+            except Exception as e:
+                print(f"[Events] NOTIFY failed, event not relayed: {e}")
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        message = json.loads(payload)
+        if message["origin"] == self.origin:
+            return
+        self.broker.receive(message["run_id"], message["id"], message["type"], message["data"], message["close"])
+
+    def _on_lost(self, connection) -> None:
+        if self._conn is connection and self._reconnect is None:
+            print("[Events] LISTEN connection lost, reconnecting")
+            self._reconnect = asyncio.get_running_loop().create_task(self._relisten())
+
+    async def _relisten(self) -> None:
+        while True:
+            try:
+                await self._listen()
+                self._reconnect = None
+                return
+            except Exception as e:
+                print(f"[Events] LISTEN reconnect failed: {e}")
+                await asyncio.sleep(PIPELINE_EVENTS_RECONNECT_SECONDS)
+
+
+pipeline_events = PipelineEventBroker()
@@ -1,16 +1,60 @@
 from __future__ import annotations
+import gc
+import os
+import sys
+import threading
+import time
 from typing import TYPE_CHECKING
 
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+# torch (default) | onnx | onnx-int8 (CPU; needs `pip install optimum[onnxruntime]`)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+# Quantized export shipped in the model repo; pick the _avx512_vnni / _arm64 variant to match the CPU
+EMBEDDING_ONNX_INT8_FILE = os.getenv("EMBEDDING_ONNX_INT8_FILE", "onnx/model_quint8_avx2.onnx")
+# When the model is loaded:
+#   lifespan  in the background at app startup; /health/ready reports 503 until warm (default)
+#   import    when this module is imported, i.e. in the parent before workers fork
+#             (gunicorn --preload -k uvicorn.workers.UvicornWorker), so they share the weights
+#   lazy      on the first encode
+EMBEDDING_PRELOAD = os.getenv("EMBEDDING_PRELOAD", "lifespan").lower()
+# Torch intra-op threads in forked children (the parent's OpenMP pool does not survive fork)
+EMBEDDING_TORCH_THREADS = int(os.getenv("EMBEDDING_TORCH_THREADS", "1"))
+
+_WARM_UP_TEXTS = [
+    "Senior Python developer with SQL and cloud experience",
+    "Warm-up",
+]
+
+# HF tokenizers' own thread pool deadlocks in children forked after it was used
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
 # Lazy-load to avoid crashing at server startup if torch DLLs fail to load
 # (common with Python 3.13 + older torch wheels on Windows)
 _model = None
+_model_lock = threading.Lock()
+
+def _load_onnx(backend: str):
+    from sentence_transformers import SentenceTransformer
+    model_kwargs = {"file_name": EMBEDDING_ONNX_INT8_FILE} if backend == "onnx-int8" else None
+    return SentenceTransformer(EMBEDDING_MODEL_NAME, backend="onnx", model_kwargs=model_kwargs)
 
 def _get_model():
     global _model
-    if _model is None:
+    if _model is not None:
+        return _model
+    # One load even when a preload and the first requests race for it
+    with _model_lock:
+        if _model is not None:
+            return _model
+        if EMBEDDING_BACKEND in ("onnx", "onnx-int8"):
+            try:
+                _model = _load_onnx(EMBEDDING_BACKEND)
+                return _model
+            except Exception as e:
+                print(f"[Embedding] ONNX backend '{EMBEDDING_BACKEND}' unavailable ({e}); using torch.")
         try:
             from sentence_transformers import SentenceTransformer
-            _model = SentenceTransformer('all-MiniLM-L6-v2')
+            _model = SentenceTransformer(EMBEDDING_MODEL_NAME)
         except Exception as e:
             raise RuntimeError(
                 f"Could not load embedding model (torch/sentence-transformers issue): {e}\n"
@@ -18,6 +62,39 @@ def _get_model():
             ) from e
     return _model
 
+def is_model_loaded() -> bool:
+    return _model is not None
+
+def warm_up() -> float:
+    """
+    Load the model and run a first encode (allocations, kernel selection), so the first
+    request does not pay for them. Returns the seconds taken.
+    """
+    start = time.perf_counter()
+    _get_model().encode(_WARM_UP_TEXTS)
+    return time.perf_counter() - start
+
+def freeze_for_fork() -> None:
+    """
+    Move everything allocated so far (model included) out of the GC's reach, so forked
+    workers' collections do not touch, and copy, the shared pages.
+    """
+    gc.collect()
+    gc.freeze()
+
+def _after_fork_in_child() -> None:
+    global _model_lock
+    # A lock held by another parent thread at fork time would never be released here
+    _model_lock = threading.Lock()
+    if "torch" in sys.modules:
+        try:
+            sys.modules["torch"].set_num_threads(EMBEDDING_TORCH_THREADS)
+        except Exception:
+            pass
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
 def get_embedding(text: str) -> list[float]:
     """
     Converts text into a 384-dimensional vector using sentence-transformers.
@@ -25,3 +102,16 @@ def get_embedding(text: str) -> list[float]:
     """
     model = _get_model()
     return model.encode(text).tolist()
+
+def get_embeddings(texts: list[str], batch_size: int = 64) -> list[list[float]]:
+    """
+    `get_embedding` for many texts: the model encodes `batch_size` texts per forward pass.
+    """
+    if not texts:
+        return []
+    model = _get_model()
+    return model.encode(texts, batch_size=batch_size).tolist()
+
+if EMBEDDING_PRELOAD == "import":
+    print(f"[Embedding] Preloaded {EMBEDDING_MODEL_NAME} ({EMBEDDING_BACKEND}) in {warm_up():.1f}s")
+    freeze_for_fork()
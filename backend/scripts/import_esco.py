@@ -1,98 +1,224 @@
+"""
+Import the ESCO export into Neo4j with parallel UNWIND batches.
+
+Nodes (Skill, Occupation) and relationships (RELATED_TO, broaderSkill,
+REQUIRES) are written by several worker sessions at once, one transaction
+per batch, so a failed batch is retried on its own (deadlocks and other
+transient errors are retried by the driver). On an empty database nodes
+and relationships are written with CREATE, which the uniqueness
+constraints keep safe and which skips MERGE's lookup per row; otherwise
+MERGE keeps the import idempotent.
+
+Relationship batches are pre-sorted by their hub endpoint (the side with
+fewer distinct nodes, e.g. the skill group of a broaderSkill edge), and a
+hub's edges stay in one batch whenever they fit, so concurrent transactions
+rarely wait on the same node lock. A hub with more than --batch-size edges
+is split into consecutive batches, which may then contend for its lock.
+
+Usage:
+    python scripts/import_esco.py
+    python scripts/import_esco.py --workers 8 --batch-size 2000
+    python scripts/import_esco.py --fresh       # delete existing ESCO nodes first
+"""
+import argparse
+import asyncio
 import os
-import csv
-import json
-from neo4j import GraphDatabase
+import sys
+import time
+from collections import Counter
+from typing import Iterable
+
+from neo4j import AsyncGraphDatabase
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.retrieval import esco_csv
+
 load_dotenv()
 
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password123")
+NEO4J_IMPORT_WORKERS = int(os.getenv("NEO4J_IMPORT_WORKERS", "4"))
+
+CONSTRAINTS = (
+    "CREATE CONSTRAINT skill_uri IF NOT EXISTS FOR (s:Skill) REQUIRE s.uri IS UNIQUE",
+    "CREATE CONSTRAINT occ_uri IF NOT EXISTS FOR (o:Occupation) REQUIRE o.uri IS UNIQUE",
+)
+
+WIPE_QUERY = """
+MATCH (n) WHERE n:Skill OR n:Occupation
+CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS
+"""
+
+# {write}: CREATE on an empty database, MERGE otherwise
+SKILL_QUERY = """
+UNWIND $rows AS row
+{write} (s:Skill {{uri: row.uri}})
+SET s.name = row.name, s.type = row.skill_type, s.description = row.description
+"""
+OCCUPATION_QUERY = """
+UNWIND $rows AS row
+{write} (o:Occupation {{uri: row.uri}})
+SET o.name = row.name, o.code = row.code, o.description = row.description
+"""
+RELATED_QUERY = """
+UNWIND $rows AS row
+MATCH (s1:Skill {{uri: row.source}})
+MATCH (s2:Skill {{uri: row.target}})
+{write} (s1)-[:RELATED_TO {{type: row.type}}]->(s2)
+"""
+BROADER_QUERY = """
+UNWIND $rows AS row
+MATCH (s1:Skill {{uri: row.source}})
+MATCH (s2:Skill {{uri: row.target}})
+{write} (s1)-[:broaderSkill]->(s2)
+"""
+REQUIRES_QUERY = """
+UNWIND $rows AS row
+MATCH (o:Occupation {{uri: row.source}})
+MATCH (s:Skill {{uri: row.target}})
+{write} (o)-[:REQUIRES {{type: row.type}}]->(s)
+"""
+
+
+def node_rows(concepts: Iterable[esco_csv.EscoConcept]) -> list[dict]:
+    rows = {}
+    for c in concepts:
+        rows.setdefault(c.uri, {
+            "uri": c.uri, "name": c.name, "skill_type": c.skill_type, "code": c.code, "description": c.description,
+        })
+    return list(rows.values())
+
+
+def edge_rows(edges: Iterable[esco_csv.EscoEdge]) -> list[dict]:
+    rows = {}
+    for e in edges:
+        rows.setdefault((e.source_uri, e.target_uri, e.relation_type),
+                        {"source": e.source_uri, "target": e.target_uri, "type": e.relation_type})
+    return list(rows.values())
+
+
+def node_batches(rows: list[dict], batch_size: int) -> list[list[dict]]:
+    return [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+
+
+def edge_batches(rows: list[dict], batch_size: int) -> list[list[dict]]:
+    """Batches sorted by the hub endpoint, with all edges of one hub in the same batch where possible."""
+    if not rows:
+        return []
+    hub = "target" if len({r["target"] for r in rows}) < len({r["source"] for r in rows}) else "source"
+    rows = sorted(rows, key=lambda r: (r[hub], r["source"] if hub == "target" else r["target"]))
+    sizes = Counter(r[hub] for r in rows)
 
-ESCO_DIR = os.path.join(os.getcwd(), "esco")
+    batches, batch, i = [], [], 0
+    while i < len(rows):
+        group = rows[i:i + sizes[rows[i][hub]]]
+        i += len(group)
+        if batch and len(batch) + len(group) > batch_size:
+            batches.append(batch)
+            batch = []
+        # A hub larger than a batch is split; its pieces are consecutive
+        for start in range(0, len(group), batch_size):
+            piece = group[start:start + batch_size]
+            if len(piece) == batch_size:
+                batches.append(piece)
+            else:
+                batch.extend(piece)
+    if batch:
+        batches.append(batch)
+    return batches
 
-def run_query(driver, query, parameters=None):
-    with driver.session() as session:
-        session.run(query, parameters)
 
-def batch_import(driver, csv_file, query, batch_size=1000):
-    path = os.path.join(ESCO_DIR, csv_file)
-    if not os.path.exists(path):
-        print(f"File not found: {path}")
+async def _write_batch(tx, query: str, rows: list[dict]) -> None:
+    result = await tx.run(query, rows=rows)
+    await result.consume()
+
+
+async def run_batches(driver, name: str, query: str, batches: list[list[dict]], workers: int) -> None:
+    """Write `batches` with `workers` concurrent sessions, one transaction per batch, and report throughput."""
+    total = sum(len(b) for b in batches)
+    if not total:
+        print(f"{name}: nothing to import")
         return
 
-    print(f"Starting import from {csv_file}...")
-    with open(path, mode='r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        batch = []
-        count = 0
-        for row in reader:
-            batch.append(row)
-            if len(batch) >= batch_size:
-                run_query(driver, query, {"rows": batch})
-                count += len(batch)
-                print(f"Imported {count} rows from {csv_file}...")
-                batch = []
-        if batch:
-            run_query(driver, query, {"rows": batch})
-            count += len(batch)
-            print(f"Finished {csv_file}. Total: {count}")
-
-def import_esco():
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    
+    pending = iter(batches)
+    done, committed = 0, 0
+    start = time.perf_counter()
+
+    async def worker():
+        nonlocal done, committed
+        async with driver.session() as session:
+            for batch in pending:
+                await session.execute_write(_write_batch, query, batch)
+                done += len(batch)
+                committed += 1
+                if committed % 10 == 0:
+                    print(f"  {name}: {done}/{total} ({done / (time.perf_counter() - start):,.0f} rows/s)")
+
+    await asyncio.gather(*(worker() for _ in range(min(workers, len(batches)))))
+    elapsed = time.perf_counter() - start
+    print(f"{name}: {total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+async def is_empty(driver) -> bool:
+    records, _, _ = await driver.execute_query("MATCH (n) WHERE n:Skill OR n:Occupation RETURN count(n) AS n")
+    return records[0]["n"] == 0
+
+
+async def record_dataset_version():
+    """Bump the ESCO dataset version so API processes drop their cached GraphRAG results."""
+    from app.core.database import async_session
+    from app.retrieval.graph_cache import bump_esco_version
+    async with async_session() as session:
+        return await bump_esco_version(session, "import_esco")
+
+
+async def import_esco(args):
+    start = time.perf_counter()
+    skills = node_rows(c for stream in (esco_csv.read_skills(), esco_csv.read_skill_groups()) for c in stream)
+    occupations = node_rows(esco_csv.read_occupations())
+    related = edge_rows(esco_csv.read_skill_relations())
+    broader = edge_rows(esco_csv.read_broader_skill_relations())
+    requires = edge_rows(esco_csv.read_occupation_skill_relations())
+    print(f"Parsed {len(skills)} skills, {len(occupations)} occupations, "
+          f"{len(related) + len(broader) + len(requires)} relations ({time.perf_counter() - start:.1f}s)")
+
+    driver = AsyncGraphDatabase.driver(
+        NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD), max_connection_pool_size=args.workers + 2,
+    )
     try:
-        # Constraints
-        print("Ensuring constraints...")
-        run_query(driver, "CREATE CONSTRAINT skill_uri IF NOT EXISTS FOR (s:Skill) REQUIRE s.uri IS UNIQUE")
-        run_query(driver, "CREATE CONSTRAINT occ_uri IF NOT EXISTS FOR (o:Occupation) REQUIRE o.uri IS UNIQUE")
-
-        # 1. Skills
-        skill_query = """
-        UNWIND $rows AS row
-        MERGE (s:Skill {uri: row.conceptUri})
-        SET s.name = row.preferredLabel,
-            s.type = row.skillType,
-            s.reuseLevel = row.reuseLevel,
-            s.description = row.description
-        """
-        batch_import(driver, "skills_en.csv", skill_query)
-
-        # 2. Occupations
-        occ_query = """
-        UNWIND $rows AS row
-        MERGE (o:Occupation {uri: row.conceptUri})
-        SET o.name = row.preferredLabel,
-            o.code = row.iscoGroup,
-            o.description = row.description
-        """
-        batch_import(driver, "occupations_en.csv", occ_query)
-
-        # 3. Skill-Skill Relations
-        ss_query = """
-        UNWIND $rows AS row
-        MATCH (s1:Skill {uri: row.skillUri})
-        MATCH (s2:Skill {uri: row.relatedSkillUri})
-        MERGE (s1)-[:RELATED_TO {type: row.relationshipType}]->(s2)
-        """
-        batch_import(driver, "skillSkillRelations_en.csv", ss_query)
-
-        # 4. Occupation-Skill Relations
-        os_query = """
-        UNWIND $rows AS row
-        MATCH (o:Occupation {uri: row.occupationUri})
-        MATCH (s:Skill {uri: row.skillUri})
-        MERGE (o)-[:REQUIRES {type: row.relationType}]->(s)
-        """
-        batch_import(driver, "occupationSkillRelations_en.csv", os_query)
-
-        print("\nESCO Import Complete!")
+        for statement in CONSTRAINTS:
+            await driver.execute_query(statement)
+        if args.fresh:
+            async with driver.session() as session:
+                await (await session.run(WIPE_QUERY)).consume()
+            print("Deleted existing ESCO nodes")
 
-    except Exception as e:
-        print(f"Critical Error: {e}")
+        write = "CREATE" if await is_empty(driver) else "MERGE"
+        print(f"Writing with {write} using {args.workers} workers")
+
+        start = time.perf_counter()
+        await run_batches(driver, "Skills", SKILL_QUERY.format(write=write), node_batches(skills, args.batch_size), args.workers)
+        await run_batches(driver, "Occupations", OCCUPATION_QUERY.format(write=write), node_batches(occupations, args.batch_size), args.workers)
+        # Nodes must all exist before relationships reference them
+        await run_batches(driver, "RELATED_TO", RELATED_QUERY.format(write=write), edge_batches(related, args.batch_size), args.workers)
+        await run_batches(driver, "broaderSkill", BROADER_QUERY.format(write=write), edge_batches(broader, args.batch_size), args.workers)
+        await run_batches(driver, "REQUIRES", REQUIRES_QUERY.format(write=write), edge_batches(requires, args.batch_size), args.workers)
+        print(f"\nESCO Import Complete! ({time.perf_counter() - start:.1f}s)")
     finally:
-        driver.close()
+        await driver.close()
+
+    try:
+        print(f"ESCO dataset version: {await record_dataset_version()}")
+    except Exception as e:
+        print(f"Could not record ESCO dataset version (GraphRAG caches expire by TTL): {e}")
+
 
 if __name__ == "__main__":
-    import_esco()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=NEO4J_IMPORT_WORKERS, help="Concurrent write sessions")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per UNWIND transaction")
+    parser.add_argument("--fresh", action="store_true", help="Delete existing Skill / Occupation nodes first")
+    asyncio.run(import_esco(parser.parse_args()))
@@ -0,0 +1,76 @@
+"""
+Fixtures and database fakes shared by the test modules.
+
+Usage:
+    from conftest import FakeConnection, FakeSession
+
+    session = FakeSession([row])            # every query answers with [row]
+    await code_under_test(session)
+    (sql, params), = session.statements
+"""
+from contextlib import asynccontextmanager
+
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    # The app only runs on asyncio (asyncpg, asyncio.to_thread)
+    return "asyncio"
+
+
+class FakeResult(list):
+    """Rows of a query result, read the way the app reads SQLAlchemy results."""
+
+    def fetchall(self):
+        return list(self)
+
+    def one(self):
+        (row,) = self
+        return row
+
+
+class FakeSession:
+    """AsyncSession stand-in: records (statement, params), answers every query with `rows`, collects added objects."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+        self.added = []
+        self.commits = 0
+
+    async def get(self, model, key):
+        return None
+
+    async def execute(self, statement, params=None):
+        self.statements.append((statement, params))
+        return FakeResult(self.rows)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def add_all(self, objs):
+        self.added.extend(objs)
+
+    def begin_nested(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        self.commits += 1
+
+
+class FakeConnection:
+    """asyncpg Connection stand-in: transactions are no-ops; subclasses answer the queries a test makes."""
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def close(self):
+        pass
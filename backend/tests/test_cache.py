@@ -0,0 +1,32 @@
+from app.core.cache import TTLCache
+
+
+def test_lru_eviction_and_stats():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1      # "a" is now most recently used
+    cache.set("c", 3)               # evicts "b"
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_expired_entries_are_misses():
+    cache = TTLCache(maxsize=2, ttl=-1)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_invalidate():
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a") is None and cache.get("b") == 2
+
+    cache.invalidate()
+    assert len(cache) == 0
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+@pytest.mark.anyio
+async def test_opens_after_threshold_and_recovers():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    calls = []
+
+    async def unreachable():
+        calls.append(1)
+        raise ConnectionError("down")
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await breaker.call(unreachable)
+    assert breaker.state == "open"
+
+    # Fails fast without calling the service
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(unreachable)
+    assert len(calls) == 2
+
+    # After the reset timeout one trial call goes through and closes the circuit
+    breaker.reset_timeout = 0
+
+    async def healthy():
+        return "ok"
+
+    assert await breaker.call(healthy) == "ok"
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+@pytest.mark.anyio
+async def test_failed_trial_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+
+    async def unreachable():
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        await breaker.call(unreachable)
+    breaker.reset_timeout = 60
+    assert breaker.state == "open"
+    breaker.reset_timeout = 0
+    with pytest.raises(ConnectionError):
+        await breaker.call(unreachable)   # half-open trial
+    breaker.reset_timeout = 60
+    assert breaker.state == "open"
+
+
+@pytest.mark.anyio
+async def test_cancelled_trial_releases_half_open_slot():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+
+    async def unreachable():
+        raise ConnectionError("down")
+
+    async def hangs():
+        await asyncio.sleep(60)
+
+    with pytest.raises(ConnectionError):
+        await breaker.call(unreachable)
+    trial = asyncio.ensure_future(breaker.call(hangs))   # half-open trial
+    await asyncio.sleep(0)
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    async def healthy():
+        return "ok"
+
+    assert await breaker.call(healthy) == "ok"
+    assert breaker.state == "closed"
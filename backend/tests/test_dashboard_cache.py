@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from conftest import FakeSession
+
+from app.services.dashboard_cache import cached_dashboard, dashboard_version, invalidate_dashboard, store_dashboard
+
+
+def test_entry_is_only_served_for_the_version_it_was_built_from():
+    user_id = uuid.uuid4()
+    store_dashboard(user_id, "v1", (b"body", "etag"))
+    assert cached_dashboard(user_id, "v1") == (b"body", "etag")
+    # Another worker saved an interview: the version moved on, this worker's entry is stale
+    assert cached_dashboard(user_id, "v2") is None
+
+    invalidate_dashboard(user_id)
+    assert cached_dashboard(user_id, "v1") is None
+
+
+@pytest.mark.anyio
+async def test_version_changes_with_any_dashboard_row():
+    user_id = uuid.uuid4()
+    before = FakeSession([(datetime(2026, 1, 1), 1, 2, 0, None, None, 0, None, None)])
+    after = FakeSession([(datetime(2026, 1, 1), 1, 2, 1, datetime(2026, 1, 2), None, 0, None, None)])
+
+    assert await dashboard_version(before, user_id) != await dashboard_version(after, user_id)
+    assert before.statements[0][1] == {"user_id": user_id}
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services import embedding_service as embedding_service_module
+from app.services.embedding_service import EmbeddingService
+
+
+class RecordingEncoder:
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.threads = set()
+        self.fail_on = fail_on
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        self.threads.add(threading.current_thread().name)
+        if self.fail_on in texts:
+            raise RuntimeError("model failed")
+        return [[float(len(t))] for t in texts]
+
+
+@pytest.mark.anyio
+async def test_concurrent_requests_share_one_batch():
+    encoder = RecordingEncoder()
+    service = EmbeddingService(window_ms=50, max_batch=8, encode=encoder)
+    try:
+        vectors = await asyncio.gather(*(service.embed("x" * n) for n in range(1, 6)))
+        assert vectors == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+        assert len(encoder.batches) == 1 and sorted(map(len, encoder.batches[0])) == [1, 2, 3, 4, 5]
+        assert all(name.startswith("embedding") for name in encoder.threads)   # off the event loop
+
+        stats = service.stats()
+        assert (stats["batches"], stats["texts"], stats["max_batch_size"]) == (1, 5, 5)
+    finally:
+        await service.close()
+
+
+@pytest.mark.anyio
+async def test_full_batches_do_not_wait_for_the_window():
+    encoder = RecordingEncoder()
+    service = EmbeddingService(window_ms=10_000, max_batch=3, encode=encoder)
+    try:
+        vectors = await asyncio.wait_for(service.embed_many(["a", "bb", "ccc"]), timeout=5)
+        assert vectors == [[1.0], [2.0], [3.0]]
+    finally:
+        await service.close()
+
+
+@pytest.mark.anyio
+async def test_encoder_errors_reach_every_caller_in_the_batch():
+    service = EmbeddingService(window_ms=50, encode=RecordingEncoder(fail_on="bad"))
+    try:
+        results = await asyncio.gather(service.embed("ok"), service.embed("bad"), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert await service.embed("fine") == [4.0]   # the service keeps working
+    finally:
+        await service.close()
+
+
+@pytest.mark.anyio
+async def test_preload_reports_loading_until_warm():
+    loaded = threading.Event()
+
+    def slow_load():
+        loaded.wait(5)
+        return 0.25
+
+    service = EmbeddingService(encode=RecordingEncoder(), preload="lifespan", load=slow_load)
+    try:
+        await service.start()
+        assert service.readiness() == "loading"
+        loaded.set()
+        await service.wait_ready()
+        assert service.readiness() == "ready"
+        assert service.stats()["load_seconds"] == 0.25
+    finally:
+        await service.close()
+
+
+@pytest.mark.anyio
+async def test_failed_preload_is_reported():
+    def broken_load():
+        raise RuntimeError("no torch")
+
+    service = EmbeddingService(encode=RecordingEncoder(), preload="lifespan", load=broken_load)
+    try:
+        await service.start()
+        await service.wait_ready()
+        assert service.readiness() == "failed"
+    finally:
+        await service.close()
+
+
+@pytest.mark.anyio
+async def test_lazy_mode_skips_preload(monkeypatch):
+    # Independent of whether another test already loaded the shared model
+    monkeypatch.setattr(embedding_service_module, "is_model_loaded", lambda: False)
+    calls = []
+    service = EmbeddingService(encode=RecordingEncoder(), preload="lazy", load=lambda: calls.append(1))
+    try:
+        await service.start()
+        await service.wait_ready()
+        assert calls == [] and service._loader is None
+        assert service.readiness() == "lazy"
+    finally:
+        await service.close()
+
+
+@pytest.mark.anyio
+async def test_cancelled_batch_fails_its_callers():
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_encode(texts):
+        started.set()
+        release.wait(5)
+        return [[1.0] for _ in texts]
+
+    service = EmbeddingService(window_ms=1, encode=blocking_encode)
+    try:
+        caller = asyncio.ensure_future(service.embed("stuck"))
+        await asyncio.to_thread(started.wait, 5)
+        for task in list(service._in_flight):
+            task.cancel()
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(caller, timeout=5)
+    finally:
+        release.set()
+        await service.close()
+
+
+def test_each_event_loop_gets_its_own_queue():
+    service = EmbeddingService(window_ms=1, encode=RecordingEncoder())
+    first, second = asyncio.new_event_loop(), asyncio.new_event_loop()
+    try:
+        assert first.run_until_complete(service.embed("first")) == [5.0]
+        # The first loop is still open with its collector alive; the second must not reuse its queue
+        assert second.run_until_complete(asyncio.wait_for(service.embed("second"), 5)) == [6.0]
+        second.run_until_complete(service.close())
+        first.run_until_complete(asyncio.sleep(0))
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from conftest import FakeSession
+
+from app.services import embedding_store
+from app.services.embedding_store import chunk_text, embed_texts, pool, text_hash
+
+
+def test_text_hash_is_exact_content():
+    assert text_hash("Python developer\n") == text_hash("  Python developer")
+    assert text_hash("Python developer") != text_hash("python developer")
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_text("Senior Python developer", words=5, overlap=1) == ["Senior Python developer"]
+
+
+def test_long_text_chunks_overlap_and_cover_everything():
+    words = [f"w{i}" for i in range(23)]
+    chunks = chunk_text(" ".join(words), words=10, overlap=3)
+    assert chunks[0].split() == words[:10]
+    assert chunks[1].split()[:3] == words[7:10]
+    assert chunks[-1].split()[-1] == "w22"
+    assert len(chunks) == 3
+
+
+@pytest.mark.parametrize("mode, expected", [("mean", [0.5, 0.5]), ("max", [1.0, 1.0])])
+def test_pool_returns_unit_vectors(mode, expected):
+    pooled = pool([[1.0, 0.0], [0.0, 1.0]], mode)
+    np.testing.assert_allclose(pooled, np.asarray(expected) / np.linalg.norm(expected), rtol=1e-6)
+
+
+def test_embed_texts_encodes_all_chunks_in_one_call(monkeypatch):
+    calls = []
+
+    def fake_embeddings(texts, batch_size):
+        calls.append(list(texts))
+        return [[1.0, 0.0] if i % 2 == 0 else [0.0, 1.0] for i in range(len(texts))]
+
+    monkeypatch.setattr(embedding_store, "get_embeddings", fake_embeddings)
+    long_text = " ".join(["skill"] * (embedding_store.EMBEDDING_CHUNK_WORDS * 2))
+    vectors = embed_texts(["short CV", long_text])
+
+    assert len(calls) == 1 and calls[0][0] == "short CV" and len(calls[0]) > 2
+    assert vectors[0] == [1.0, 0.0]                     # single chunk: the model's vector unchanged
+    assert np.isclose(np.linalg.norm(vectors[1]), 1.0)  # pooled chunks
+
+
+def test_key_names_every_setting_that_changes_the_vector():
+    for part in (embedding_store.EMBEDDING_MODEL_NAME, embedding_store.EMBEDDING_BACKEND, embedding_store.EMBEDDING_POOLING):
+        assert part in embedding_store.EMBEDDING_KEY
+    assert f"{embedding_store.EMBEDDING_CHUNK_WORDS}w{embedding_store.EMBEDDING_CHUNK_OVERLAP}o" in embedding_store.EMBEDDING_KEY
+
+
+@pytest.mark.anyio
+async def test_ad_hoc_text_is_not_persisted(monkeypatch):
+    async def fake_embed_text(text):
+        return [1.0, 0.0], 1
+    monkeypatch.setattr(embedding_store, "embed_text", fake_embed_text)
+    session = FakeSession()
+
+    assert await embedding_store.get_or_embed(session, "pasted JD", store=False) == (text_hash("pasted JD"), [1.0, 0.0])
+    assert session.statements == []
+    await embedding_store.get_or_embed(session, "uploaded CV")
+    assert len(session.statements) == 1
+
+
+class Row:
+    def __init__(self, embedding=None, content_hash=None, embedding_model=None):
+        self.embedding, self.content_hash, self.embedding_model = embedding, content_hash, embedding_model
+
+
+@pytest.mark.anyio
+async def test_ensure_embedding_reembeds_rows_from_another_key(monkeypatch):
+    async def fake_embed_text(text):
+        return [0.0, 1.0], 1
+    monkeypatch.setattr(embedding_store, "embed_text", fake_embed_text)
+    session = FakeSession()
+
+    current = Row([1.0, 0.0], text_hash("CV"), embedding_store.EMBEDDING_KEY)
+    assert not await embedding_store.ensure_embedding(session, current, "CV")
+    assert current.embedding == [1.0, 0.0]
+
+    stale = Row([1.0, 0.0], text_hash("CV"), "old-model")
+    assert await embedding_store.ensure_embedding(session, stale, "CV")
+    assert (stale.embedding, stale.embedding_model) == ([0.0, 1.0], embedding_store.EMBEDDING_KEY)
+
@@ -0,0 +1,117 @@
+import pytest
+from conftest import FakeConnection
+
+from app.retrieval import esco_loader
+
+
+def _write_esco(tmp_path):
+    (tmp_path / "skills_en.csv").write_text(
+        "conceptType,conceptUri,skillType,preferredLabel,altLabels,description\n"
+        "KnowledgeSkillCompetence,s:py,knowledge,Python,python3,Programming language\n"
+        "KnowledgeSkillCompetence,s:sql,knowledge,SQL,,\n"
+        "KnowledgeSkillCompetence,s:py,knowledge,Python,,duplicate row\n"
+    )
+    (tmp_path / "skillGroups_en.csv").write_text(
+        "conceptType,conceptUri,preferredLabel,altLabels,description\nSkillGroup,g:prog,programming,,\n"
+    )
+    (tmp_path / "skillSkillRelations_en.csv").write_text(
+        "originalSkillUri,originalSkillType,relationType,relatedSkillUri,relatedSkillType\n"
+        "s:py,knowledge,optional,s:sql,knowledge\n"
+        "s:py,knowledge,optional,s:unknown,knowledge\n"
+    )
+    (tmp_path / "broaderRelationsSkillPillar_en.csv").write_text(
+        "conceptType,conceptUri,broaderType,broaderUri\n"
+        "KnowledgeSkillCompetence,s:py,SkillGroup,g:prog\n"
+        "KnowledgeSkillCompetence,s:py,SkillGroup,g:prog\n"
+    )
+    (tmp_path / "occupations_en.csv").write_text(
+        "conceptType,conceptUri,iscoGroup,preferredLabel,altLabels,description\n"
+        "Occupation,o:dev,2512,software developer,,Writes software\n"
+    )
+    (tmp_path / "occupationSkillRelations_en.csv").write_text(
+        "occupationUri,relationType,skillType,skillUri\n"
+        "o:dev,essential,knowledge,s:py\n"
+        "o:dev,optional,knowledge,s:sql\n"
+        "o:dev,essential,knowledge,s:unknown\n"
+        "o:other,essential,knowledge,s:py\n"
+    )
+    return str(tmp_path)
+
+
+def test_rows_use_stable_uri_ids(tmp_path):
+    esco_dir = _write_esco(tmp_path)
+    skills = esco_loader.skill_rows(esco_dir)
+    assert [row[1] for row in skills] == ["s:py", "s:sql", "g:prog"]
+    assert skills[0][0] == esco_loader.concept_uuid("s:py") == esco_loader.skill_rows(esco_dir)[0][0]
+
+    relations = esco_loader.relation_rows([row[1] for row in skills], esco_dir)
+    assert sorted((r[1], r[2], r[3]) for r in relations) == sorted([
+        (esco_loader.concept_uuid("s:py"), esco_loader.concept_uuid("s:sql"), "optional"),
+        (esco_loader.concept_uuid("s:py"), esco_loader.concept_uuid("g:prog"), "broader"),
+    ])
+    occupations = esco_loader.occupation_rows(esco_dir)
+    occupation_skills = esco_loader.occupation_skill_rows([row[1] for row in occupations], [row[1] for row in skills], esco_dir)
+    assert sorted((r[2], r[3]) for r in occupation_skills) == sorted([
+        (esco_loader.concept_uuid("s:py"), "essential"), (esco_loader.concept_uuid("s:sql"), "optional"),
+    ])
+    assert {r[1] for r in occupation_skills} == {esco_loader.concept_uuid("o:dev")}
+    assert esco_loader.embedding_text("SQL", None) == "SQL"
+    assert esco_loader.embedding_text("Python", "Language") == "Python: Language"
+
+
+class PendingConnection(FakeConnection):
+    """esco_skills rows with a NULL embedding, as asyncpg would return them."""
+
+    def __init__(self, rows):
+        self.pending = {row["id"]: row for row in rows}
+        self.embedded = {}
+
+    async def fetchval(self, query, *args):
+        return len(self.pending)
+
+    async def fetch(self, query, limit, *args):
+        return sorted(self.pending.values(), key=lambda row: row["id"])[:limit]
+
+    async def execute(self, query, ids, vectors):
+        for row_id, vector in zip(ids, vectors):
+            self.embedded[row_id] = vector
+            del self.pending[row_id]
+
+
+@pytest.mark.anyio
+async def test_embed_pending_resumes_after_failure(monkeypatch):
+    conn = PendingConnection([{"id": i, "name": f"skill {i}", "description": None} for i in range(5)])
+    calls = []
+
+    def embed(model, texts, strict=False):
+        calls.append(list(texts))
+        if len(calls) == 2:
+            raise RuntimeError("quota exceeded")
+        return [[float(len(t))] for t in texts]
+    monkeypatch.setattr(esco_loader.gemini_client, "embed_contents", embed)
+
+    with pytest.raises(RuntimeError):
+        await esco_loader.embed_pending(conn, batch_size=2, concurrency=1, max_retries=0)
+    assert sorted(conn.embedded) == [0, 1]
+
+    assert await esco_loader.embed_pending(conn, batch_size=2, concurrency=2, max_retries=0) == 3
+    assert sorted(conn.embedded) == [0, 1, 2, 3, 4] and conn.embedded[4] == "[7.0]"
+
+
+def test_diff_rows():
+    diff = esco_loader.diff_rows(
+        {"a": "h1", "b": "h2-new", "c": "h3", "e": "h5"},
+        {"a": "h1", "b": "h2", "d": "h4", "e": None},
+    )
+    assert (diff.inserted, diff.updated, diff.deleted) == (["c"], ["b", "e"], ["d"])
+    assert diff.summary() == "+1 ~2 -1"
+    assert not esco_loader.diff_rows({"a": "h1"}, {"a": "h1"})
+
+
+def test_content_hash_tracks_imported_fields(tmp_path):
+    esco_dir = _write_esco(tmp_path)
+    before = {row[1]: row[-1] for row in esco_loader.skill_rows(esco_dir)}
+    skills_csv = tmp_path / "skills_en.csv"
+    skills_csv.write_text(skills_csv.read_text().replace("Programming language", "A programming language"))
+    after = {row[1]: row[-1] for row in esco_loader.skill_rows(esco_dir)}
+    assert before["s:py"] != after["s:py"] and before["s:sql"] == after["s:sql"]
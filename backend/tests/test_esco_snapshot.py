@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from app.retrieval.esco_csv import EscoConcept, EscoEdge
+from app.retrieval.esco_snapshot import EscoSnapshot, write_snapshot
+from app.retrieval.skill_graph import SkillGraph
+
+
+def _graph():
+    return SkillGraph.from_edges(
+        ["s:py", "s:prog", "s:sql", "s:db"],
+        ["Python", "computer programming", "SQL", "databases"],
+        {"broader": ([0, 2], [1, 3]), "optional": ([0], [2])},
+        aliases={"python 3": 0, "Structured Query Language": 2},
+    )
+
+
+def test_round_trip(tmp_path):
+    graph = _graph()
+    concepts = {"s:py": EscoConcept("s:py", "Python", description="A language — with ünïcode", skill_type="knowledge")}
+    occupations = [EscoConcept("o:dev", "software developer", code="2512"), EscoConcept("o:dba", "database administrator")]
+    edges = [EscoEdge("o:dev", "s:py", "essential"), EscoEdge("o:dev", "s:sql", "optional"), EscoEdge("o:dev", "s:missing", "optional")]
+    path = str(tmp_path / "esco.bin")
+    write_snapshot(path, graph, concepts, occupations, edges, {0: [0.5, -1.0], 2: [0.25, 2.0]}, dataset_version=7)
+
+    snapshot = EscoSnapshot.open(path)
+    loaded = snapshot.to_graph()
+    assert loaded.uris == graph.uris and loaded.names == graph.names
+    assert loaded.name_to_id == graph.name_to_id
+    assert sorted(loaded.k_hop([0], k=2)) == sorted(graph.k_hop([0], k=2))
+    assert snapshot.dataset_version == 7 and snapshot.num_occupations == 2
+
+    assert snapshot.skill_descriptions[0] == "A language — with ünïcode"
+    assert snapshot.skill_descriptions[1] == ""
+    assert snapshot.skill_type(0) == "knowledge"
+    assert snapshot.occupation_codes[0] == "2512"
+    assert sorted(snapshot.occupation_skills(0)) == [0, 2]
+    assert list(snapshot.occupation_skills(0, ["essential"])) == [0]
+    assert snapshot.occupation_skills(1).size == 0
+
+    assert snapshot.embeddings.dtype == np.float16 and snapshot.embeddings.shape == (4, 2)
+    assert snapshot.embedding_mask.tolist() == [True, False, True, False]
+    np.testing.assert_array_equal(snapshot.embeddings[2], [0.25, 2.0])
+    # Views into the read-only mapping, not copies
+    assert not snapshot.embeddings.flags.writeable
+    snapshot.close()
+
+
+def test_without_embeddings_or_occupations(tmp_path):
+    path = str(tmp_path / "esco.bin")
+    write_snapshot(path, _graph())
+    snapshot = EscoSnapshot.open(path)
+    assert snapshot.embeddings is None and snapshot.num_occupations == 0
+    assert snapshot.to_graph().num_edges == 3
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a_snapshot.bin"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        EscoSnapshot.open(str(path))
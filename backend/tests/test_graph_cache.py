@@ -0,0 +1,65 @@
+import pytest
+
+from app.agents.graph_rag import agent as graph_agent
+from app.retrieval import esco_runtime, graph_cache
+from app.retrieval.skill_graph import SkillGraph
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(graph_cache, "_esco_version", 0)
+    monkeypatch.setattr(graph_cache, "_version_checked_at", None)
+    for cache in (graph_cache.skill_context_cache, graph_cache.expanded_skills_cache):
+        monkeypatch.setattr(cache, "hits", 0)
+        monkeypatch.setattr(cache, "misses", 0)
+    graph_cache.invalidate_graph_caches()
+    yield
+    graph_cache.invalidate_graph_caches()
+
+
+def test_skill_set_key_ignores_order_and_duplicates():
+    assert graph_cache.skill_set_key("ctx", [3, 1, 3], 5, 2) == graph_cache.skill_set_key("ctx", [1, 3], 5, 2)
+    assert graph_cache.skill_set_key("ctx", [1, 3], 5, 2) != graph_cache.skill_set_key("ctx", [1, 3], 5, 3)
+
+
+@pytest.mark.anyio
+async def test_version_change_clears_caches(monkeypatch):
+    versions = iter([0, 4])
+
+    async def read():
+        return next(versions)
+    monkeypatch.setattr(graph_cache, "_read_esco_version", read)
+
+    assert await graph_cache.current_esco_version() == 0
+    graph_cache.skill_context_cache.set("k", "context")
+
+    # Within the refresh interval the version is not re-read
+    assert await graph_cache.current_esco_version() == 0
+    assert len(graph_cache.skill_context_cache) == 1
+
+    monkeypatch.setattr(graph_cache, "_version_checked_at", None)
+    assert await graph_cache.current_esco_version() == 4
+    assert len(graph_cache.skill_context_cache) == 0
+    assert graph_cache.graph_cache_stats()["esco_version"] == 4
+
+
+@pytest.mark.anyio
+async def test_expanded_skills_cached_by_canonical_set(monkeypatch):
+    graph = SkillGraph.from_edges(
+        ["s:react", "s:js", "s:web"],
+        ["React", "JavaScript", "web programming"],
+        {"broader": ([0, 1], [1, 2])},
+    )
+    monkeypatch.setattr(esco_runtime, "_skill_graph", graph)
+    monkeypatch.setattr(graph_cache, "_version_checked_at", float("inf"))  # skip the DB lookup
+    agent = graph_agent.GraphRAGAgent()
+
+    first = await agent.get_expanded_skills(["React"])
+    assert {"javascript", "web programming"} <= first
+    stats = graph_cache.graph_cache_stats()["expanded_skills"]
+    assert (stats["hits"], stats["misses"], stats["size"]) == (0, 1, 1)
+
+    second = await agent.get_expanded_skills(["ReactJS"])
+    assert second == (first - {"react"}) | {"reactjs"}
+    stats = graph_cache.graph_cache_stats()["expanded_skills"]
+    assert stats["hits"] == 1 and stats["hit_rate"] == 0.5
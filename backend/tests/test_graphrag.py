@@ -1,6 +1,7 @@
 import pytest
 from app.agents.graph_rag.agent import graph_rag_agent
 
+
 @pytest.mark.anyio
 async def test_graph_rag_agent():
     candidate_profile = {
@@ -2,6 +2,7 @@ import pytest
 import json
 from app.agents.graph_rag.agent import graph_rag_agent
 
+
 @pytest.mark.anyio
 async def test_graphrag_final():
     # Scenario: A candidate who knows basic web development (React, JS) 
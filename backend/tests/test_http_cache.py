@@ -0,0 +1,37 @@
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import StreamingSafeGZipMiddleware
+from app.core.http_cache import etag_matches, weak_etag
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(StreamingSafeGZipMiddleware, minimum_size=10)
+
+    @app.get("/api/pipeline/{pipeline_id}/events")
+    async def events(pipeline_id: str):
+        return StreamingResponse(iter(["data: x\n\n" * 50]), media_type="text/event-stream")
+
+    @app.get("/api/dashboard/")
+    async def dashboard():
+        return PlainTextResponse("y" * 2000)
+
+    return TestClient(app)
+
+
+def test_event_streams_are_never_compressed():
+    client = _app()
+    events = client.get("/api/pipeline/run-1/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in events.headers
+    dashboard = client.get("/api/dashboard/", headers={"Accept-Encoding": "gzip"})
+    assert dashboard.headers["content-encoding"] == "gzip"
+
+
+def test_weak_etags_match_either_form():
+    etag = weak_etag(b"body")
+    assert etag.startswith('W/"')
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag[2:], etag)                     # a client that dropped the W/ prefix
+    assert not etag_matches(weak_etag(b"other"), etag)
@@ -0,0 +1,80 @@
+import uuid
+
+import pytest
+from conftest import FakeSession
+
+from app.models.interview_roadmap import SkillRoadmap
+from app.models.job_market import SalaryBenchmark
+from app.orchestrator import master_orchestrator_agent
+from app.orchestrator.master_orchestrator_agent import MasterOrchestratorAgent
+from app.services.job_cards import (
+    TIER_ORDER,
+    build_job_cards_from_market,
+    job_card_from_match,
+    job_matches_from_cards,
+)
+
+
+STATE = {
+    "skills": ["Python", "React", "SQL"],
+    "missing_skills": ["Docker", "AWS"],
+    "market_analysis": {
+        "market_analysis": {
+            "Python": {
+                "status": "High Demand",
+                "snippets": [
+                    "Senior Python Developer at WSO2",
+                    "Data Engineer (Python, SQL) at Sysco LABS",
+                    "QA Engineer at Virtusa",
+                ],
+            },
+            "React": {
+                "status": "Stable",
+                "snippets": [
+                    "React Frontend Engineer at IFS",
+                    "senior python developer at Another Co",   # duplicate title
+                    "Intern",
+                ],
+            },
+        }
+    },
+}
+
+
+def test_materialized_cards_preserve_live_ordering():
+    live = build_job_cards_from_market(STATE)
+    rows = job_matches_from_cards(live, user_id=uuid.uuid4(), pipeline_id=uuid.uuid4())
+
+    # Same ordering the dashboard query applies: tier_rank, match_score DESC, rank
+    rows.sort(key=lambda jm: (jm.tier_rank, -jm.match_score, jm.rank))
+
+    assert [job_card_from_match(jm) for jm in rows] == live
+
+
+def test_live_cards_are_deduped_and_tiered():
+    cards = build_job_cards_from_market(STATE)
+
+    titles = [c["title"].lower() for c in cards]
+    assert len(titles) == len(set(titles))
+    assert [TIER_ORDER[c["tier"]] for c in cards] == sorted(TIER_ORDER[c["tier"]] for c in cards)
+    assert all(c["missing_skills"] == [] for c in cards if c["tier"] == "Realistic")
+
+
+@pytest.mark.anyio
+async def test_card_failure_does_not_lose_other_results(monkeypatch):
+    def broken_cards(state):
+        raise RuntimeError("skill graph unavailable")
+
+    monkeypatch.setattr(master_orchestrator_agent, "build_job_cards_from_market", broken_cards)
+    session = FakeSession()
+    run = type("Run", (), {"user_id": uuid.uuid4(), "id": uuid.uuid4()})()
+    state = {
+        **STATE,
+        "salary_benchmarks": {"salary_min": 100, "salary_max": 200},
+        "skill_roadmap": [{"skill": "Docker"}],
+    }
+
+    await MasterOrchestratorAgent(session, "")._persist_to_tables(run, state, session)
+
+    assert {type(obj) for obj in session.added} == {SalaryBenchmark, SkillRoadmap}
+    assert session.commits == 1
@@ -0,0 +1,99 @@
+import pytest
+from conftest import FakeConnection
+
+from app.services import embedding_store
+from app.services.job_ingestion import ingest_postings, normalize_posting, reembed_stale_jobs
+
+
+def test_normalize_posting():
+    posting = normalize_posting({"title": "  Senior  Python\nDeveloper ", "company": "WSO2 "})
+    assert (posting.title, posting.company, posting.description_text) == ("Senior Python Developer", "WSO2", "Senior Python Developer at WSO2")
+    assert posting.content_hash == normalize_posting({"title": "senior python developer", "company": "wso2"}).content_hash
+    assert posting.content_hash != normalize_posting({"title": "Senior Python Developer", "company": "IFS"}).content_hash
+    assert normalize_posting({"title": "  ", "company": "WSO2"}) is None
+
+
+class JobsConnection(FakeConnection):
+    """The jobs table keyed by content hash, as the staging upsert would leave it."""
+
+    def __init__(self, stored=(), embeddings=None, stored_model=embedding_store.EMBEDDING_KEY):
+        self.jobs = {h: {"embedding": "[0.0]", "embedding_model": stored_model} for h in stored}
+        self.embeddings = dict(embeddings or {})    # text_embeddings by content hash
+        self.staged = []
+
+    async def execute(self, query, *args):
+        self.staged = []
+
+    async def executemany(self, query, rows):
+        if query.startswith("UPDATE jobs"):
+            for job_id, vector, model in rows:
+                self.jobs[job_id].update(embedding=vector, embedding_model=model)
+            return
+        for content_hash, model, vector, num_chunks in rows:
+            self.embeddings.setdefault(content_hash, vector)
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.staged.extend(dict(zip(columns, r)) for r in records)
+
+    async def fetch(self, query, *args):
+        if "SELECT content_hash FROM jobs" in query:
+            return [{"content_hash": h} for h in args[0] if self.jobs.get(h, {}).get("embedding_model") == args[1]]
+        if "SELECT id, description_text FROM jobs" in query:
+            stale = [(h, row) for h, row in self.jobs.items() if row.get("embedding_model") != args[0]]
+            return [{"id": h, "description_text": row["description_text"]} for h, row in stale[:args[1]]]
+        if "FROM text_embeddings" in query:
+            return [{"content_hash": h, "embedding": self.embeddings[h]} for h in args[1] if h in self.embeddings]
+        results = []
+        for row in self.staged:
+            results.append({"inserted": row["content_hash"] not in self.jobs})
+            stored = self.jobs.setdefault(row["content_hash"], row)
+            if row["embedding"] is not None:
+                stored.update(embedding=row["embedding"], embedding_model=row["embedding_model"])
+        return results
+
+
+@pytest.mark.anyio
+async def test_ingest_dedupes_and_embeds_only_new_postings(monkeypatch):
+    encoded = []
+    monkeypatch.setattr(embedding_store, "get_embeddings", lambda texts, batch_size: encoded.extend(texts) or [[1.0]] * len(texts))
+    known = normalize_posting({"title": "QA Engineer", "company": "Virtusa"}).content_hash
+    # Same description as a stored CV or job: reused, not re-embedded
+    conn = JobsConnection(stored=[known], embeddings={embedding_store.text_hash("React and TypeScript"): "[0.5,0.5]"})
+
+    postings = iter([
+        {"title": "Data Engineer", "company": "Sysco LABS"},
+        {"title": "data engineer ", "company": "sysco labs"},   # same posting, re-scraped
+        {"title": "QA Engineer", "company": "Virtusa"},          # already stored
+        {"title": "", "company": "Nobody"},
+        {"title": "React Developer", "company": "IFS", "description": "React and TypeScript"},
+    ])
+    stats = await ingest_postings(conn, postings, source="topjobs", batch_size=2)
+
+    assert (stats.seen, stats.inserted, stats.refreshed, stats.duplicates, stats.invalid, stats.reused) == (5, 2, 1, 1, 1, 1)
+    assert encoded == ["Data Engineer at Sysco LABS"]
+    assert embedding_store.text_hash("Data Engineer at Sysco LABS") in conn.embeddings
+    assert len(conn.jobs) == 3
+    assert [row["embedding"] for row in conn.jobs.values() if row.get("description_text") == "React and TypeScript"] == ["[0.5, 0.5]"]
+    assert {row["source"] for h, row in conn.jobs.items() if h != known} == {"topjobs"}
+
+
+@pytest.mark.anyio
+async def test_jobs_from_another_embedding_key_are_reembedded(monkeypatch):
+    encoded = []
+    monkeypatch.setattr(embedding_store, "get_embeddings", lambda texts, batch_size: encoded.extend(texts) or [[1.0]] * len(texts))
+    posting = normalize_posting({"title": "QA Engineer", "company": "Virtusa"})
+    conn = JobsConnection(stored=[posting.content_hash], stored_model="old-model")
+    conn.jobs[posting.content_hash]["description_text"] = posting.description_text
+
+    # Re-scraped: embedded again under the current key
+    stats = await ingest_postings(conn, iter([{"title": "QA Engineer", "company": "Virtusa"}]), source="topjobs")
+    assert (stats.inserted, stats.refreshed, encoded) == (0, 1, ["QA Engineer at Virtusa"])
+    assert conn.jobs[posting.content_hash]["embedding_model"] == embedding_store.EMBEDDING_KEY
+
+    # Not re-scraped: picked up by the backfill, reusing the cached vector
+    conn.jobs[posting.content_hash]["embedding_model"] = None
+    assert await reembed_stale_jobs(conn) == 1
+    assert conn.jobs[posting.content_hash]["embedding_model"] == embedding_store.EMBEDDING_KEY
+    assert encoded == ["QA Engineer at Virtusa"]
+    assert await reembed_stale_jobs(conn) == 0
+
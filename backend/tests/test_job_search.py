@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+import pytest
+from conftest import FakeSession
+
+from app.retrieval import esco_runtime
+from app.retrieval.skill_graph import SkillGraph
+from app.retrieval.skill_normalizer import SkillNormalizer
+from app.services import job_search
+from app.services.job_search import JobHit, apply_reranker, register_reranker, search_jobs
+
+
+def _hit(job_id, similarity, description="", age_days=0):
+    return JobHit(job_id, f"Job {job_id}", None, datetime.utcnow() - timedelta(days=age_days), description, similarity, similarity)
+
+
+def test_recency_reranker_prefers_fresh_postings():
+    hits = [_hit("old", 0.80, age_days=120), _hit("new", 0.78, age_days=1)]
+    assert [h.id for h in apply_reranker("recency", "", hits)] == ["new", "old"]
+
+
+def test_skills_reranker_blends_coverage(monkeypatch):
+    graph = SkillGraph.from_edges(["s:py", "s:sql", "s:java"], ["Python", "SQL", "Java"], {})
+    monkeypatch.setattr(esco_runtime, "_skill_graph", graph)
+    monkeypatch.setattr(esco_runtime, "_skill_normalizer", SkillNormalizer(graph))
+    hits = [
+        _hit("java", 0.82, "Java and SQL developer"),
+        _hit("python", 0.75, "We need Python and SQL"),
+        _hit("vague", 0.60, "A great team"),
+    ]
+    ranked = apply_reranker("skills", "Python, SQL", hits)
+    assert [h.id for h in ranked] == ["python", "java", "vague"]
+    assert ranked[2].score == 0.60   # no skills named: similarity only
+
+
+def test_custom_rerankers_register_by_name(monkeypatch):
+    monkeypatch.setattr(job_search, "RERANKERS", dict(job_search.RERANKERS))
+    register_reranker("reverse")(lambda cv_text, hits: hits[::-1])
+    assert [h.id for h in apply_reranker("reverse", "", [_hit("a", 0.9), _hit("b", 0.8)])] == ["b", "a"]
+    with pytest.raises(KeyError):
+        apply_reranker("missing", "", [])
+
+
+class Row:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+@pytest.mark.anyio
+async def test_search_applies_filters_in_one_query():
+    session = FakeSession([Row(id="j1", title="Dev", company="WSO2", created_at=None, description_text="", distance=0.25)])
+    hits = await search_jobs(session, [0.1, 0.2], k=5, posted_within_days=7, company="WSO2")
+
+    assert [(h.id, h.similarity) for h in hits] == [("j1", 0.75)]
+    (ef_sql, ef_params), (sql, params) = [(str(statement), params) for statement, params in session.statements]
+    assert "hnsw.ef_search" in ef_sql and ef_params["ef_search"] == str(job_search.JOB_SEARCH_EF_SEARCH)
+    assert "created_at >= :since" in sql and "lower(company) = lower(:company)" in sql and "<=>" in sql
+    assert params["limit"] == 5 and params["company"] == "WSO2" and params["vector"] == "[0.1, 0.2]"
+    # Jobs embedded under another key are in a different vector space
+    assert "embedding_model = :embedding_model" in sql and params["embedding_model"] == job_search.EMBEDDING_KEY
+
+
+@pytest.mark.anyio
+async def test_company_filter_is_plain_equality():
+    session = FakeSession([])
+    await search_jobs(session, [0.1], company="100%_Tech")
+
+    _, (statement, params) = session.statements
+    sql = str(statement)
+    # '%' and '_' are ordinary characters in an equality match
+    assert "lower(company) = lower(:company)" in sql and "LIKE" not in sql
+    assert params["company"] == "100%_Tech"
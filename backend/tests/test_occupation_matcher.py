@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from app.retrieval.esco_csv import EscoConcept, EscoEdge
+from app.retrieval.esco_snapshot import EscoSnapshot, write_snapshot
+from app.retrieval.occupation_matcher import OccupationMatcher
+from app.retrieval.skill_graph import SkillGraph
+
+SKILLS = ["Python", "SQL", "Docker", "databases"]
+
+
+def _matcher():
+    # dev: Python, SQL essential, Docker optional; dba: SQL, databases essential; analyst has no embedding
+    edges = [(0, 0, "essential"), (0, 1, "essential"), (0, 2, "optional"),
+             (1, 1, "essential"), (1, 3, "essential"), (1, 3, "optional"), (0, 3, "broader")]
+    return OccupationMatcher(
+        ["o:dev", "o:dba", "o:analyst"],
+        ["software developer", "database administrator", "data analyst"],
+        np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]),
+        [0, 1],
+        SKILLS,
+        edges,
+    )
+
+
+def test_resolve_by_cosine_similarity():
+    matcher = _matcher()
+    [[best, second], only_dba, failed] = matcher.resolve(
+        [[3.0, 1.0, 0.0], [0.0, 2.0, 0.1], [0.0, 0.0, 0.0]], k=2, min_similarity=0.0,
+    )
+    assert (best.uri, second.uri) == ("o:dev", "o:dba")
+    assert best.similarity == pytest.approx(3 / np.sqrt(10), abs=1e-4)
+    assert [hit.name for hit in only_dba][0] == "database administrator"
+    assert failed == []   # zero vector from a failed embedding call
+    assert matcher.resolve([[1.0, 1.0, 0.0]], k=2, min_similarity=0.8) == [[]]
+
+
+def test_required_skills():
+    matcher = _matcher()
+    assert [(s.name, s.relation_type, s.weight) for s in matcher.required_skills(0)] == [
+        ("python", "essential", 1.0), ("sql", "essential", 1.0), ("docker", "optional", 0.5),
+    ]
+    # Listed as both essential and optional: essential wins; unknown relation types are ignored
+    assert [(s.name, s.relation_type) for s in matcher.required_skills(1)] == [("databases", "essential"), ("sql", "essential")]
+    assert matcher.required_skills(2) == []
+
+
+def test_from_snapshot(tmp_path):
+    graph = SkillGraph.from_edges(["s:py", "s:sql"], ["Python", "SQL"], {})
+    occupations = [EscoConcept("o:dev", "software developer"), EscoConcept("o:dba", "database administrator")]
+    edges = [EscoEdge("o:dev", "s:py", "essential"), EscoEdge("o:dev", "s:sql", "optional"), EscoEdge("o:dba", "s:sql", "essential")]
+    path = str(tmp_path / "esco.bin")
+    write_snapshot(path, graph, None, occupations, edges, occupation_embeddings={1: [0.0, 1.0]})
+
+    snapshot = EscoSnapshot.open(path)
+    assert snapshot.occupation_embedding_mask.tolist() == [False, True]
+    matcher = OccupationMatcher.from_snapshot(snapshot)
+    assert len(matcher) == 2 and matcher.num_embedded == 1
+    [[hit]] = matcher.resolve([[0.1, 1.0]], k=3)
+    assert (hit.id, hit.name) == (1, "database administrator")
+    assert [(s.name, s.relation_type) for s in matcher.required_skills(0)] == [("python", "essential"), ("sql", "optional")]
+    snapshot.close()
+
+    write_snapshot(path, graph, None, occupations, edges)
+    assert OccupationMatcher.from_snapshot(EscoSnapshot.open(path)) is None
+
+
+@pytest.mark.anyio
+async def test_agent_resolves_each_jd_once(monkeypatch):
+    from app.agents.graph_rag.agent import gemini_client, graph_agent_instance as agent
+    from app.retrieval import esco_runtime, graph_cache
+
+    monkeypatch.setattr(esco_runtime, "_occupation_matcher", _matcher())
+    graph_cache.invalidate_graph_caches()
+    calls = []
+    monkeypatch.setattr(gemini_client, "embed_content", lambda model, text: calls.append(text) or [1.0, 0.1, 0.0])
+
+    first = await agent.resolve_occupation("Backend developer, Python and SQL")
+    again = await agent.resolve_occupation("Backend developer, Python and SQL")
+    assert first.uri == again.uri == "o:dev"
+    assert len(calls) == 1
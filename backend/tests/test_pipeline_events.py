@@ -0,0 +1,134 @@
+import asyncio
+import pytest
+from app.services.pipeline_events import PipelineEventBroker, PostgresEventBridge, event_type_for
+
+
+async def _collect(broker, run_id, last_event_id=0):
+    return [e async for e in broker.subscribe(run_id, last_event_id=last_event_id) if e is not None]
+
+
+@pytest.mark.anyio
+async def test_replays_only_missed_events():
+    broker = PipelineEventBroker()
+    for stage in range(1, 4):
+        broker.publish("run-1", "STATE_UPDATE", {"current_stage": stage})
+    broker.publish("run-1", "COMPLETED", {"status": "completed"}, close=True)
+
+    events = await _collect(broker, "run-1", last_event_id=2)
+
+    assert [e.id for e in events] == [3, 4]
+    assert events[-1].type == "COMPLETED"
+
+
+@pytest.mark.anyio
+async def test_live_subscriber_receives_new_events_and_stops_on_close():
+    broker = PipelineEventBroker()
+    broker.publish("run-2", "STATE_UPDATE", {"current_stage": 1})
+
+    subscriber = asyncio.create_task(_collect(broker, "run-2"))
+    await asyncio.sleep(0)
+    broker.publish("run-2", "STATE_UPDATE", {"current_stage": 2})
+    broker.publish("run-2", "FAILED", {"status": "failed"}, close=True)
+
+    events = await asyncio.wait_for(subscriber, timeout=1)
+    assert [e.data.get("current_stage") for e in events] == [1, 2, None]
+
+
+@pytest.mark.anyio
+async def test_keepalive_when_idle():
+    broker = PipelineEventBroker()
+    broker.publish("run-3", "STATE_UPDATE", {"current_stage": 1})
+
+    stream = broker.subscribe("run-3", last_event_id=1, keepalive_seconds=0.01)
+    assert await stream.__anext__() is None
+    await stream.aclose()
+
+
+def test_closed_logs_are_pruned_after_retention():
+    broker = PipelineEventBroker(retention_seconds=-1)
+    broker.publish("run-4", "COMPLETED", {"status": "completed"}, close=True)
+
+    assert broker.get("run-4") is None
+
+
+@pytest.mark.parametrize("status, event_type", [
+    ("completed", "COMPLETED"), ("partial", "PARTIAL"), ("waiting_for_input", "WAITING_FOR_INPUT"),
+    ("failed", "FAILED"), ("running", "STATE_UPDATE"),
+])
+def test_final_event_type_matches_status(status, event_type):
+    assert event_type_for(status) == event_type
+
+
+class FakeChannel:
+    """Postgres LISTEN/NOTIFY between fake connections: every NOTIFY reaches every listener."""
+
+    def __init__(self):
+        self.listeners = []
+        self.payloads = []
+
+    async def connect(self):
+        return FakeListenConnection(self)
+
+
+class FakeListenConnection:
+    def __init__(self, channel):
+        self.channel = channel
+
+    async def add_listener(self, name, callback):
+        self.channel.listeners.append((self, callback))
+
+    def add_termination_listener(self, callback):
+        pass
+
+    async def execute(self, query, name, payload):
+        self.channel.payloads.append(payload)
+        for conn, callback in self.channel.listeners:
+            callback(conn, 0, name, payload)
+
+    async def close(self):
+        self.channel.listeners = [(c, cb) for c, cb in self.channel.listeners if c is not self]
+
+
+@pytest.mark.anyio
+async def test_events_reach_subscribers_on_other_workers():
+    channel = FakeChannel()
+    running, serving = PipelineEventBroker(), PipelineEventBroker()
+    bridges = [PostgresEventBridge(running, channel.connect), PostgresEventBridge(serving, channel.connect)]
+    for bridge in bridges:
+        await bridge.start()
+    try:
+        # The SSE worker seeded a snapshot for a run it does not execute
+        serving.publish("run-1", "SNAPSHOT", {"status": "running"}, relay=False)
+        subscriber = asyncio.ensure_future(_collect(serving, "run-1"))
+        await asyncio.sleep(0)
+
+        for stage in (2, 3):
+            running.publish("run-1", "STATE_UPDATE", {"status": "running", "current_stage": stage})
+        running.publish("run-1", "PARTIAL", {"status": "partial"}, close=True)
+
+        events = await asyncio.wait_for(subscriber, timeout=5)
+        assert [e.type for e in events] == ["SNAPSHOT", "STATE_UPDATE", "STATE_UPDATE", "PARTIAL"]
+        # Relayed events keep the publisher's id unless the local log is already past it
+        assert [e.id for e in running.get("run-1").events] == [1, 2, 3]
+        assert [e.id for e in events[1:]] == [2, 3, 4]
+        assert len(channel.payloads) == 3                               # the local snapshot is not relayed
+    finally:
+        for bridge in bridges:
+            await bridge.close()
+
+
+@pytest.mark.anyio
+async def test_oversized_events_are_relayed_as_status_only():
+    channel = FakeChannel()
+    running, serving = PipelineEventBroker(), PipelineEventBroker()
+    bridges = [PostgresEventBridge(running, channel.connect), PostgresEventBridge(serving, channel.connect)]
+    for bridge in bridges:
+        await bridge.start()
+    try:
+        running.publish("run-1", "STATE_UPDATE", {"status": "running", "current_stage": 4, "messages": ["x" * 10_000]})
+        await asyncio.sleep(0)
+        (event,) = serving.get("run-1").events
+        assert event.data == {"status": "running", "current_stage": 4, "truncated": True}
+    finally:
+        for bridge in bridges:
+            await bridge.close()
@@ -0,0 +1,49 @@
+import numpy as np
+from app.retrieval.skill_closure import SkillClosure
+from app.retrieval.skill_graph import SkillGraph
+
+URIS = ["s:react", "s:javascript", "s:programming", "s:python", "s:sql"]
+NAMES = ["React", "JavaScript", "computer programming", "Python", "SQL"]
+EDGES = {"optional": ([0], [1]), "broader": ([1, 3], [2, 2])}
+
+
+def _implied_names(closure, graph, name):
+    row = closure.implied(graph.ids_for([name]))
+    return {graph.names[i] for i in range(graph.num_nodes) if closure.contains(row, [i])[0]}
+
+
+def test_closure_rows_and_coverage():
+    graph = SkillGraph.from_edges(URIS, NAMES, EDGES)
+    closure = SkillClosure.build(graph, depth=2)
+
+    assert _implied_names(closure, graph, "React") == {"React", "JavaScript", "computer programming"}
+    assert _implied_names(closure, graph, "SQL") == {"SQL"}
+
+    candidate = graph.ids_for(["React"])
+    required = graph.ids_for(["JavaScript", "computer programming", "Python", "SQL"])
+    assert closure.coverage(candidate, required) == 0.5
+    assert closure.contains(closure.implied(candidate), required).tolist() == [True, True, False, False]
+
+
+def test_refresh_matches_full_rebuild_after_reorder_and_edit(tmp_path):
+    graph = SkillGraph.from_edges(URIS, NAMES, EDGES)
+    closure = SkillClosure.build(graph, depth=2)
+    path = str(tmp_path / "closure.npz")
+    closure.save(path)
+    assert SkillClosure.load(path).matches(graph)
+
+    # New import: ids reordered, "SQL" now broader -> programming, a new node added
+    uris = ["s:sql", "s:python", "s:react", "s:programming", "s:javascript", "s:ict"]
+    names = ["SQL", "Python", "React", "computer programming", "JavaScript", "ICT"]
+    updated = SkillGraph.from_edges(uris, names, {
+        "optional": ([2], [4]),
+        "broader": ([4, 1, 0, 3], [3, 3, 3, 5]),
+    })
+
+    refreshed, recomputed = SkillClosure.load(path).refresh(updated)
+    rebuilt = SkillClosure.build(updated, depth=2)
+
+    assert refreshed.uris == rebuilt.uris
+    assert np.array_equal(refreshed.bits, rebuilt.bits)
+    assert refreshed.matches(updated)
+    assert recomputed < updated.num_nodes
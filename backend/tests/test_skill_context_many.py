@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import pytest
+from conftest import FakeSession
+
+from app.retrieval import esco_runtime, graph_cache, graph_rag
+from app.retrieval.skill_graph import SkillGraph
+
+
+@pytest.fixture(autouse=True)
+def esco_version(monkeypatch):
+    async def version():
+        return 1
+    monkeypatch.setattr(graph_rag, "current_esco_version", version)
+    graph_cache.invalidate_graph_caches()
+
+
+def _row(ord, id, name):
+    return SimpleNamespace(ord=ord, id=id, name=name, description=None, skill_type="skill")
+
+
+@pytest.mark.anyio
+async def test_one_round_trip_and_shared_expansion(monkeypatch):
+    graph = SkillGraph.from_edges(
+        ["s:py", "s:prog", "s:sql"],
+        ["Python", "computer programming", "SQL"],
+        {"broader": ([0, 2], [1, 1])},
+    )
+    monkeypatch.setattr(esco_runtime, "_skill_graph", graph)
+    embedded = []
+    monkeypatch.setattr(
+        graph_rag.gemini_client,
+        "embed_contents",
+        lambda model, contents: embedded.append(list(contents)) or [[1.0, 0.0, 0.0] for _ in contents],
+    )
+
+    # "Python" and "SQL" match; "Cobol" has no hits; the shared seed appears twice
+    session = FakeSession([_row(1, "a", "Python"), _row(2, "b", "SQL"), _row(1, "a", "Python")])
+    context = await graph_rag.fetch_skill_context_many(["Python", "SQL", "Cobol", "python "], session)
+
+    assert embedded == [["Python", "SQL", "Cobol"]]
+    hybrid_calls = [params for _, params in session.statements if "queries" in params]
+    assert len(hybrid_calls) == 1 and hybrid_calls[0]["queries"] == ["Python", "SQL", "Cobol"]
+    assert " Cobol:\n   - No ESCO match" in context
+    assert context.count("Python is 'broader' related to computer programming") == 1
+    assert "SQL is 'broader' related to computer programming" in context
+
+    # Same skill set in another order / spelling is served from the cache, quoting the new queries
+    again = await graph_rag.fetch_skill_context_many(["cobol", "SQL", "Python"], session)
+    assert len(embedded) == 1
+    assert again.startswith("Queries: 'cobol', 'SQL', 'Python'") and " cobol:\n   - No ESCO match" in again
+    assert "Cobol" not in again
+    assert again.count("Python is 'broader' related to computer programming") == 1
+
+
+@pytest.mark.anyio
+async def test_cached_context_quotes_each_callers_query(monkeypatch):
+    graph = SkillGraph.from_edges(["s:py", "s:prog"], ["Python", "computer programming"], {"broader": ([0], [1])})
+    monkeypatch.setattr(esco_runtime, "_skill_graph", graph)
+    embedded = []
+    monkeypatch.setattr(
+        graph_rag.gemini_client,
+        "embed_contents",
+        lambda model, contents: embedded.append(list(contents)) or [[1.0, 0.0, 0.0] for _ in contents],
+    )
+    session = FakeSession([_row(1, "a", "Python")])
+
+    first = await graph_rag.fetch_skill_context("Python", session)
+    second = await graph_rag.fetch_skill_context("py", session)
+    assert len(embedded) == 1
+    assert first.startswith("Query: 'Python'") and second.startswith("Query: 'py'")
+    assert "'Python'" not in second
+
+
+@pytest.mark.anyio
+async def test_failed_embedding_is_not_cached(monkeypatch):
+    monkeypatch.setattr(esco_runtime, "_skill_graph", SkillGraph.from_edges(["s:py"], ["Python"], {}))
+    embedded = []
+
+    def embed(model, contents):
+        embedded.append(list(contents))
+        # Gemini unavailable on the first call: zero vectors, keyword-only matches
+        return [[0.0] * 3 if len(embedded) == 1 else [1.0, 0.0, 0.0] for _ in contents]
+
+    monkeypatch.setattr(graph_rag.gemini_client, "embed_contents", embed)
+    session = FakeSession([_row(1, "a", "Python")])
+
+    await graph_rag.fetch_skill_context_many(["Python"], session)
+    await graph_rag.fetch_skill_context_many(["Python"], session)
+    await graph_rag.fetch_skill_context_many(["Python"], session)
+    assert len(embedded) == 2
+
@@ -0,0 +1,72 @@
+from app.retrieval.skill_extractor import SkillExtractor
+from app.retrieval.skill_graph import SkillGraph
+from app.retrieval.skill_normalizer import SkillNormalizer
+
+
+def _extractor():
+    graph = SkillGraph.from_edges(
+        ["s:java", "s:ml", "s:learning", "s:dl", "s:skills", "s:scm"],
+        ["Java (computer programming)", "machine learning", "learning", "deep learning", "skills",
+         "tools for software configuration management"],
+        {},
+        aliases={"Java": 0, "Git": 5, "software configuration management tools": 5},
+    )
+    return SkillExtractor(SkillNormalizer(graph))
+
+
+def test_word_boundaries_and_aliases():
+    extractor = _extractor()
+    text = "JavaScript (ES6) and TypeScript with ReactJS; some Java. Deployed via k8s and CI/CD."
+    assert extractor.extract(text) == [
+        "JavaScript", "TypeScript", "React", "Java (computer programming)", "Kubernetes", "CI/CD",
+    ]
+
+
+def test_leftmost_longest_and_generic_labels():
+    extractor = _extractor()
+    mentions = extractor.find("Machine Learning engineer with deep learning and learning skills")
+    assert [(m.text, extractor.normalizer.name(m.skill_id)) for m in mentions] == [
+        ("Machine Learning", "machine learning"),
+        ("deep learning", "deep learning"),
+    ]   # lower-case one-word labels ("learning", "skills") only count inside longer labels
+
+
+def test_ambiguous_short_words_need_capitals():
+    extractor = _extractor()
+    assert extractor.extract("ready to go, we use Go and Node") == ["Go", "Node.js"]
+    assert extractor.extract("every node must go") == []
+
+
+def test_frequency_ordering_and_merge():
+    extractor = _extractor()
+    text = "Python. Docker, Docker and more Docker. Python scripts. AWS."
+    assert extractor.extract(text, by_frequency=True) == ["Docker", "Python", "Amazon Web Services"]
+    assert extractor.extract(text, limit=1) == ["Python"]
+    assert extractor.merge(["Python", "Docker"], ["python3", "Rust", "docker"]) == ["Python", "Docker", "Rust"]
+
+
+def test_single_word_alt_labels_do_not_tag_broader_concepts():
+    extractor = _extractor()
+    assert extractor.extract("Experience with software configuration management tools") == [
+        "tools for software configuration management",
+    ]
+    # The curated name wins over ESCO's alt label, so "Git" is Git, not the broader concept
+    assert extractor.extract("Version control with Git and GitHub") == ["Git", "GitHub"]
+    assert extractor.normalizer.lookup("Git") != 5
+
+
+def test_common_tools_are_extracted():
+    extractor = _extractor()
+    assert extractor.extract("Experience with Git, Linux, Excel, Jira, Jenkins, Maven, Oracle, Hibernate.") == [
+        "Git", "Linux", "Microsoft Excel", "Jira", "Jenkins", "Maven", "Oracle Database", "Hibernate",
+    ]
+    assert extractor.extract("Java, Spring, Hibernate, Maven, Jenkins and Oracle") == [
+        "Java (computer programming)", "Spring Boot", "Hibernate", "Maven", "Jenkins", "Oracle Database",
+    ]
+    assert extractor.extract(
+        "Git, GitHub, Jira, Linux, Excel, Power BI, Tableau, Spark, Hadoop, Kafka, Airflow, TensorFlow, PyTorch, Pandas, NumPy"
+    ) == [
+        "Git", "GitHub", "Jira", "Linux", "Microsoft Excel", "Power BI", "Tableau", "Apache Spark", "Hadoop",
+        "Apache Kafka", "Apache Airflow", "TensorFlow", "PyTorch", "Pandas", "NumPy",
+    ]
+    assert extractor.extract("we excel at teamwork; each Node is replicated") == []
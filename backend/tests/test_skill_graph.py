@@ -0,0 +1,75 @@
+import csv
+from app.retrieval.skill_graph import SkillGraph
+
+# react -> javascript -> programming ; python -> programming ; sql (isolated)
+URIS = ["s:react", "s:javascript", "s:programming", "s:python", "s:sql"]
+NAMES = ["React", "JavaScript", "computer programming", "Python", "SQL"]
+
+
+def _graph() -> SkillGraph:
+    return SkillGraph.from_edges(
+        URIS,
+        NAMES,
+        {
+            "optional": ([0, 0], [1, 1]),      # duplicate edge is collapsed
+            "broader": ([1, 3], [2, 2]),
+        },
+        aliases={"ReactJS": 0},
+    )
+
+
+def test_name_lookup_is_case_insensitive_and_uses_aliases():
+    graph = _graph()
+    assert graph.ids_for(["react", "REACTJS", " sql ", "unknown"]) == [0, 0, 4]
+    assert graph.num_edges == 3
+
+
+def test_k_hop_follows_edge_direction():
+    graph = _graph()
+    react = graph.ids_for(["React"])
+
+    assert graph.names_for(graph.k_hop(react, k=1)) == ["JavaScript"]
+    assert graph.names_for(graph.k_hop(react, k=2)) == ["JavaScript", "computer programming"]
+    assert graph.names_for(graph.k_hop(react, k=2, relations=["broader"])) == []
+    assert sorted(graph.names_for(graph.k_hop(graph.ids_for(["computer programming"]), k=1, direction="in"))) == [
+        "JavaScript",
+        "Python",
+    ]
+
+
+def test_k_hop_edges_matches_undirected_expansion():
+    graph = _graph()
+    edges = graph.k_hop_edges(graph.ids_for(["Python"]), k=2)
+    assert sorted(edges) == [(1, "broader", 2), (3, "broader", 2)]
+    assert graph.k_hop_edges(graph.ids_for(["SQL"]), k=2) == []
+
+
+def test_from_esco_csv(tmp_path):
+    def write(name, header, rows):
+        with open(tmp_path / name, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    write("skills_en.csv", ["conceptType", "conceptUri", "skillType", "preferredLabel", "altLabels", "description"], [
+        ["KnowledgeSkillCompetence", "s:python", "knowledge", "Python (computer programming)", "Python\npython3", ""],
+        ["KnowledgeSkillCompetence", "s:django", "knowledge", "Django", "", ""],
+    ])
+    write("skillGroups_en.csv", ["conceptType", "conceptUri", "preferredLabel", "altLabels"], [
+        ["SkillGroup", "g:programming", "computer programming", ""],
+    ])
+    write("skillSkillRelations_en.csv",
+          ["originalSkillUri", "originalSkillType", "relationType", "relatedSkillType", "relatedSkillUri"],
+          [["s:django", "knowledge", "essential", "knowledge", "s:python"]])
+    write("broaderRelationsSkillPillar_en.csv", ["conceptType", "conceptUri", "broaderType", "broaderUri"], [
+        ["KnowledgeSkillCompetence", "s:python", "SkillGroup", "g:programming"],
+        ["SkillGroup", "g:programming", "SkillGroup", "g:ict"],   # group outside the loaded files
+    ])
+
+    graph = SkillGraph.from_esco_csv(str(tmp_path))
+
+    assert graph.num_nodes == 4
+    assert set(graph.csr) == {"essential", "broader"}
+    django = graph.ids_for(["django"])
+    assert graph.names_for(graph.k_hop(django, k=2)) == ["Python (computer programming)", "computer programming"]
+    assert graph.ids_for(["python3"]) == graph.ids_for(["Python"])
@@ -0,0 +1,80 @@
+from app.agents.market_trends.scraper import get_jobs_for_skill
+from app.retrieval.skill_graph import SkillGraph
+from app.retrieval.skill_normalizer import SkillNormalizer, normalize_label
+
+
+def _normalizer():
+    graph = SkillGraph.from_edges(
+        ["s:python", "s:sql", "s:js"],
+        ["Python (computer programming)", "SQL", "JavaScript"],
+        {},
+        aliases={"Python": 0},
+    )
+    return SkillNormalizer(graph)
+
+
+def test_spelling_variants_share_one_id():
+    normalizer = _normalizer()
+    assert normalize_label("React.js") == normalize_label("react js") == normalize_label("ReactJS")
+    react = normalizer.canonicalize(["ReactJS", "React.js", "React", "react js"])
+    assert len(set(react)) == 1 and react[0] >= normalizer.num_esco     # curated, not in ESCO
+    assert normalizer.canonicalize(["python3", "Python", "python (computer programming)"]) == [0, 0, 0]
+    assert normalizer.lookup("js") == 2                                 # curated alias onto an ESCO node
+    assert normalizer.esco_ids(["postgres", "SQL", "Python"]) == [1, 0]
+
+
+def test_unknown_skills_compare_by_key():
+    normalizer = _normalizer()
+    first, second, other = normalizer.canonicalize(["Foo-Bar", "foo bar", "Baz"])
+    assert first == second < 0 and other != first
+    assert normalizer.lookup("Foo Bar") is None
+
+
+def test_mentions_in_titles():
+    normalizer = _normalizer()
+    found = normalizer.mentions("Senior React.js / Node Engineer (Python, SQL) - CI/CD")
+    names = {normalizer.name(i) for i in found}
+    assert {"React", "Node.js", "Python (computer programming)", "SQL", "CI/CD"} <= names
+    assert normalizer.mentions("MySQL DBA") == {normalizer.lookup("MySQL")}
+
+
+def test_jobs_for_skill_uses_canonical_ids():
+    jobs = [
+        {"title": "React.js Developer", "company": "IFS", "search_text": "react.js developer ifs"},
+        {"title": "Senior Software Engineer", "company": "WSO2", "search_text": "senior software engineer wso2"},
+    ]
+    assert get_jobs_for_skill("ReactJS", all_jobs=jobs) == ["React.js Developer at IFS"]
+    assert get_jobs_for_skill("Software Engineer", all_jobs=jobs) == ["Senior Software Engineer at WSO2"]
+
+
+def _prose_normalizer():
+    graph = SkillGraph.from_edges(
+        ["s:dim", "s:people"],
+        ["digital identity management", "manage staff"],
+        {},
+        aliases={"manage": 0, "manage people": 1},
+    )
+    return SkillNormalizer(graph)
+
+
+def test_everyday_words_in_prose_are_not_skills():
+    normalizer = _prose_normalizer()
+    assert normalizer.lookup("manage") == 0                                 # explicit skills still resolve
+    assert normalizer.mentions("I like to manage teams") == set()
+    assert normalizer.mentions("I like to manage people") == {1}           # the multi-word label
+    assert normalizer.mentions("Ready to go, AI and ml curious") == {normalizer.lookup("AI")}
+    assert normalizer.mentions("Go Developer") == {normalizer.lookup("golang")}
+    assert normalizer.mentions("GO / Node.js engineer") == {normalizer.lookup("golang"), normalizer.lookup("node")}
+
+
+def test_dotted_names_and_everyday_aliases_need_the_real_spelling():
+    normalizer = _normalizer()
+    dotnet, node = normalizer.lookup(".NET"), normalizer.lookup("Node.js")
+    assert normalize_label(".NET") == ".net" and normalizer.lookup("net") is None
+    assert normalizer.lookup("dotnet") == normalizer.lookup("ASP.NET") == dotnet
+    assert normalizer.mentions("We offer a competitive Net salary.") == set()
+    assert normalizer.mentions("Net income") == set()
+    assert normalizer.mentions("Each Node is replicated.") == set()
+    assert normalizer.mentions(".NET Core developer") == {dotnet}
+    assert normalizer.mentions("Node.js and Express.js APIs") == {node, normalizer.lookup("Express.js")}
+    assert normalizer.mentions("Java, Spring, Hibernate") == set(normalizer.canonicalize(["Java", "Spring Boot", "Hibernate"]))
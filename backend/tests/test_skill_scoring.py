@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from app.retrieval.skill_graph import SkillGraph
+from app.retrieval.skill_normalizer import SkillNormalizer
+from app.retrieval.skill_scoring import SkillScorer, tier_for
+
+
+def _scorer(**kwargs):
+    # Python -> programming -> computing (broader chain); SQL is unrelated
+    graph = SkillGraph.from_edges(
+        ["s:py", "s:prog", "s:comp", "s:sql"],
+        ["Python", "computer programming", "computing", "SQL"],
+        {"broader": ([0, 1], [1, 2])},
+    )
+    return SkillScorer(SkillNormalizer(graph), **kwargs)
+
+
+def test_credit_decays_with_graph_distance():
+    scorer = _scorer(decay=0.5, max_hops=2)
+    credit = scorer.credit(["python"])
+    np.testing.assert_allclose(credit[:4], [1.0, 0.5, 0.25, 0.0])
+    np.testing.assert_allclose(_scorer(max_hops=0).credit(["python"])[:4], [1.0, 0.0, 0.0, 0.0])
+
+
+def test_scores_one_candidate_against_many_jobs():
+    scorer = _scorer(decay=0.5, max_hops=2)
+    result = scorer.score(
+        ["Python", "Foo Framework"],
+        [
+            ["Python", "SQL"],                                      # half covered
+            ["computer programming", ("SQL", "optional")],          # 0.5 / 1.5
+            ["foo-framework", "python", "Python"],                  # unknown skill matched by key; duplicates count once
+            [],
+        ],
+    )
+    np.testing.assert_allclose(result.coverage, [0.5, 0.5 / 1.5, 1.0, 0.0], rtol=1e-6)
+    assert result.tiers == ["Stretch", "Reach", "Realistic", "Reach"]
+    assert result.gaps == [["SQL"], ["SQL"], [], []]
+    assert result.num_required.tolist() == [2, 2, 2, 0]
+
+
+def test_gaps_list_essential_skills_first():
+    result = _scorer().score([], [[("SQL", "optional"), "Kubernetes", "computing"]])
+    assert result.gaps == [["computing", "Kubernetes", "SQL"]]
+
+
+@pytest.mark.parametrize("score, tier", [(0.7, "Realistic"), (0.69, "Stretch"), (0.45, "Stretch"), (0.1, "Reach")])
+def test_tier_thresholds(score, tier):
+    assert tier_for(score) == tier
+    assert tier_for([score]) == [tier]
@@ -0,0 +1,128 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.retrieval import esco_runtime, graph_cache, graph_rag
+from app.retrieval.esco_loader import concept_uuid
+from app.retrieval.esco_snapshot import EscoSnapshot, write_snapshot
+from app.retrieval.skill_graph import SkillGraph
+from app.retrieval.vector_index import LocalSkillSearch, VectorIndex, lexemes
+
+PARITY_DATABASE_URL = os.getenv("ESCO_PARITY_DATABASE_URL")
+
+
+def test_exact_search_matches_full_sort():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(500, 32)).astype(np.float16)
+    queries = rng.normal(size=(7, 32))
+    ids, distances = VectorIndex(vectors, backend="exact").search(queries, k=5)
+
+    full = np.linalg.norm(queries[:, None, :] - vectors.astype(np.float32)[None, :, :], axis=2)
+    np.testing.assert_array_equal(ids, np.argsort(full, axis=1)[:, :5])
+    np.testing.assert_allclose(distances, np.sort(full, axis=1)[:, :5], rtol=1e-4)
+
+
+def test_hnsw_without_hnswlib_falls_back(monkeypatch):
+    monkeypatch.setattr("app.retrieval.vector_index.hnswlib", None)
+    index = VectorIndex(np.eye(3), backend="hnsw")
+    assert index.backend == "exact"
+    assert index.search([[0, 1, 0]], k=1)[0].tolist() == [[1]]
+
+
+def _search():
+    return LocalSkillSearch(
+        ["a", "b", "c"],
+        ["Python", "SQL", "data analysis"],
+        ["Programming in Python", "Querying databases", "Analysing data with Python and SQL"],
+        ["skill", "skill", "skill"],
+        np.array([[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]]),
+    )
+
+
+def test_keyword_leg_requires_every_term():
+    search = _search()
+    assert lexemes("Analysing the databases") == ["analys", "databas"]
+    assert search.keyword_search("python") == [0, 2]   # ties keep row order; Python occurs twice in row 0
+    assert search.keyword_search("python sql") == [2]
+    assert search.keyword_search("the") == []
+
+
+def test_rrf_fuses_both_legs():
+    hits = _search().search_many(["SQL", "Python"], [[0.0, 1.0], [1.0, 0.1]], limit=2)
+    assert [[h.id for h in query_hits] for query_hits in hits] == [["b", "c"], ["a", "c"]]
+    # rank 1 in both legs
+    assert hits[0][0].rrf_score == pytest.approx(2 / 61)
+
+
+@pytest.mark.anyio
+async def test_skill_context_without_database(monkeypatch):
+    monkeypatch.setattr(esco_runtime, "_local_skill_search", _search())
+    monkeypatch.setattr(esco_runtime, "_skill_graph", None)
+    monkeypatch.setattr(graph_rag.gemini_client, "embed_contents", lambda model, contents: [[0.0, 1.0] for _ in contents])
+
+    async def version():
+        return 0
+    monkeypatch.setattr(graph_rag, "current_esco_version", version)
+    graph_cache.invalidate_graph_caches()
+
+    class NoSession:
+        async def execute(self, *args, **kwargs):
+            raise AssertionError("hybrid search should not reach the database")
+
+    async def no_expansion(session, skill_ids):
+        return []
+    monkeypatch.setattr(graph_rag, "_expand_with_cte", no_expansion)
+
+    context = await graph_rag.fetch_skill_context("SQL", NoSession(), limit=1)
+    assert "SQL (skill): Querying databases" in context
+
+
+def test_snapshot_hits_use_esco_skill_uuids(tmp_path):
+    graph = SkillGraph.from_edges(["s:py", "s:sql"], ["Python", "SQL"], {})
+    path = str(tmp_path / "esco.bin")
+    write_snapshot(path, graph, embeddings={1: [0.0, 1.0]})
+    snapshot = EscoSnapshot.open(path)
+    search = LocalSkillSearch.from_snapshot(snapshot, backend="exact")
+    # The SQL expansion fallback looks these up in esco_skills
+    assert search.ids == [concept_uuid("s:sql")]
+    snapshot.close()
+
+
+@pytest.mark.anyio
+async def test_stale_local_search_is_dropped(monkeypatch):
+    monkeypatch.setattr(esco_runtime, "_local_skill_search", _search())
+    monkeypatch.setattr(esco_runtime, "_local_skill_search_version", 3)
+    assert esco_runtime.get_local_skill_search(3) is not None
+    assert esco_runtime.get_local_skill_search(4) is None
+
+
+@pytest.mark.anyio
+@pytest.mark.skipif(not PARITY_DATABASE_URL, reason="set ESCO_PARITY_DATABASE_URL to compare with Postgres")
+async def test_parity_with_sql_hybrid_search():
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_async_engine(PARITY_DATABASE_URL)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        search = await LocalSkillSearch.from_session(session, backend="exact")
+        sample = np.random.default_rng(0).choice(len(search), size=min(50, len(search)), replace=False)
+        queries = [search.names[i] for i in sample]
+        vectors = search.index.vectors[sample]
+
+        # Exact scan on the SQL side, so both vector legs are exhaustive
+        await session.execute(text("SET LOCAL enable_indexscan = off"))
+        rows = (await session.execute(graph_rag.HYBRID_SEARCH_MANY, {
+            "queries": queries, "vectors": [str(v.tolist()) for v in vectors], "limit": 3,
+        })).fetchall()
+    await engine.dispose()
+
+    sql_top = {}
+    for row in rows:
+        sql_top.setdefault(row.ord - 1, row.id)
+    local = search.search_many(queries, vectors, limit=3)
+    agree = sum(local[i][0].id == sql_top.get(i) for i in range(len(queries)))
+    # Vector leg and fusion are identical; the keyword leg only approximates Postgres' stemmer
+    assert agree >= 0.9 * len(queries)